@@ -0,0 +1,65 @@
+import random
+import time
+from datetime import datetime, timedelta
+
+from django.core.management.base import BaseCommand
+from epiweeks import Week
+
+from alternative_interface.utils import prepare_chart_series_multi
+
+
+class Command(BaseCommand):
+    help = "Benchmark prepare_chart_series_multi on synthetic Express View data"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=3650)
+        parser.add_argument("--series", type=int, default=10)
+        parser.add_argument("--repeat", type=int, default=3)
+        parser.add_argument(
+            "--time-type", choices=["day", "week"], default="day", dest="time_type"
+        )
+
+    def handle(self, *args, **options):
+        end = datetime(2025, 1, 1).date()
+        start = end - timedelta(days=options["days"])
+        rows = self._build_rows(start, end, options["series"], options["time_type"])
+
+        timings = []
+        for _ in range(options["repeat"]):
+            started = time.perf_counter()
+            prepare_chart_series_multi(
+                rows,
+                start.strftime("%Y-%m-%d"),
+                end.strftime("%Y-%m-%d"),
+                series_by="signal",
+                time_type=options["time_type"],
+            )
+            timings.append(time.perf_counter() - started)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{options['days']} days x {options['series']} {options['time_type']} "
+                f"series ({len(rows)} rows): best {min(timings):.3f}s, "
+                f"mean {sum(timings) / len(timings):.3f}s over {len(timings)} runs"
+            )
+        )
+
+    @staticmethod
+    def _build_rows(start, end, series, time_type):
+        rng = random.Random(0)
+        rows = []
+        for i in range(series):
+            d = start
+            while d <= end:
+                if time_type == "day":
+                    time_value = int(d.strftime("%Y%m%d"))
+                    step = timedelta(days=1)
+                else:
+                    w = Week.fromdate(d)
+                    time_value = w.year * 100 + w.week
+                    step = timedelta(days=7)
+                rows.append(
+                    {"signal": f"signal_{i}", "time_value": time_value, "value": rng.random()}
+                )
+                d += step
+        return rows
@@ -0,0 +1,68 @@
+from django.core.management.base import BaseCommand
+
+from alternative_interface.models import ExpressViewIndicator
+from alternative_interface.utils import get_cached_chart_data
+from alternative_interface.views import (
+    _convert_indicators_to_dicts,
+    _get_indicators_queryset,
+)
+from base.models import GeographyUnit
+
+
+class Command(BaseCommand):
+    help = (
+        "Pre-compute Express View chart payloads for every menu item and the "
+        "geographies of the given levels. Run after the nightly Epidata update."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--geo-types",
+            nargs="+",
+            default=["nation", "state"],
+            dest="geo_types",
+            help="Geographic levels to warm (default: nation state)",
+        )
+        parser.add_argument(
+            "--menu-items",
+            nargs="+",
+            dest="menu_items",
+            help="Menu items to warm (default: all)",
+        )
+
+    def handle(self, *args, **options):
+        menu_items = options["menu_items"] or list(
+            ExpressViewIndicator.objects.values_list("menu_item", flat=True)
+            .distinct()
+            .order_by("menu_item")
+        )
+        geographies = [
+            f"{geo_level_name}:{geo_id}"
+            for geo_level_name, geo_id in GeographyUnit.objects.filter(
+                geo_level__name__in=options["geo_types"]
+            )
+            .order_by("geo_level__name", "level", "geo_id")
+            .values_list("geo_level__name", "geo_id")
+        ]
+
+        warmed = empty = 0
+        for menu_item in menu_items:
+            indicators = _convert_indicators_to_dicts(
+                _get_indicators_queryset(menu_item)
+            )
+            for geography in geographies:
+                chart_data = get_cached_chart_data(
+                    menu_item, indicators, geography, refresh=True
+                )
+                if chart_data["datasets"]:
+                    warmed += 1
+                else:
+                    empty += 1
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Cached {warmed} chart payloads "
+                f"({len(menu_items)} menu items x {len(geographies)} geographies, "
+                f"{empty} without data)"
+            )
+        )
@@ -1,6 +1,11 @@
+from datetime import date
+from io import StringIO
 from unittest.mock import MagicMock, patch
 
-from django.test import Client, TestCase
+import requests
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
 from django.urls import reverse
 
 from alternative_interface.models import ExpressViewIndicator
@@ -9,16 +14,23 @@ from alternative_interface.utils import (
     _day_label,
     _epiweek_key,
     _epiweek_label,
+    build_chart_timeline,
     days_in_date_range,
+    get_cached_chart_data,
     epiweeks_in_date_range,
     get_available_geos,
+    get_indicator_rows,
+    get_indicators_rows,
     normalize_dataset,
+    prepare_chart_series_multi,
 )
 from alternative_interface.views import (
     _convert_indicators_to_dicts,
     _get_indicators_queryset,
 )
 from base.models import Geography, GeographyUnit
+from base.geography_index import invalidate_geography_index
+from base.utils import bump_catalog_version
 from datasources.models import SourceSubdivision
 from indicators.models import Indicator
 from indicatorsets.models import IndicatorSet
@@ -104,10 +116,77 @@ class AlternativeInterfaceUtilsTests(TestCase):
         self.assertEqual(_day_label(date(2024, 1, 15)), "2024-01-15")
 
 
+class PrepareChartSeriesTests(TestCase):
+    def test_timeline_matches_epiweeks(self):
+        start, end = date(2014, 12, 1), date(2021, 1, 31)
+        _, labels, day_labels, positions = build_chart_timeline(
+            start.isoformat(), end.isoformat()
+        )
+        expected_weeks = {
+            w.startdate().isoformat(): _epiweek_label(w)
+            for w in epiweeks_in_date_range(start.isoformat(), end.isoformat())
+        }
+        self.assertEqual(day_labels[0], "2014-12-01")
+        self.assertEqual(day_labels[-1], "2021-01-31")
+        for day_label, label, position in zip(day_labels, labels, positions):
+            self.assertEqual(label, expected_weeks.get(day_label, ""))
+            self.assertEqual(position, "week" if label else "day")
+
+    def test_timeline_is_memoized_per_range(self):
+        build_chart_timeline.cache_clear()
+        rows = [{"signal": "a", "time_value": 20240101, "value": 1}]
+        first = prepare_chart_series_multi(rows, "2024-01-01", "2024-01-10", time_type="day")
+        second = prepare_chart_series_multi(rows, "2024-01-01", "2024-01-10", time_type="day")
+        info = build_chart_timeline.cache_info()
+        self.assertEqual((info.hits, info.misses), (1, 1))
+        first["labels"].append("mutated")
+        self.assertEqual(len(second["labels"]), 10)
+        self.assertEqual(len(build_chart_timeline("2024-01-01", "2024-01-10")[1]), 10)
+
+    def test_weekly_values_land_on_week_start(self):
+        rows = [
+            {"signal": "a", "time_value": 202053, "value": 1.0},
+            {"signal": "a", "time_value": 202101, "value": 2.0},
+            {"signal": "a", "time_value": 202154, "value": 9.0},
+        ]
+        series = prepare_chart_series_multi(rows, "2020-12-20", "2021-01-16")
+        data = series["datasets"][0]["data"]
+        self.assertEqual(series["datasets"][0]["timeType"], "week")
+        self.assertEqual(data[series["dayLabels"].index("2020-12-27")], 1.0)
+        self.assertEqual(data[series["dayLabels"].index("2021-01-03")], 2.0)
+        self.assertEqual(sum(v is not None for v in data), 2)
+
+    def test_daily_series_align_by_day_and_drop_out_of_range(self):
+        rows = [
+            {"geo_value": "pa", "time_value": 20240102, "value": 3},
+            {"geo_value": "ny", "time_value": 20240101, "value": 4},
+            {"geo_value": "pa", "time_value": 20231231, "value": 5},
+            {"geo_value": "pa", "time_value": 20240102, "value": 6},
+        ]
+        series = prepare_chart_series_multi(
+            rows, "2024-01-01", "2024-01-03", series_by="geo_value", time_type="day"
+        )
+        self.assertEqual(
+            [(ds["label"], ds["data"]) for ds in series["datasets"]],
+            [("pa", [None, 6, None]), ("ny", [4, None, None])],
+        )
+
+    def test_benchmark_command_reports_timing(self):
+        out = StringIO()
+        call_command(
+            "benchmark_chart_series", days=60, series=2, repeat=1, stdout=out
+        )
+        self.assertIn("60 days x 2 day series", out.getvalue())
+
+
 class AlternativeInterfaceViewTests(TestCase):
     def setUp(self):
+        cache.clear()
         self.client = Client()
 
+    def tearDown(self):
+        cache.clear()
+
     def test_dashboard_renders(self):
         _create_express_indicator()
         response = self.client.get(reverse("alternative_interface"))
@@ -124,7 +203,7 @@ class AlternativeInterfaceViewTests(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.json(), {"chart_data": {}})
 
-    @patch("alternative_interface.views.get_chart_data")
+    @patch("alternative_interface.utils.get_chart_data")
     def test_get_chart_data_ajax_returns_chart_payload(self, mock_chart):
         express = _create_express_indicator()
         mock_chart.return_value = {"labels": ["2020-W01"], "datasets": []}
@@ -136,6 +215,159 @@ class AlternativeInterfaceViewTests(TestCase):
         self.assertIn("labels", response.json()["chart_data"])
 
 
+class ExpressViewChartCacheTests(TestCase):
+    payload = {"labels": ["2020-W01"], "datasets": [{"label": "x", "data": [1]}]}
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.express = _create_express_indicator()
+        geo_level = Geography.objects.create(
+            name="state", display_name="State", used_in="indicators"
+        )
+        GeographyUnit.objects.create(
+            geo_id="pa", display_name="Pennsylvania", geo_level=geo_level, level=1
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def tearDown(self):
+        cache.clear()
+
+    @patch("alternative_interface.utils.get_chart_data")
+    def test_payload_is_served_from_cache(self, mock_chart):
+        mock_chart.return_value = self.payload
+        params = {"pathogen": self.express.menu_item, "geography": "state:pa"}
+        first = self.client.get(reverse("get_chart_data_ajax"), params)
+        second = self.client.get(reverse("get_chart_data_ajax"), params)
+        self.assertEqual(first.json(), second.json())
+        mock_chart.assert_called_once()
+
+    @patch("alternative_interface.utils.get_chart_data")
+    def test_catalog_change_invalidates_payload(self, mock_chart):
+        mock_chart.return_value = self.payload
+        get_cached_chart_data(self.express.menu_item, [], "state:pa")
+        bump_catalog_version()
+        get_cached_chart_data(self.express.menu_item, [], "state:pa")
+        self.assertEqual(mock_chart.call_count, 2)
+
+    @patch("alternative_interface.utils.get_chart_data")
+    def test_empty_payload_is_not_cached(self, mock_chart):
+        mock_chart.return_value = {"labels": [], "datasets": []}
+        get_cached_chart_data("COVID-19", [], "state:pa")
+        get_cached_chart_data("COVID-19", [], "state:pa")
+        self.assertEqual(mock_chart.call_count, 2)
+
+    @patch("alternative_interface.utils.get_chart_data")
+    def test_warm_command_fills_cache(self, mock_chart):
+        mock_chart.return_value = self.payload
+        out = StringIO()
+        call_command("warm_express_view_cache", geo_types=["state"], stdout=out)
+        self.assertIn("Cached 1 chart payloads", out.getvalue())
+        self.assertEqual(
+            get_cached_chart_data(self.express.menu_item, [], "state:pa"), self.payload
+        )
+        mock_chart.assert_called_once()
+
+
+@override_settings(EXPRESS_VIEW_REVISION_LOOKBACK_DAYS=7)
+class ExpressViewSeriesDeltaTests(TestCase):
+    indicator = {
+        "_endpoint": "covidcast",
+        "name": "sig",
+        "data_source": "src",
+        "time_type": "day",
+    }
+
+    def setUp(self):
+        cache.clear()
+
+    @staticmethod
+    def _row(time_value, value):
+        return {
+            "time_value": time_value,
+            "value": value,
+            "signal": "sig",
+            "time_type": "day",
+            "geo_value": "pa",
+        }
+
+    @patch("alternative_interface.utils.get_covidcast_data")
+    def test_cached_series_is_extended_with_tail(self, mock_fetch):
+        mock_fetch.return_value = [self._row(20240101, 1), self._row(20240110, 2)]
+        rows = get_indicator_rows(self.indicator, "state:pa", "2024-01-01", "2024-01-10")
+        self.assertEqual([row["value"] for row in rows], [1, 2])
+        self.assertNotIn("geo_value", rows[0])
+        self.assertEqual(mock_fetch.call_args.args[1], "2024-01-01")
+
+        mock_fetch.return_value = [self._row(20240110, 3), self._row(20240111, 4)]
+        rows = get_indicator_rows(self.indicator, "state:pa", "2024-01-02", "2024-01-11")
+        self.assertEqual(mock_fetch.call_args.args[1], "2024-01-03")
+        self.assertEqual(
+            [(row["time_value"], row["value"]) for row in rows],
+            [(20240110, 3), (20240111, 4)],
+        )
+
+    @patch("alternative_interface.utils.get_covidcast_data")
+    def test_failed_tail_keeps_cached_rows(self, mock_fetch):
+        mock_fetch.return_value = [self._row(20240105, 1)]
+        get_indicator_rows(self.indicator, "state:pa", "2024-01-01", "2024-01-10")
+        mock_fetch.return_value = None
+        rows = get_indicator_rows(self.indicator, "state:pa", "2024-01-01", "2024-01-11")
+        self.assertEqual([row["value"] for row in rows], [1])
+
+    @patch("alternative_interface.utils.get_covidcast_data")
+    def test_withdrawn_tail_rows_are_dropped(self, mock_fetch):
+        mock_fetch.return_value = [self._row(20240105, 1), self._row(20240110, 2)]
+        get_indicator_rows(self.indicator, "state:pa", "2024-01-01", "2024-01-10")
+        mock_fetch.return_value = [self._row(20240110, 3)]
+        rows = get_indicator_rows(self.indicator, "state:pa", "2024-01-01", "2024-01-11")
+        self.assertEqual([row["value"] for row in rows], [3])
+
+    @patch("alternative_interface.utils.get_cached_covidcast")
+    def test_failed_batch_keeps_cached_rows(self, mock_cached):
+        mock_cached.return_value = {"epidata": [self._row(20240105, 1)]}
+        get_indicators_rows([self.indicator], "state:pa", "2024-01-01", "2024-01-10")
+        mock_cached.side_effect = requests.RequestException("unavailable")
+        rows = get_indicators_rows(
+            [self.indicator], "state:pa", "2024-01-01", "2024-01-11"
+        )
+        self.assertEqual([row["value"] for row in rows[0]], [1])
+
+    @patch("alternative_interface.utils.get_covidcast_data")
+    def test_wider_window_fetches_everything(self, mock_fetch):
+        mock_fetch.return_value = [self._row(20240105, 1)]
+        get_indicator_rows(self.indicator, "state:pa", "2024-01-01", "2024-01-10")
+        get_indicator_rows(self.indicator, "state:pa", "2023-01-01", "2024-01-10")
+        self.assertEqual(mock_fetch.call_args.args[1], "2023-01-01")
+
+    @patch("alternative_interface.utils.get_cached_covidcast")
+    def test_signals_of_one_source_are_fetched_together(self, mock_cached):
+        mock_cached.side_effect = lambda params, fetch, api_key: {
+            "epidata": [
+                self._row(20240105, index) | {"signal": signal}
+                for index, signal in enumerate(params["signal"].split(","))
+            ]
+        }
+        indicators = [
+            self.indicator,
+            {**self.indicator, "name": "other"},
+            {**self.indicator, "data_source": "src2"},
+        ]
+        rows = get_indicators_rows(indicators, "state:pa", "2024-01-01", "2024-01-10")
+        self.assertEqual(
+            [series[0]["signal"] for series in rows], ["sig", "other", "sig"]
+        )
+        self.assertEqual([series[0]["value"] for series in rows], [0, 1, 0])
+        self.assertEqual(
+            [call.args[0]["signal"] for call in mock_cached.call_args_list],
+            ["sig,other", "sig"],
+        )
+        self.assertEqual(
+            mock_cached.call_args.args[0]["fields"], "signal,time_value,value"
+        )
+
+
 class AlternativeInterfaceViewHelperTests(TestCase):
     def test_convert_indicators_to_dicts(self):
         express = _create_express_indicator(signal_name="helper_sig")
@@ -167,8 +399,18 @@ class GetAvailableGeosTests(TestCase):
             geo_level=cls.geo_level,
             level=1,
         )
+        GeographyUnit.objects.create(
+            geo_id="NY",
+            display_name="New York",
+            geo_level=cls.geo_level,
+            level=1,
+        )
 
-    @patch("alternative_interface.utils.requests.get")
+    def setUp(self):
+        cache.clear()
+        invalidate_geography_index()
+
+    @patch("indicatorsets.geo_coverage.epidata_get")
     def test_get_available_geos_returns_grouped_children(self, mock_get):
         mock_response = MagicMock()
         mock_response.raise_for_status = MagicMock()
@@ -184,6 +426,32 @@ class GetAvailableGeosTests(TestCase):
         geos = get_available_geos(indicators)
         self.assertTrue(any(group["children"] for group in geos))
 
+    @patch("indicatorsets.geo_coverage.epidata_get")
+    def test_get_available_geos_unions_cached_signal_coverage(self, mock_get):
+        coverage = {"sig_a": ["state:pa"], "sig_b": ["state:ny"]}
+
+        def get(endpoint, params):
+            response = MagicMock()
+            response.json.return_value = {"epidata": coverage[params["signals"]]}
+            return response
+
+        mock_get.side_effect = get
+        get_available_geos([{"name": "sig_a", "data_source": "src"}])
+        get_available_geos([{"name": "sig_b", "data_source": "src"}])
+        self.assertEqual(mock_get.call_count, 2)
+
+        geos = get_available_geos(
+            [
+                {"name": "sig_b", "data_source": "src"},
+                {"name": "sig_a", "data_source": "src"},
+            ]
+        )
+        self.assertEqual(mock_get.call_count, 2)
+        self.assertEqual(
+            [child["id"] for group in geos for child in group["children"]],
+            ["state:NY", "state:pa"],
+        )
+
     def test_get_available_geos_without_indicators_returns_all_units(self):
         geos = get_available_geos([])
         child_count = sum(len(group["children"]) for group in geos)
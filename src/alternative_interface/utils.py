@@ -1,16 +1,24 @@
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
+from functools import lru_cache, partial
 from typing import Iterable, Union
+from urllib.parse import quote
 
+import numpy as np
 import requests
 from django.conf import settings
+from django.core.cache import cache
 from epiweeks import Week
 from delphi_utils import get_structured_logger
 
-from base.models import GeographyUnit
+from base.geography_index import get_geography_index
+from base.utils import catalog_cache_key
+from epiportal.covidcast_cache import get_cached_covidcast
+from epiportal.epidata import epidata_get_json, with_fields
+from epiportal.utils import compress_json, decompress_json
+from indicatorsets.geo_coverage import get_signals_coverage
 from indicatorsets.utils import (
     generate_random_color,
     get_epiweek,
-    group_by_property,
 )
 from alternative_interface.helper import (
     COVIDCAST_FLUVIEW_LOCATIONS_MAPPING,
@@ -20,6 +28,9 @@ from alternative_interface.models import ExpressViewIndicator
 
 logger = get_structured_logger("alternative_interface.utils")
 
+# Columns of a covidcast row that the chart reads
+COVIDCAST_SERIES_FIELDS = ("signal", "time_value", "value")
+
 
 def epiweeks_in_date_range(start_date_str: str, end_date_str: str):
     start_date = datetime.strptime(start_date_str, "%Y-%m-%d").date()
@@ -76,122 +87,77 @@ def days_in_date_range(start_date_str: str, end_date_str: str):
     return days
 
 
+# Geo levels offered for FluView indicators
+FLUVIEW_GEO_LEVELS = ["census-region", "us-territory", "us-city", "ny_minus_jfk"]
+
+
 def get_available_geos(indicators):
-    if indicators:
-        geo_values = []
-        grouped_indicators = group_by_property(indicators, "data_source")
-        sources = grouped_indicators.keys()
-        for data_source, indicators in grouped_indicators.items():
-            indicators_str = ",".join(indicator["name"] for indicator in indicators)
-            try:
-                response = requests.get(
-                    f"{settings.EPIDATA_URL}covidcast/geo_indicator_coverage",
-                    params={"data_source": data_source, "signals": indicators_str},
-                    auth=("epidata", settings.EPIDATA_API_KEY),
-                    timeout=(5, 30),
-                )
-                response.raise_for_status()
-            except requests.RequestException:
-                logger.exception(
-                    "Error getting geo indicator coverage",
-                    extra={"data_source": data_source, "signals": indicators_str},
-                )
-                continue
-            data = response.json()
-            if len(data["epidata"]):
-                geo_values.extend(data["epidata"])
-        unique_values = set(geo_values)
-        geo_levels = set([el.split(":")[0] for el in unique_values])
-        geo_unit_ids = set([geo_value.split(":")[1] for geo_value in unique_values])
-        geographic_granularities = [
-            {
-                "id": f"{geo_unit.geo_level.name}:{geo_unit.geo_id}",
-                "geoType": geo_unit.geo_level.name,
-                "text": geo_unit.display_name,
-                "geoTypeDisplayName": geo_unit.geo_level.display_name,
-            }
-            for geo_unit in GeographyUnit.objects.filter(geo_level__name__in=geo_levels)
-            .filter(geo_id__in=geo_unit_ids)
-            .prefetch_related("geo_level")
-            .order_by("level")
-        ]
-        if "fluview" in sources:
-            geographic_granularities.extend(
-                [
-                    {
-                        "id": f"{geo_unit.geo_level.name}:{geo_unit.geo_id}",
-                        "geoType": geo_unit.geo_level.name,
-                        "text": geo_unit.display_name,
-                        "geoTypeDisplayName": geo_unit.geo_level.display_name,
-                    }
-                    for geo_unit in GeographyUnit.objects.filter(
-                        geo_level__name__in=[
-                            "census-region",
-                            "us-territory",
-                            "us-city",
-                            "ny_minus_jfk",
-                        ]
-                    )
-                    .prefetch_related("geo_level")
-                    .order_by("level")
-                ]
-            )
-    else:
-        geographic_granularities = [
-            {
-                "id": f"{geo_unit.geo_level.name}:{geo_unit.geo_id}",
-                "geoType": geo_unit.geo_level.name,
-                "text": geo_unit.display_name,
-                "geoTypeDisplayName": geo_unit.geo_level.display_name,
-            }
-            for geo_unit in GeographyUnit.objects.all()
-            .prefetch_related("geo_level")
-            .order_by("level")
-        ]
-        # Group by geoTypeDisplayName to match the expected format
-    grouped_geographic_granularities = group_by_property(
-        geographic_granularities, "geoTypeDisplayName"
+    index = get_geography_index()
+    if not indicators:
+        return index.group(range(len(index.entries)))
+    positions = index.covered_positions(
+        get_signals_coverage(
+            (indicator["data_source"], indicator["name"]) for indicator in indicators
+        )
     )
-    geographic_granularities = []
-    for key, value in grouped_geographic_granularities.items():
-        geographic_granularities.append(
-            {
-                "text": key,
-                "children": value,
-            }
+    if any(indicator["data_source"] == "fluview" for indicator in indicators):
+        positions = sorted(
+            set(positions).union(index.level_positions(FLUVIEW_GEO_LEVELS))
         )
-    return geographic_granularities
+    return index.group(positions)
 
 
-def get_covidcast_data(indicator, start_date, end_date, geo, api_key):
+def get_covidcast_data_batch(indicators, start_date, end_date, geo, api_key):
+    """
+    Fetch covidcast rows for indicators sharing a data source and time type.
+
+    All signals go into one request and the rows are split back by their
+    ``signal``. Returns ``{signal: rows}``, where signals without rows are
+    missing, or ``None`` when the request fails.
+    """
+    time_type = indicators[0]["time_type"]
     time_values = f"{start_date}--{end_date}"
-    if indicator["time_type"] == "week":
+    if time_type == "week":
         start_day, end_day = get_epiweek(start_date, end_date)
         time_values = f"{start_day}-{end_day}"
     geo_type, geo_value = geo.split(":")
-    params = {
-        "time_type": indicator["time_type"],
-        "time_values": time_values,
-        "data_source": indicator["data_source"],
-        "signal": indicator["name"],
-        "geo_type": geo_type,
-        "geo_values": geo_value.lower(),
-        "api_key": api_key if api_key else settings.EPIDATA_API_KEY,
-    }
+    signals = ",".join(dict.fromkeys(indicator["name"] for indicator in indicators))
+    params = with_fields(
+        {
+            "time_type": time_type,
+            "time_values": time_values,
+            "data_source": indicators[0]["data_source"],
+            "signal": signals,
+            "geo_type": geo_type,
+            "geo_values": geo_value.lower(),
+        },
+        COVIDCAST_SERIES_FIELDS,
+    )
+    rows_by_signal = {}
     try:
-        response = requests.get(
-            f"{settings.EPIDATA_URL}covidcast", params=params, timeout=(5, 30)
+        response_data = get_cached_covidcast(
+            params,
+            partial(epidata_get_json, "covidcast", params=params, api_key=api_key),
+            api_key,
         )
-        response.raise_for_status()
-        response_data = response.json()
-        if len(response_data["epidata"]):
-            return response_data["epidata"]
     except requests.RequestException:
         logger.exception(
             "Error getting covidcast data",
-            extra={"signal": indicator["name"], "geo": geo},
+            extra={"signal": signals, "geo": geo},
         )
-    return []
+        return None
+    for row in response_data["epidata"] or []:
+        rows_by_signal.setdefault(row["signal"], []).append(row)
+    return rows_by_signal
+
+
+def get_covidcast_data(indicator, start_date, end_date, geo, api_key):
+    rows_by_signal = get_covidcast_data_batch(
+        [indicator], start_date, end_date, geo, api_key
+    )
+    if rows_by_signal is None:
+        return None
+    return rows_by_signal.get(indicator["name"], [])
 
 
 def get_fluview_data(indicator, geo, start_date, end_date, api_key):
@@ -207,22 +173,20 @@ def get_fluview_data(indicator, geo, start_date, end_date, api_key):
     params = {
         "regions": region,
         "epiweeks": time_values,
-        "api_key": api_key if api_key else settings.EPIDATA_API_KEY,
     }
     try:
-        response = requests.get(
-            f"{settings.EPIDATA_URL}{indicator['data_source']}",
+        data = epidata_get_json(
+            indicator["data_source"],
             params=params,
-            timeout=(5, 30),
+            api_key=api_key,
+            fields=("epiweek", indicator["name"]),
         )
-        response.raise_for_status()
     except requests.RequestException:
         logger.exception(
             "Error getting fluview data",
             extra={"signal": indicator["name"], "geo": geo},
         )
-        return []
-    data = response.json()
+        return None
     if len(data["epidata"]):
         return [
             {
@@ -236,6 +200,88 @@ def get_fluview_data(indicator, geo, start_date, end_date, api_key):
     return []
 
 
+# date.toordinal() of 1970-01-01, used to move between ordinals and datetime64
+_UNIX_EPOCH_ORDINAL = 719163
+
+
+def _parse_date_range(start_date_str: str, end_date_str: str):
+    start_date = datetime.strptime(start_date_str, "%Y-%m-%d").date()
+    end_date = datetime.strptime(end_date_str, "%Y-%m-%d").date()
+    if end_date < start_date:
+        start_date, end_date = end_date, start_date
+    return start_date, end_date
+
+
+def _epiweek_start_ordinal(year: int, week: int) -> int:
+    """Ordinal of the Sunday starting epiweek ``year``/``week``; ValueError if invalid."""
+    jan4 = date(year, 1, 4).toordinal()
+    first_sunday = jan4 - jan4 % 7
+    next_jan4 = date(year + 1, 1, 4).toordinal()
+    weeks_in_year = (next_jan4 - next_jan4 % 7 - first_sunday) // 7
+    if not 1 <= week <= weeks_in_year:
+        raise ValueError(f"Invalid epiweek {year}{week:02d}")
+    return first_sunday + (week - 1) * 7
+
+
+@lru_cache(maxsize=32)
+def build_chart_timeline(start_date: str, end_date: str):
+    """
+    Build the day-based timeline shared by every series in a chart.
+
+    Days are handled as integer ordinals; Sundays (ordinal % 7 == 0) start an
+    epiweek, whose year is the year of its Wednesday.
+    Returns ``(start_ordinal, labels, day_labels, time_positions)`` with
+    tuples, as the result is memoized per (start, end) and shared between
+    indicators and requests.
+    """
+    start, end = _parse_date_range(start_date, end_date)
+    ordinals = np.arange(start.toordinal(), end.toordinal() + 1)
+    dates = (ordinals - _UNIX_EPOCH_ORDINAL).astype("datetime64[D]")
+
+    is_week_start = ordinals % 7 == 0
+    sundays = ordinals[is_week_start]
+    wednesdays = (sundays + 3 - _UNIX_EPOCH_ORDINAL).astype("datetime64[D]")
+    years = wednesdays.astype("datetime64[Y]")
+    weeks = (wednesdays - years.astype("datetime64[D]")).astype(int) // 7 + 1
+    years = years.astype(int) + 1970
+
+    labels = np.full(len(ordinals), "", dtype=object)
+    labels[is_week_start] = [
+        f"{year}-W{week:02d}" for year, week in zip(years.tolist(), weeks.tolist())
+    ]
+    time_positions = np.where(is_week_start, "week", "day")
+    return (
+        int(start.toordinal()),
+        tuple(labels.tolist()),
+        tuple(np.datetime_as_string(dates, unit="D").tolist()),
+        tuple(time_positions.tolist()),
+    )
+
+
+def _time_value_to_ordinal(tv, time_type: str):
+    """
+    Map an API time_value to ``(kind, ordinal)`` on the day timeline.
+
+    Weekly values land on the Sunday starting their epiweek; daily values
+    passed with a weekly time_type are snapped to their epiweek. Returns
+    ``None`` for values that cannot be parsed.
+    """
+    tv_str = str(tv)
+    try:
+        if len(tv_str) == 8:
+            ordinal = date(
+                int(tv_str[0:4]), int(tv_str[4:6]), int(tv_str[6:8])
+            ).toordinal()
+            if time_type == "day":
+                return "day", ordinal
+            return "week", ordinal - ordinal % 7
+        if len(tv_str) == 6 and time_type != "day":
+            return "week", _epiweek_start_ordinal(int(tv_str[0:4]), int(tv_str[4:6]))
+    except ValueError:
+        return None
+    return None
+
+
 def prepare_chart_series_multi(
     api_rows: list[dict],
     start_date: str,
@@ -249,52 +295,11 @@ def prepare_chart_series_multi(
     time_type: 'week' or 'day' - determines how to interpret time_value
     returns: { labels: [...], dayLabels: [...], timePositions: [...], datasets: [{ label, data, timeType }, ...] }
     """
-    # 1) Build unified timeline with both days and weeks
-    days = days_in_date_range(start_date, end_date)
-    weeks = epiweeks_in_date_range(start_date, end_date)
-
-    # Create a unified timeline: each position can be either a day or a week
-    # We'll use day positions as the base, and mark week positions
-    day_keys = [_day_key(d) for d in days]
-    week_keys = [_epiweek_key(w) for w in weeks]
-
-    # Create mapping: week_key -> list of day_keys in that week
-    week_to_days = {}
-    for w in weeks:
-        week_start = w.startdate()
-        week_end = w.enddate()
-        week_key = _epiweek_key(w)
-        week_to_days[week_key] = []
-        for d in days:
-            if week_start <= d <= week_end:
-                week_to_days[week_key].append(_day_key(d))
-
-    # Build labels and time positions
-    # timePositions will indicate: 'day' or 'week' for each position
-    labels = []  # Primary labels (weeks)
-    day_labels = []  # Secondary labels (days)
-    time_positions = []  # 'day' or 'week' for each position
-
-    # Use days as the base timeline
-    for d in days:
-        day_key = _day_key(d)
-        day_labels.append(_day_label(d))
-
-        # Check if this day is the start of a week
-        w = Week.fromdate(d)
-        week_key = _epiweek_key(w)
-        if week_key in week_keys and d == w.startdate():
-            labels.append(_epiweek_label(w))
-            time_positions.append("week")
-        else:
-            # Check if any week contains this day
-            is_in_week = any(day_key in week_to_days.get(wk, []) for wk in week_keys)
-            if is_in_week:
-                labels.append("")  # Empty label for days within weeks
-                time_positions.append("day")
-            else:
-                labels.append("")
-                time_positions.append("day")
+    # 1) Build unified day timeline; weeks are marked on their starting Sunday
+    start_ordinal, labels, day_labels, time_positions = build_chart_timeline(
+        start_date, end_date
+    )
+    num_days = len(day_labels)
 
     # 2) Group rows by series key
     if isinstance(series_by, (list, tuple)):
@@ -313,112 +318,65 @@ def prepare_chart_series_multi(
         def series_label_of(key):
             return str(key)
 
-    # 3) Process data based on time_type
+    # 3) Map each row onto a timeline ordinal. A series is daily or weekly
+    # depending on its first row; rows of the other kind cannot be aligned.
+    series_kind: dict[object, str] = {}
     series_to_values: dict[object, dict[int, float]] = {}
     detected_time_type = time_type
 
     for row in api_rows:
         tv = row.get("time_value")
-        row_time_type = row.get("time_type") or time_type
-
         if tv is None:
             continue
+        row_time_type = row.get("time_type") or time_type
 
-        # Determine time_type if not provided
+        # Determine time_type from the time_value format if not provided
         if detected_time_type is None:
-            # Try to detect from time_value format
-            tv_str = str(tv)
-            if len(tv_str) == 8:  # YYYYMMDD format
+            tv_len = len(str(tv))
+            if tv_len == 8:  # YYYYMMDD format
                 detected_time_type = "day"
-            elif len(tv_str) == 6:  # YYYYWW format
+            elif tv_len == 6:  # YYYYWW format
                 detected_time_type = "week"
             else:
                 detected_time_type = row_time_type or "week"
 
-        # Use row's time_type if available, otherwise use detected
-        actual_time_type = row_time_type or detected_time_type
-
-        # Convert time_value to appropriate key
-        if actual_time_type == "day":
-            try:
-                tv_str = str(tv)
-                if len(tv_str) == 8:
-                    year = int(tv_str[0:4])
-                    month = int(tv_str[4:6])
-                    day = int(tv_str[6:8])
-                    d = datetime(year, month, day).date()
-                    tv = _day_key(d)
-                else:
-                    continue
-            except Exception:
-                continue
-        else:  # week
-            try:
-                tv_str = str(tv)
-                if len(tv_str) == 6:
-                    year = int(tv_str[0:4])
-                    week = int(tv_str[4:6])
-                    w = Week(year, week)
-                    tv = _epiweek_key(w)
-                elif len(tv_str) == 8:
-                    # Convert day to week
-                    year = int(tv_str[0:4])
-                    month = int(tv_str[4:6])
-                    day = int(tv_str[6:8])
-                    d = datetime(year, month, day).date()
-                    w = Week.fromdate(d)
-                    tv = _epiweek_key(w)
-                else:
-                    continue
-            except Exception:
-                continue
+        parsed = _time_value_to_ordinal(tv, row_time_type or detected_time_type)
+        if parsed is None:
+            continue
+        kind, ordinal = parsed
 
         skey = series_key_of(row)
         if skey not in series_to_values:
+            series_kind[skey] = kind
             series_to_values[skey] = {}
+        elif series_kind[skey] != kind:
+            continue
         # last one wins if duplicates
-        series_to_values[skey][tv] = row.get("value", None)
+        series_to_values[skey][ordinal] = row.get("value", None)
 
-    # 4) Align each series to the unified timeline (day-based)
+    # 4) Align each series to the timeline with a single scatter
     datasets = []
     for skey, tv_map in series_to_values.items():
-        data = []
-        # Determine if this series is weekly or daily based on its keys
-        series_keys = list(tv_map.keys())
-        series_time_type = detected_time_type or "week"
-
-        if series_keys:
-            # Check if keys match day format (8 digits) or week format (6 digits)
-            first_key = series_keys[0]
-            if first_key >= 10000000:  # Day key (YYYYMMDD >= 10000000)
-                series_time_type = "day"
-                # Map directly to day positions
-                for day_key in day_keys:
-                    data.append(tv_map.get(day_key, None))
-            else:  # Week key (YYYYWW < 10000000)
-                series_time_type = "week"
-                # Map week values to day positions
-                # For each day, check if it's the start of a week that has data
-                for d in days:
-                    w = Week.fromdate(d)
-                    week_key = _epiweek_key(w)
-                    # If this is the start of the week and we have data for this week
-                    if d == w.startdate() and week_key in tv_map:
-                        data.append(tv_map.get(week_key, None))
-                    else:
-                        # For other days in the week, use None
-                        data.append(None)
-        else:
-            data = [None] * len(day_keys)
-
+        positions = np.fromiter(tv_map.keys(), dtype=np.int64, count=len(tv_map))
+        positions -= start_ordinal
+        values = np.empty(len(tv_map), dtype=object)
+        values[:] = list(tv_map.values())
+        in_range = (positions >= 0) & (positions < num_days)
+
+        data = np.full(num_days, None, dtype=object)
+        data[positions[in_range]] = values[in_range]
         datasets.append(
-            {"label": series_label_of(skey), "data": data, "timeType": series_time_type}
+            {
+                "label": series_label_of(skey),
+                "data": data.tolist(),
+                "timeType": series_kind[skey],
+            }
         )
 
     return {
-        "labels": labels,
-        "dayLabels": day_labels,
-        "timePositions": time_positions,
+        "labels": list(labels),
+        "dayLabels": list(day_labels),
+        "timePositions": list(time_positions),
         "datasets": datasets,
     }
 
@@ -513,6 +471,169 @@ def normalize_dataset(
     return normalized
 
 
+SERIES_ROW_FIELDS = ("time_value", "value", "signal", "time_type")
+
+
+def _fetch_indicator_rows(indicator, geography, start_date, end_date):
+    if indicator["_endpoint"] == "covidcast":
+        return get_covidcast_data(
+            indicator, start_date, end_date, geography, settings.EPIDATA_API_KEY
+        )
+    if indicator["data_source"] in ["fluview", "fluview_clinical"]:
+        return get_fluview_data(
+            indicator, geography, start_date, end_date, settings.EPIDATA_API_KEY
+        )
+    return None
+
+
+def _series_cache_key(indicator, geography):
+    return ":".join(
+        (
+            "express_view_series",
+            quote(indicator["_endpoint"] or "", safe=""),
+            quote(indicator["data_source"], safe=""),
+            quote(indicator["name"], safe=""),
+            indicator.get("time_type", "week"),
+            quote(geography, safe=":"),
+        )
+    )
+
+
+def _tail_start(rows_by_time, time_type, start_date):
+    """
+    First date to re-fetch for cached rows, or ``None`` if they cannot be
+    extended and the whole window has to be fetched.
+    """
+    if not rows_by_time:
+        return None
+    parsed = _time_value_to_ordinal(max(rows_by_time), time_type)
+    if parsed is None:
+        return None
+    lookback = parsed[1] - settings.EXPRESS_VIEW_REVISION_LOOKBACK_DAYS
+    return max(date.fromordinal(lookback).isoformat(), start_date)
+
+
+def _load_series(indicator, geography, start_date):
+    """
+    Return ``(rows_by_time, fetch_start)`` for the cached series: the rows to
+    extend and the first date that still has to be requested.
+    """
+    cached = cache.get(_series_cache_key(indicator, geography))
+    entry = decompress_json(cached) if cached is not None else None
+    if entry is not None and entry["start"] <= start_date:
+        rows_by_time = {row["time_value"]: row for row in entry["rows"]}
+        fetch_start = _tail_start(
+            rows_by_time, indicator.get("time_type", "week"), start_date
+        )
+        if fetch_start is not None:
+            return rows_by_time, fetch_start
+    return {}, start_date
+
+
+def _store_series(
+    indicator, geography, start_date, rows_by_time, fetch_start, fetched
+):
+    """
+    Replace the rows of ``rows_by_time`` from ``fetch_start`` on with
+    ``fetched``, cache the series and return it.
+
+    ``fetched`` is ``None`` when the request failed; the cached rows are then
+    returned unchanged, or ``None`` when there are none.
+    """
+    if fetched is None and not rows_by_time:
+        return None
+    time_type = indicator.get("time_type", "week")
+    if fetched is not None:
+        fetch_ordinal = date.fromisoformat(fetch_start).toordinal()
+        for time_value in list(rows_by_time):
+            parsed = _time_value_to_ordinal(time_value, time_type)
+            # The week containing fetch_start is fetched again too
+            if parsed is None or parsed[1] >= fetch_ordinal - (
+                6 if parsed[0] == "week" else 0
+            ):
+                del rows_by_time[time_value]
+        for row in fetched:
+            rows_by_time[row["time_value"]] = {
+                field: row.get(field) for field in SERIES_ROW_FIELDS
+            }
+
+    start_ordinal = date.fromisoformat(start_date).toordinal()
+    rows = []
+    for time_value in sorted(rows_by_time):
+        parsed = _time_value_to_ordinal(time_value, time_type)
+        if parsed is None:
+            continue
+        kind, ordinal = parsed
+        # Keep the week containing start_date, which may begin before it
+        if ordinal >= start_ordinal - (6 if kind == "week" else 0):
+            rows.append(rows_by_time[time_value])
+    if rows and fetched is not None:
+        cache.set(
+            _series_cache_key(indicator, geography),
+            compress_json({"start": start_date, "rows": rows}),
+            timeout=settings.EXPRESS_VIEW_SERIES_CACHE_TIME,
+        )
+    return rows
+
+
+def get_indicator_rows(indicator, geography, start_date, end_date):
+    """
+    Return the upstream rows charted for one indicator and geography.
+
+    Rows are cached per indicator and geography. When the cached rows already
+    reach back to ``start_date``, only the tail from their latest
+    ``time_value`` minus ``EXPRESS_VIEW_REVISION_LOOKBACK_DAYS`` is requested,
+    and the new rows replace every cached row in that tail, so rows withdrawn
+    upstream disappear as well. If the request fails the cached rows are kept.
+    Rows that fall before ``start_date`` are dropped.
+    """
+    rows_by_time, fetch_start = _load_series(indicator, geography, start_date)
+    fetched = _fetch_indicator_rows(indicator, geography, fetch_start, end_date)
+    return _store_series(
+        indicator, geography, start_date, rows_by_time, fetch_start, fetched
+    )
+
+
+def get_indicators_rows(indicators, geography, start_date, end_date):
+    """
+    Return :func:`get_indicator_rows` for each indicator, in order.
+
+    Covidcast indicators that share a data source, time type and fetch start
+    are requested together in one call.
+    """
+    plans = [
+        _load_series(indicator, geography, start_date) for indicator in indicators
+    ]
+    fetched = [None] * len(indicators)
+    batches = {}
+    for position, indicator in enumerate(indicators):
+        fetch_start = plans[position][1]
+        if indicator["_endpoint"] == "covidcast":
+            batches.setdefault(
+                (indicator["data_source"], indicator["time_type"], fetch_start), []
+            ).append(position)
+        else:
+            fetched[position] = _fetch_indicator_rows(
+                indicator, geography, fetch_start, end_date
+            )
+    for (_, _, fetch_start), positions in batches.items():
+        rows_by_signal = get_covidcast_data_batch(
+            [indicators[position] for position in positions],
+            fetch_start,
+            end_date,
+            geography,
+            settings.EPIDATA_API_KEY,
+        )
+        if rows_by_signal is None:
+            continue
+        for position in positions:
+            fetched[position] = rows_by_signal.get(indicators[position]["name"], [])
+    return [
+        _store_series(indicator, geography, start_date, *plans[position], rows)
+        for position, (indicator, rows) in enumerate(zip(indicators, fetched))
+    ]
+
+
 def get_chart_data(indicators, geography):
     chart_data = {"labels": [], "dayLabels": [], "timePositions": [], "datasets": []}
 
@@ -538,27 +659,13 @@ def get_chart_data(indicators, geography):
             "indicator", "indicator__source"
         )
     }
-    for indicator in indicators:
+    rows_by_indicator = get_indicators_rows(
+        indicators, geography, data_start_date, data_end_date
+    )
+    for indicator, data in zip(indicators, rows_by_indicator):
         title = title_by_key[(indicator["name"], indicator["data_source"])]
         color = generate_random_color()
         indicator_time_type = indicator.get("time_type", "week")
-        data = None
-        if indicator["_endpoint"] == "covidcast":
-            data = get_covidcast_data(
-                indicator,
-                data_start_date,
-                data_end_date,
-                geography,
-                settings.EPIDATA_API_KEY,
-            )
-        elif indicator["data_source"] in ["fluview", "fluview_clinical"]:
-            data = get_fluview_data(
-                indicator,
-                geography,
-                data_start_date,
-                data_end_date,
-                settings.EPIDATA_API_KEY,
-            )
         if data:
             # Prepare series with full data range for scrolling
             series = prepare_chart_series_multi(
@@ -675,3 +782,32 @@ def get_chart_data(indicators, geography):
                 del ds["groupingKey"]
 
     return chart_data
+
+
+def _chart_data_cache_key(menu_item, geography, data_date):
+    return catalog_cache_key(
+        "express_view_chart",
+        quote(menu_item, safe=""),
+        quote(geography, safe=":"),
+        data_date.isoformat(),
+    )
+
+
+def get_cached_chart_data(menu_item, indicators, geography, refresh=False):
+    """
+    Return the Express View chart payload for a menu item and geography.
+
+    Payloads are cached per data date and catalog version, so a new day or a
+    change to the menu's indicators always starts with a fresh fetch.
+    Payloads without any datasets (e.g. when every upstream request failed)
+    are not cached. ``refresh`` rebuilds the entry unconditionally.
+    """
+    cache_key = _chart_data_cache_key(menu_item, geography, datetime.now().date())
+    if not refresh:
+        chart_data = cache.get(cache_key)
+        if chart_data is not None:
+            return chart_data
+    chart_data = get_chart_data(indicators, geography)
+    if chart_data["datasets"]:
+        cache.set(cache_key, chart_data, timeout=settings.CACHE_TIME)
+    return chart_data
@@ -6,7 +6,7 @@ from django.http import JsonResponse
 from django.shortcuts import render
 
 from alternative_interface.models import ExpressViewIndicator
-from alternative_interface.utils import get_available_geos, get_chart_data
+from alternative_interface.utils import get_available_geos, get_cached_chart_data
 from epiportal.settings import ALTERNATIVE_INTERFACE_VERSION
 
 logger = logging.getLogger(__name__)
@@ -95,7 +95,7 @@ def alternative_interface_view(request):
             "pathogens": pathogens,
             "indicators": indicators,
             "chart_data": (
-                get_chart_data(indicators, geography_filter)
+                get_cached_chart_data(pathogen_filter, indicators, geography_filter)
                 if geography_filter
                 else []
             ),
@@ -141,7 +141,9 @@ def get_chart_data_ajax(request):
 
         indicators_qs = _get_indicators_queryset(pathogen_filter)
         indicators = _convert_indicators_to_dicts(indicators_qs)
-        chart_data = get_chart_data(indicators, geography_filter)
+        chart_data = get_cached_chart_data(
+            pathogen_filter, indicators, geography_filter
+        )
 
         return JsonResponse({"chart_data": chart_data})
     except Exception as e:
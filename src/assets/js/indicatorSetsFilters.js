@@ -345,4 +345,33 @@ $('#mobile-filter-close, #mobile-filter-overlay').on('click', function() {
     $('#filterIndicatorSetsForm').removeClass('show');
     $('#mobile-filter-overlay').removeClass('show');
     $('body').css('overflow', '');
-});
\ No newline at end of file
+});
+// Show how many indicator sets each filter option would yield
+function showFacetCounts() {
+    $.ajax({
+        url: "get_facet_counts/" + window.location.search,
+        method: "GET",
+        success: function (response) {
+            Object.entries(response.facets).forEach(([facet, counts]) => {
+                Object.entries(counts).forEach(([value, count]) => {
+                    let input = document.querySelector(
+                        `#filterIndicatorSetsForm input[name="${facet}"][value="${CSS.escape(value)}"]`
+                    );
+                    let label = input && input.id ? document.querySelector(`label[for="${input.id}"]`) : null;
+                    if (!label) {
+                        return;
+                    }
+                    let badge = label.querySelector('.facet-count');
+                    if (!badge) {
+                        badge = document.createElement('span');
+                        badge.className = 'facet-count text-muted';
+                        label.appendChild(badge);
+                    }
+                    badge.textContent = ` (${count})`;
+                });
+            });
+        }
+    });
+}
+
+showFacetCounts();
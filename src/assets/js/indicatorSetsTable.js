@@ -10,11 +10,76 @@ function calculate_table_height() {
     return (percent * h) / 100;
 }
 
+var indicatorSetsInfo = document.createElement('span');
+indicatorSetsInfo.className = 'table-stats-info';
+indicatorSetsInfo.id = 'indicatorSetsInfo';
+
+function showTableStats(stats) {
+    if (stats.num_of_locations > 0) {
+        indicatorSetsInfo.innerHTML =
+            `Showing <b>${stats.num_of_indicators}</b> distinct ${pluralize(stats.num_of_indicators, "indicator")} (arranged in <b>${stats.num_of_indicator_sets}</b> ${pluralize(stats.num_of_indicator_sets, "set")}), including <b>${numberWithCommas(stats.num_of_locations)}</b> Delphi-hosted time series across numerous locations.`;
+    } else {
+        indicatorSetsInfo.innerHTML =
+            `Showing <b>${stats.num_of_indicators}</b> ${pluralize(stats.num_of_indicators, "indicator")} (arranged in <b>${stats.num_of_indicator_sets}</b> ${pluralize(stats.num_of_indicator_sets, "set")}).`;
+    }
+}
+
+// Expand the columnar related-indicators payload back into one object per indicator
+function expandRelatedIndicators(payload) {
+    if (!payload || payload.layout !== "columnar") {
+        return payload;
+    }
+    const columns = payload.columns;
+    const names = Object.keys(columns);
+    return columns.id.map((_, i) => {
+        const indicator = {};
+        names.forEach((name) => {
+            indicator[name] = columns[name][i];
+        });
+        Object.assign(indicator, payload.indicator_sets[indicator.indicator_set]);
+        if (indicator.display_name === null) {
+            indicator.display_name = indicator.member_name || indicator.name;
+        }
+        if (indicator.member_description === null) {
+            indicator.member_description = indicator.description;
+        }
+        return indicator;
+    });
+}
+
+// The first draw also fetches the table stats and related indicators in the
+// same request; later draws (paging, sorting) only fetch table rows.
+var catalogBootstrapped = false;
+
+function loadIndicatorSets(data, callback) {
+    const filters = window.location.search.replace(/[?&]format=[^&]*/, "").replace(/^[?&]/, "");
+    const query = [filters, $.param(data)].filter(Boolean).join("&");
+    if (catalogBootstrapped) {
+        $.ajax({
+            url: `${window.location.pathname}?${query}&format=json`,
+            method: "GET",
+            success: callback,
+        });
+        return;
+    }
+    catalogBootstrapped = true;
+    $.ajax({
+        url: `get_catalog_bootstrap/?${query}&layout=columnar`,
+        method: "GET",
+        success: function (response) {
+            showTableStats(response.stats);
+            callback(response.rows);
+            onRelatedIndicatorsLoaded(expandRelatedIndicators(response.related_indicators));
+        },
+        error: function (xhr, status, error) {
+            console.error("Error fetching indicator sets:", error);
+        },
+    });
+}
+
 var table = new DataTable("#indicatorSetsTable", {  
-    ajax: {
-        url: `${window.location.pathname}${window.location.search.replace(/[?&]format=[^&]*/, "")}${window.location.search ? "&" : "?"}format=json`,
-        dataSrc: "data"
-    },
+    serverSide: true,
+    ajax: loadIndicatorSets,
     columns: [
         {
             className: 'dt-control',
@@ -25,6 +90,7 @@ var table = new DataTable("#indicatorSetsTable", {
         { data: "name" },  // Name
         {
             data: "pathogens",
+            orderable: false,
             render: function (data, type, row) {
                 if (data) {
                     return data.map(pathogen => `<span class="badge badge-pill-outline">${pathogen.display_name}</span>`).join('');
@@ -36,6 +102,7 @@ var table = new DataTable("#indicatorSetsTable", {
         { data: "geographic_scope" },  // Geographic Coverage
         {
             data: "geographic_levels",
+            orderable: false,
             render: function (data, type, row) {
                 if (data) {
                     return data.map(geography => `<span class="badge badge-pill-outline">${geography.display_name}</span>`).join('');
@@ -63,6 +130,7 @@ var table = new DataTable("#indicatorSetsTable", {
         { data: "demographic_granularity" }, // Population Stratifiers
         {
             data: "severity_pyramid_rungs",
+            orderable: false,
             render: function (data, type, row) {
                 if (data) {
                     return data.map(severity_pyramid_rung => `<span class="badge badge-pill-outline">${severity_pyramid_rung.display_name}</span>`).join('');
@@ -90,41 +158,27 @@ var table = new DataTable("#indicatorSetsTable", {
         }, // Documentation
     ],
     fixedHeader: true,
-    paging: false,
+    paging: true,
+    pageLength: 50,
     scrollCollapse: true,
     scrollX: true,
     scrollY: calculate_table_height() + 75,
     fixedColumns: {
         left: 2,
     },
-    ordering: false,
+    ordering: true,
+    order: [],
     mark: true,
     language: {
         emptyTable: "No indicators match your specified filters.  Try relaxing some filters, or clear all filters and try again.",
     },
     layout: {
         topStart: function () {
-            let indicatorSetsInfo = document.createElement('span');
-            indicatorSetsInfo.className = 'table-stats-info';
-            indicatorSetsInfo.id = 'indicatorSetsInfo';
-            $.ajax({
-                url: "get_table_stats_info/" + window.location.search,
-                method: "GET",
-                success: function (response) {
-                    if (response.num_of_locations > 0) {
-                        indicatorSetsInfo.innerHTML =
-                            `Showing <b>${response.num_of_indicators}</b> distinct ${pluralize(response.num_of_indicators, "indicator")} (arranged in <b>${response.num_of_indicator_sets}</b> ${pluralize(response.num_of_indicator_sets, "set")}), including <b>${numberWithCommas(response.num_of_locations)}</b> Delphi-hosted time series across numerous locations.`;
-                    } else {
-                        indicatorSetsInfo.innerHTML =
-                            `Showing <b>${response.num_of_indicators}</b> ${pluralize(response.num_of_indicators, "indicator")} (arranged in <b>${response.num_of_indicator_sets}</b> ${pluralize(response.num_of_indicator_sets, "set")}).`;
-                    }
-                }
-            });
             return indicatorSetsInfo;
         },
         topEnd: null,
-        bottomStart: null,
-        bottomEnd: null
+        bottomStart: "pageLength",
+        bottomEnd: "paging"
     },
     createdRow: function (row, data, dataIndex) {
         if (data.description) {
@@ -5,3 +5,21 @@ function initSelect2(elementId, data) {
         maximumSelectionLength: 5,
     });
 }
+
+function initAjaxSelect2(elementId, url, selected) {
+    const element = $(`#${elementId}`);
+    // Options are fetched on demand, so pre-selected values need their own <option>
+    (selected || []).forEach((item) => {
+        element.append(new Option(item.text, item.id, true, true));
+    });
+    element.select2({
+        ajax: {
+            url: url,
+            dataType: "json",
+            delay: 250,
+            data: (params) => ({ term: params.term || "", page: params.page || 1 }),
+        },
+        minimumInputLength: 0,
+        maximumSelectionLength: 5,
+    });
+}
@@ -0,0 +1,230 @@
+"""
+In-memory registry of GeographyUnit, with a prefix index for the location
+typeahead.
+
+Every worker keeps one registry per process, built on first use and rebuilt
+when the catalog version changes (saving or importing geography units bumps
+it). Units are stored as compact entries in ``level`` order and can be looked
+up by ``(geo_level.name, geo_id)`` in constant time. Each level also holds a
+sorted list of ``(token, position)`` pairs built from the unit's display name
+and geo id, so a prefix lookup is a pair of bisects instead of a scan over tens
+of thousands of rows.
+"""
+
+import re
+import threading
+from bisect import bisect_left
+
+from base.models import GeographyUnit
+from base.utils import get_catalog_version
+
+GEOGRAPHY_SEARCH_PAGE_SIZE = 50
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def _tokenize(text):
+    return _TOKEN_RE.findall(text.lower()) if text else []
+
+
+class GeographyEntry:
+    __slots__ = ("geo_type", "geo_id", "text", "geo_type_display_name")
+
+    def __init__(self, geo_type, geo_id, text, geo_type_display_name):
+        self.geo_type = geo_type
+        self.geo_id = geo_id
+        self.text = text
+        self.geo_type_display_name = geo_type_display_name
+
+    @property
+    def id(self):
+        return f"{self.geo_type}:{self.geo_id}"
+
+    def as_option(self):
+        """Return the entry as a select2 option."""
+        return {
+            "id": self.id,
+            "geoType": self.geo_type,
+            "text": self.text,
+            "geoTypeDisplayName": self.geo_type_display_name,
+        }
+
+
+def _split_id(geo):
+    geo_type, _, geo_id = geo.partition(":")
+    return geo_type, geo_id
+
+
+class GeographyIndex:
+    """
+    Sorted token index over geography units.
+
+    ``entries`` holds a :class:`GeographyEntry` per unit ordered by level and
+    display name; search results are positions into it, so they always come
+    back in that order regardless of which tokens matched.
+    """
+
+    def __init__(self, units, version=None):
+        self.version = version
+        self.entries = []
+        self.positions_by_key = {}
+        self.positions_by_folded_key = {}
+        self.tokens_by_level = {}
+        self.positions_by_level = {}
+        self.level_order = []
+        for unit in units:
+            geo_type = unit["geo_level__name"]
+            entry = GeographyEntry(
+                geo_type,
+                unit["geo_id"],
+                unit["display_name"] or unit["name"],
+                unit["geo_level__display_name"],
+            )
+            position = len(self.entries)
+            self.entries.append(entry)
+            self.positions_by_key[(geo_type, entry.geo_id)] = position
+            self.positions_by_folded_key[
+                (geo_type.lower(), entry.geo_id.lower())
+            ] = position
+            if geo_type not in self.tokens_by_level:
+                self.tokens_by_level[geo_type] = []
+                self.positions_by_level[geo_type] = []
+                self.level_order.append(geo_type)
+            self.positions_by_level[geo_type].append(position)
+            tokens = set(_tokenize(entry.text)) | set(_tokenize(entry.geo_id))
+            self.tokens_by_level[geo_type].extend(
+                (token, position) for token in tokens
+            )
+        for tokens in self.tokens_by_level.values():
+            tokens.sort()
+
+    @classmethod
+    def build(cls, version=None):
+        units = (
+            GeographyUnit.objects.filter(geo_level__isnull=False)
+            .order_by("level", "display_name", "geo_id")
+            .values(
+                "geo_id",
+                "name",
+                "display_name",
+                "geo_level__name",
+                "geo_level__display_name",
+            )
+        )
+        return cls(units, version)
+
+    def _prefix_positions(self, geo_type, prefix):
+        tokens = self.tokens_by_level[geo_type]
+        positions = set()
+        i = bisect_left(tokens, (prefix,))
+        while i < len(tokens) and tokens[i][0].startswith(prefix):
+            positions.add(tokens[i][1])
+            i += 1
+        return positions
+
+    def search(self, term="", geo_type=None):
+        """
+        Return entry positions whose tokens start with every word of ``term``.
+
+        An empty term matches every unit of the requested level(s).
+        """
+        words = _tokenize(term)
+        levels = [geo_type] if geo_type else self.level_order
+        matches = []
+        for level in levels:
+            if level not in self.tokens_by_level:
+                continue
+            if not words:
+                matches.extend(self.positions_by_level[level])
+                continue
+            level_positions = self._prefix_positions(level, words[0])
+            for word in words[1:]:
+                if not level_positions:
+                    break
+                level_positions &= self._prefix_positions(level, word)
+            matches.extend(sorted(level_positions))
+        return matches
+
+    def page(self, term="", page=1, geo_type=None, page_size=GEOGRAPHY_SEARCH_PAGE_SIZE):
+        """
+        Return one page of matches in select2's grouped ajax format.
+        """
+        matches = self.search(term, geo_type)
+        start = (max(page, 1) - 1) * page_size
+        return {
+            "results": self.group(matches[start:start + page_size]),
+            "pagination": {"more": start + page_size < len(matches)},
+        }
+
+    def group(self, positions):
+        """
+        Return the entries at ``positions`` (in index order) grouped by geo
+        level display name, as select2 options.
+        """
+        results = []
+        for position in positions:
+            entry = self.entries[position]
+            if not results or results[-1]["text"] != entry.geo_type_display_name:
+                results.append({"text": entry.geo_type_display_name, "children": []})
+            results[-1]["children"].append(entry.as_option())
+        return results
+
+    def covered_positions(self, geos):
+        """
+        Return the sorted positions of known ``geo_type:geo_id`` ids in
+        ``geos``. Ids are matched case-insensitively, since Epidata reports
+        them in lower case.
+        """
+        positions = set()
+        for geo in geos:
+            geo_type, geo_id = _split_id(geo.lower())
+            position = self.positions_by_folded_key.get((geo_type, geo_id))
+            if position is not None:
+                positions.add(position)
+        return sorted(positions)
+
+    def level_positions(self, geo_types):
+        """Return the sorted positions of every unit of ``geo_types``."""
+        return sorted(
+            position
+            for geo_type in geo_types
+            for position in self.positions_by_level.get(geo_type, ())
+        )
+
+    def get(self, geo_type, geo_id):
+        """Return the entry of one unit, or ``None`` if it is unknown."""
+        position = self.positions_by_key.get((geo_type, geo_id))
+        return None if position is None else self.entries[position]
+
+    def lookup(self, ids):
+        """
+        Return the select2 options for known ``geo_type:geo_id`` ids, in the
+        given order.
+        """
+        options = []
+        for geo in ids:
+            entry = self.get(*_split_id(geo))
+            if entry is not None:
+                options.append(entry.as_option())
+        return options
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_geography_index():
+    """Return this process's geography index for the current catalog version."""
+    global _index
+    version = get_catalog_version()
+    if _index is None or _index.version != version:
+        with _index_lock:
+            if _index is None or _index.version != version:
+                _index = GeographyIndex.build(version)
+    return _index
+
+
+def invalidate_geography_index():
+    global _index
+    with _index_lock:
+        _index = None
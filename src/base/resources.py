@@ -1,5 +1,7 @@
 from import_export.resources import ModelResource
 
+from base.utils import mark_catalog_changed
+
 GEOGRAPHIC_GRANULARITY_MAPPING = {
     "nation": {
         "display_name": "National",
@@ -114,3 +116,4 @@ class CustomModelResource(ModelResource):
     def after_import(self, dataset, result, **kwargs):
         if not kwargs.get("dry_run", False):
             self._meta.model.objects.exclude(pk__in=self.imported_rows_pks).delete()
+            mark_catalog_changed()
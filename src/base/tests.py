@@ -4,10 +4,17 @@ from tablib import Dataset
 from unittest.mock import MagicMock, patch
 
 import requests
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
 from django.contrib.messages.storage.fallback import FallbackStorage
 from django.http import HttpResponseForbidden
 from django.test import RequestFactory, TestCase, override_settings
 
+from base.geography_index import (
+    GeographyIndex,
+    get_geography_index,
+    invalidate_geography_index,
+)
 from base.models import (
     GeographicScope,
     Geography,
@@ -16,6 +23,7 @@ from base.models import (
     SeverityPyramidRung,
 )
 from base.resources import CustomModelResource, get_geographic_mapping_by_name
+from base.utils import bump_catalog_version, get_catalog_version
 from base.views import NotFoundErrorView, epidata
 
 
@@ -81,6 +89,70 @@ class CustomModelResourceTests(TestCase):
         resource.before_import(None, dry_run=True)
         self.assertEqual(resource.imported_rows_pks, [])
 
+    def test_after_import_bumps_catalog_version(self):
+        version = get_catalog_version()
+        resource = PathogenResource()
+        resource.before_import(None, dry_run=False)
+        with self.captureOnCommitCallbacks(execute=True):
+            resource.after_import(None, None, dry_run=False)
+        self.assertGreater(get_catalog_version(), version)
+
+    def test_dry_run_import_keeps_catalog_version(self):
+        version = get_catalog_version()
+        resource = PathogenResource()
+        resource.before_import(None, dry_run=True)
+        resource.after_import(None, None, dry_run=True)
+        self.assertEqual(get_catalog_version(), version)
+
+
+class CatalogVersionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_version_is_seeded_once(self):
+        self.assertEqual(get_catalog_version(), get_catalog_version())
+
+    def test_bump_increments_version(self):
+        version = get_catalog_version()
+        self.assertEqual(bump_catalog_version(), version + 1)
+        self.assertEqual(get_catalog_version(), version + 1)
+
+    def test_bump_seeds_missing_version(self):
+        self.assertIsNotNone(bump_catalog_version())
+
+    def test_model_save_bumps_version(self):
+        version = get_catalog_version()
+        with self.captureOnCommitCallbacks(execute=True):
+            Pathogen.objects.create(name="flu", used_in="indicators")
+        self.assertGreater(get_catalog_version(), version)
+
+    def test_model_save_waits_for_commit(self):
+        version = get_catalog_version()
+        with self.captureOnCommitCallbacks() as callbacks:
+            Pathogen.objects.create(name="flu", used_in="indicators")
+            self.assertEqual(get_catalog_version(), version)
+        self.assertTrue(callbacks)
+
+    def test_transaction_bumps_version_once(self):
+        version = get_catalog_version()
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            for name in ("flu", "rsv", "covid"):
+                Pathogen.objects.create(name=name, used_in="indicators")
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(get_catalog_version(), version + 1)
+
+    def test_rolled_back_savepoint_does_not_swallow_later_bump(self):
+        version = get_catalog_version()
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    Pathogen.objects.create(name="flu", used_in="indicators")
+                    raise IntegrityError
+            except IntegrityError:
+                pass
+            Pathogen.objects.create(name="rsv", used_in="indicators")
+        self.assertEqual(get_catalog_version(), version + 1)
+
 
 class EpidataProxyViewTests(TestCase):
     def setUp(self):
@@ -92,11 +164,12 @@ class EpidataProxyViewTests(TestCase):
         self.assertEqual(response.status_code, 403)
         self.assertIsInstance(response, HttpResponseForbidden)
 
-    @patch("base.views.requests.get")
-    def test_allowed_endpoint_forwards_to_epidata(self, mock_get):
+    @patch("epiportal.epidata.get_session")
+    def test_allowed_endpoint_forwards_to_epidata(self, mock_session):
         mock_response = MagicMock()
         mock_response.status_code = 200
         mock_response.json.return_value = {"epidata": [{"x": 1}], "result": 1}
+        mock_get = mock_session.return_value.get
         mock_get.return_value = mock_response
 
         request = self.factory.get("/epidata/covidcast/geo_coverage/", {"geo": "state:pa"})
@@ -109,7 +182,7 @@ class EpidataProxyViewTests(TestCase):
         self.assertEqual(call_kwargs["timeout"], 10)
         self.assertIn("api_key", mock_get.call_args.kwargs["params"])
 
-    @patch("base.views.requests.get", side_effect=requests.Timeout)
+    @patch("base.views.epidata_get", side_effect=requests.Timeout)
     def test_upstream_failure_returns_502(self, _mock_get):
         request = self.factory.get("/epidata/covidcast/meta/")
         response = epidata(request, endpoint="covidcast/meta")
@@ -288,7 +361,7 @@ class EpidataNon200ResponseTests(TestCase):
     def setUp(self):
         self.factory = RequestFactory()
 
-    @patch("base.views.requests.get")
+    @patch("base.views.epidata_get")
     def test_non_200_upstream_status_is_passthrough(self, mock_get):
         mock_response = MagicMock()
         mock_response.status_code = 404
@@ -300,3 +373,95 @@ class EpidataNon200ResponseTests(TestCase):
         response = epidata(request, endpoint="covidcast/meta")
         self.assertEqual(response.status_code, 404)
         self.assertEqual(json.loads(response.content)["result"], -1)
+
+
+class GeographyIndexTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        with cls.captureOnCommitCallbacks(execute=True):
+            state = Geography.objects.create(
+                name="state", display_name="State", used_in="indicatorsets"
+            )
+            county = Geography.objects.create(
+                name="county", display_name="County", used_in="indicatorsets"
+            )
+            GeographyUnit.objects.create(
+                geo_id="pa", display_name="Pennsylvania", geo_level=state, level=5
+            )
+            GeographyUnit.objects.create(
+                geo_id="ny", display_name="New York", geo_level=state, level=5
+            )
+            GeographyUnit.objects.create(
+                geo_id="42003",
+                display_name="Allegheny County, PA",
+                geo_level=county,
+                level=6,
+            )
+            GeographyUnit.objects.create(
+                geo_id="36061",
+                display_name="New York County, NY",
+                geo_level=county,
+                level=6,
+            )
+
+    def setUp(self):
+        self.index = GeographyIndex.build()
+
+    def _ids(self, positions):
+        return [self.index.entries[position].id for position in positions]
+
+    def test_prefix_matches_any_word_ordered_by_level(self):
+        self.assertEqual(
+            self._ids(self.index.search("new")), ["state:ny", "county:36061"]
+        )
+
+    def test_all_words_must_match(self):
+        self.assertEqual(self._ids(self.index.search("new co")), ["county:36061"])
+        self.assertEqual(self._ids(self.index.search("pa")), ["state:pa", "county:42003"])
+
+    def test_geo_id_and_level_filter(self):
+        self.assertEqual(
+            self._ids(self.index.search("420", geo_type="county")), ["county:42003"]
+        )
+        self.assertEqual(self.index.search("new", geo_type="hrr"), [])
+
+    def test_page_groups_results_and_reports_more(self):
+        first = self.index.page("", page=1, page_size=3)
+        self.assertEqual([group["text"] for group in first["results"]], ["State", "County"])
+        self.assertTrue(first["pagination"]["more"])
+        second = self.index.page("", page=2, page_size=3)
+        self.assertEqual(len(second["results"][0]["children"]), 1)
+        self.assertFalse(second["pagination"]["more"])
+
+    def test_covered_positions_ignore_case_and_order(self):
+        self.assertEqual(
+            self._ids(
+                self.index.covered_positions(
+                    ["county:42003", "STATE:PA", "state:zz", "state:pa"]
+                )
+            ),
+            ["state:pa", "county:42003"],
+        )
+
+    def test_get_by_level_and_geo_id(self):
+        self.assertEqual(self.index.get("county", "42003").text, "Allegheny County, PA")
+        self.assertIsNone(self.index.get("state", "42003"))
+
+    def test_lookup_skips_unknown_ids(self):
+        entries = self.index.lookup(["county:42003", "state:zz"])
+        self.assertEqual([entry["text"] for entry in entries], ["Allegheny County, PA"])
+
+    def test_saving_a_unit_rebuilds_the_process_index(self):
+        cache.clear()
+        invalidate_geography_index()
+        index = get_geography_index()
+        self.assertIs(get_geography_index(), index)
+        unit = GeographyUnit.objects.get(geo_id="pa")
+        unit.display_name = "Commonwealth of Pennsylvania"
+        with self.captureOnCommitCallbacks(execute=True):
+            unit.save()
+        self.assertEqual(
+            get_geography_index().get("state", "pa").text,
+            "Commonwealth of Pennsylvania",
+        )
+        invalidate_geography_index()
@@ -1,7 +1,10 @@
+import time
 from io import BytesIO, TextIOWrapper
 
 import requests
 from django.contrib import messages
+from django.core.cache import cache
+from django.db import transaction
 from django.shortcuts import redirect
 from django.utils.module_loading import import_string
 from django.http import FileResponse
@@ -10,6 +13,69 @@ from delphi_utils import get_structured_logger
 
 logger = get_structured_logger("base.utils")
 
+CATALOG_VERSION_CACHE_KEY = "catalog_version"
+
+
+def get_catalog_version():
+    """
+    Return the current catalog version shared by all workers.
+
+    The counter is seeded from the clock so that a flushed cache never hands
+    out a version number a worker has already built state for.
+    """
+    version = cache.get(CATALOG_VERSION_CACHE_KEY)
+    if version is None:
+        seed = time.time_ns()
+        cache.add(CATALOG_VERSION_CACHE_KEY, seed, timeout=None)
+        version = cache.get(CATALOG_VERSION_CACHE_KEY, seed)
+    return version
+
+
+def bump_catalog_version():
+    """Mark every catalog-derived cache entry and in-memory index as stale."""
+    try:
+        return cache.incr(CATALOG_VERSION_CACHE_KEY)
+    except ValueError:
+        get_catalog_version()
+        return cache.incr(CATALOG_VERSION_CACHE_KEY)
+
+
+def catalog_cache_key(name, *parts, version=None):
+    """
+    Build a cache key for data derived from the catalog.
+
+    The key embeds the catalog version, so entries written before an import
+    are never read again and simply expire.
+    """
+    if version is None:
+        version = get_catalog_version()
+    return ":".join(["catalog", str(version), name, *map(str, parts)])
+
+
+def mark_catalog_changed():
+    """
+    Bump the catalog version once the current transaction commits, so
+    workers never rebuild catalog state from uncommitted or rolled back data.
+
+    However many catalog rows a transaction changes, the version is bumped
+    once. The pending callback is kept on the connection and only counts while
+    it is still queued, since Django drops it when the transaction or its
+    savepoint rolls back.
+    """
+    connection = transaction.get_connection()
+    pending = getattr(connection, "catalog_version_bump", None)
+    if pending is not None and any(
+        func is pending for _, func, _ in connection.run_on_commit
+    ):
+        return
+
+    def bump():
+        connection.catalog_version_bump = None
+        bump_catalog_version()
+
+    connection.catalog_version_bump = bump
+    transaction.on_commit(bump)
+
 
 def import_data(admin_instance, request, resource_class, spreadsheet_url):
     resource = resource_class()
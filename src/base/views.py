@@ -1,8 +1,9 @@
 import requests
-from django.conf import settings
 from django.http import JsonResponse, HttpResponseForbidden
 from django.views.generic import TemplateView
 
+from epiportal.epidata import epidata_get
+
 
 class BadRequestErrorView(TemplateView):
     """
@@ -44,11 +45,8 @@ def epidata(request, endpoint=""):
     if endpoint not in ALLOWED_ENDPOINTS:
         return HttpResponseForbidden("Endpoint not allowed")
     params = {k: v for k, v in request.GET.items() if k != "api_key"}
-    params["api_key"] = settings.EPIDATA_API_KEY
     try:
-        response = requests.get(
-            f"{settings.EPIDATA_URL}{endpoint}", params=params, timeout=10
-        )
+        response = epidata_get(endpoint, params=params, timeout=10)
         response.raise_for_status()
     except requests.RequestException:
         return JsonResponse({"epidata": [], "result": -1}, status=502)
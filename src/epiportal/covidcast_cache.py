@@ -0,0 +1,92 @@
+"""
+Cache of raw ``covidcast`` responses tied to the freshness of each signal.
+
+Entries are keyed on the signal's ``last_update`` from the covidcast_meta index
+(:mod:`epiportal.covidcast_meta`) and a digest of the query and of the API key
+it runs under, so they stop being read as soon as new data for the signal lands
+upstream and a response fetched with one key is never served under another.
+Bodies are stored as zlib-compressed JSON. Hits and misses are counted in the
+cache so that the hit rate can be read across all workers.
+"""
+
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.http import urlencode
+
+from epiportal.covidcast_meta import get_signal_meta
+from epiportal.utils import compress_json, decompress_json
+
+COVIDCAST_CACHE_HITS_KEY = "covidcast_rows:hits"
+COVIDCAST_CACHE_MISSES_KEY = "covidcast_rows:misses"
+
+
+def covidcast_cache_key(params, api_key=None):
+    """
+    Return the cache key for a ``covidcast`` query, or ``None`` when one of its
+    signals is not in the covidcast_meta index and it cannot be cached.
+
+    ``signal`` may hold several comma-separated signals of the data source.
+    ``api_key`` is the user's key; without one the query runs under
+    ``EPIDATA_API_KEY``.
+    """
+    last_updates = []
+    for signal in params["signal"].split(","):
+        meta = get_signal_meta(params["data_source"], signal)
+        if not meta or meta["last_update"] is None:
+            return None
+        last_updates.append(str(meta["last_update"]))
+    effective_key = api_key or settings.EPIDATA_API_KEY or ""
+    query = {name: str(value) for name, value in params.items()}
+    query["api_key"] = hashlib.sha256(effective_key.encode()).hexdigest()
+    query = urlencode(sorted(query.items()))
+    return ":".join(
+        (
+            "covidcast_rows",
+            "-".join(last_updates),
+            hashlib.sha256(query.encode()).hexdigest(),
+        )
+    )
+
+
+def _count(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, 1, timeout=None):
+            cache.incr(key)
+
+
+def get_covidcast_cache_stats():
+    """Return the ``{"hits": ..., "misses": ...}`` counters."""
+    counts = cache.get_many([COVIDCAST_CACHE_HITS_KEY, COVIDCAST_CACHE_MISSES_KEY])
+    return {
+        "hits": counts.get(COVIDCAST_CACHE_HITS_KEY, 0),
+        "misses": counts.get(COVIDCAST_CACHE_MISSES_KEY, 0),
+    }
+
+
+def get_cached_covidcast(params, fetch, api_key=None):
+    """
+    Return the ``covidcast`` JSON for ``params``, calling ``fetch()`` on a miss.
+
+    ``params`` has to describe the request completely, including any
+    ``fields`` projection, since it is what the entry is keyed on, and
+    ``api_key`` has to be the key ``fetch`` sends.
+
+    ``fetch`` returns the decoded response, or ``None`` on error. Only
+    successful responses with at least one row are stored.
+    """
+    key = covidcast_cache_key(params, api_key)
+    if key is None:
+        return fetch()
+    cached = cache.get(key)
+    if cached is not None:
+        _count(COVIDCAST_CACHE_HITS_KEY)
+        return decompress_json(cached)
+    _count(COVIDCAST_CACHE_MISSES_KEY)
+    data = fetch()
+    if data and data.get("result") == 1 and data.get("epidata"):
+        cache.set(key, compress_json(data), settings.CACHE_TIME)
+    return data
@@ -0,0 +1,128 @@
+"""
+Derived index over the Epidata ``covidcast_meta`` endpoint.
+
+The raw metadata has one row per data source, signal, time type and geo type.
+Only a ``(data_source, signal) -> summary`` map is stored in the cache (see
+:mod:`epiportal.metadata_cache`), and every worker keeps its own copy of it.
+Once that copy is older than ``COVIDCAST_META_REFRESH_INTERVAL`` it is re-read
+in a background thread while requests keep using the old one, so no request
+waits on unpickling the metadata or on the upstream call.
+"""
+
+import threading
+import time
+
+from delphi_utils import get_structured_logger
+from django.conf import settings
+
+from epiportal.epidata import epidata_get
+from epiportal.metadata_cache import REFRESH_ERRORS, get_cached_metadata
+
+logger = get_structured_logger("epiportal.covidcast_meta")
+
+COVIDCAST_META_INDEX_CACHE_KEY = "covidcast_meta_index"
+
+
+def build_covidcast_meta_index(rows):
+    """
+    Summarize ``covidcast_meta`` rows per ``(data_source, signal)``.
+
+    Each summary holds the total ``num_locations`` over all geo types, the
+    latest ``last_update`` and the ``(min_time, max_time)`` range per time type.
+    """
+    index = {}
+    for row in rows:
+        key = (row["data_source"], row["signal"])
+        entry = index.setdefault(
+            key, {"num_locations": 0, "last_update": None, "time_ranges": {}}
+        )
+        entry["num_locations"] += row.get("num_locations") or 0
+        last_update = row.get("last_update")
+        if last_update is not None and (
+            entry["last_update"] is None or last_update > entry["last_update"]
+        ):
+            entry["last_update"] = last_update
+        time_type = row.get("time_type")
+        min_time, max_time = row.get("min_time"), row.get("max_time")
+        if time_type and min_time is not None and max_time is not None:
+            current = entry["time_ranges"].get(time_type)
+            if current:
+                min_time = min(min_time, current[0])
+                max_time = max(max_time, current[1])
+            entry["time_ranges"][time_type] = (min_time, max_time)
+    return index
+
+
+def fetch_covidcast_meta_index():
+    """Fetch ``covidcast_meta`` upstream and build its index."""
+    response = epidata_get("covidcast_meta/")
+    response.raise_for_status()
+    metadata = response.json()["epidata"]
+    rows = metadata["epidata"] if isinstance(metadata, dict) else metadata
+    return build_covidcast_meta_index(rows)
+
+
+def _load_index():
+    return get_cached_metadata(
+        COVIDCAST_META_INDEX_CACHE_KEY, fetch_covidcast_meta_index
+    )
+
+
+_index = None
+_index_loaded_at = 0.0
+_refreshing = False
+_refresh_lock = threading.Lock()
+
+
+def _set_index(index):
+    global _index, _index_loaded_at
+    _index = index
+    _index_loaded_at = time.monotonic()
+
+
+def _refresh_index():
+    global _refreshing
+    try:
+        _set_index(_load_index())
+    except REFRESH_ERRORS:
+        logger.exception("Error refreshing covidcast metadata index")
+    finally:
+        with _refresh_lock:
+            _refreshing = False
+
+
+def get_covidcast_meta_index():
+    """
+    Return this process's ``covidcast_meta`` index, or ``None`` if it has never
+    been loaded and cannot be fetched.
+    """
+    global _refreshing
+    if _index is None:
+        try:
+            _set_index(_load_index())
+        except REFRESH_ERRORS:
+            logger.exception("Error fetching covidcast metadata")
+            return None
+        return _index
+    index = _index
+    if time.monotonic() - _index_loaded_at > settings.COVIDCAST_META_REFRESH_INTERVAL:
+        with _refresh_lock:
+            start_refresh = not _refreshing
+            _refreshing = True
+        if start_refresh:
+            threading.Thread(
+                target=_refresh_index, name="covidcast-meta-refresh", daemon=True
+            ).start()
+    return index
+
+
+def get_signal_meta(data_source, signal):
+    """Return the index summary for one signal, or ``None`` if unknown."""
+    index = get_covidcast_meta_index()
+    return index.get((data_source, signal)) if index else None
+
+
+def invalidate_covidcast_meta_index():
+    global _index
+    with _refresh_lock:
+        _index = None
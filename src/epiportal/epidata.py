@@ -0,0 +1,197 @@
+"""
+Shared HTTP client for the Delphi Epidata API.
+
+Every upstream Epidata call should go through :func:`epidata_get` so that all
+requests made by a gunicorn worker share one keep-alive connection pool, use
+the same timeouts and get the API key added in a single place.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
+
+import requests
+from delphi_utils import get_structured_logger
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.http import urlencode
+from requests.adapters import HTTPAdapter
+
+logger = get_structured_logger("epiportal.epidata")
+
+SINGLE_FLIGHT_POLL_INTERVAL = 0.05
+
+_session = None
+_session_pid = None
+_session_lock = threading.Lock()
+
+
+def _build_session() -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=settings.EPIDATA_POOL_CONNECTIONS,
+        pool_maxsize=settings.EPIDATA_POOL_MAXSIZE,
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_session() -> requests.Session:
+    """
+    Return the pooled session for the current process.
+
+    The session is created lazily and re-created after a fork, so gunicorn
+    workers never share sockets inherited from the master process.
+    """
+    global _session, _session_pid
+    pid = os.getpid()
+    if _session is None or _session_pid != pid:
+        with _session_lock:
+            if _session is None or _session_pid != pid:
+                _session = _build_session()
+                _session_pid = pid
+    return _session
+
+
+def get_timeout() -> tuple[float, float]:
+    return (settings.EPIDATA_CONNECT_TIMEOUT, settings.EPIDATA_READ_TIMEOUT)
+
+
+def with_fields(params, fields):
+    """Return a copy of ``params`` projecting the response onto ``fields``."""
+    params = dict(params or {})
+    if fields:
+        params["fields"] = ",".join(fields)
+    return params
+
+
+def epidata_get(
+    endpoint, params=None, api_key=None, base_url=None, timeout=None, fields=None
+):
+    """
+    Send a GET request to an Epidata endpoint over the shared session.
+
+    Args:
+        endpoint: Path relative to ``base_url``, e.g. ``"covidcast"`` or ``"viz/"``.
+        params: Query parameters. Any ``api_key`` in it is replaced.
+        api_key: User-supplied API key; falls back to ``EPIDATA_API_KEY``.
+        base_url: API root, defaults to ``EPIDATA_URL``.
+        timeout: ``(connect, read)`` timeout, defaults to the configured values.
+        fields: Response columns to keep (the API's ``fields`` parameter);
+            every column is returned when omitted.
+
+    Returns:
+        The ``requests.Response``; callers decide how to treat the status code.
+    """
+    params = with_fields(params, fields)
+    params["api_key"] = api_key if api_key else settings.EPIDATA_API_KEY
+    return get_session().get(
+        f"{base_url or settings.EPIDATA_URL}{endpoint}",
+        params=params,
+        timeout=timeout or get_timeout(),
+    )
+
+
+def single_flight_key(endpoint, params=None, base_url=None, api_key=None):
+    """
+    Cache key identifying an Epidata request by URL, sorted parameters and
+    the API key it runs under.
+
+    Only a digest of the effective key (``api_key`` or ``EPIDATA_API_KEY``) is
+    part of the key, so a body fetched with one key is never handed to a
+    caller using another. An ``api_key`` entry in ``params`` is ignored.
+    """
+    effective_key = api_key or settings.EPIDATA_API_KEY or ""
+    query = {name: str(value) for name, value in (params or {}).items()}
+    query["api_key"] = hashlib.sha256(effective_key.encode()).hexdigest()
+    query = urlencode(sorted(query.items()))
+    url = f"{base_url or settings.EPIDATA_URL}{endpoint}?{query}"
+    return f"epidata_flight:{hashlib.sha256(url.encode()).hexdigest()}"
+
+
+def epidata_get_json(
+    endpoint, params=None, api_key=None, base_url=None, fields=None
+):
+    """
+    Return the decoded JSON body of an Epidata GET, coalescing identical calls.
+
+    The first caller takes a lock in the shared cache and fetches. Other
+    callers with the same API key, in any worker, wait for its result and
+    reuse it. The result is kept for ``EPIDATA_SINGLE_FLIGHT_TTL`` seconds. If
+    the leader fails, the lock is released and the next waiter fetches
+    instead. A waiter that is still blocked after the request timeout fetches
+    on its own. ``fields`` is passed to :func:`epidata_get` and is part of the
+    request's identity.
+
+    Raises:
+        requests.RequestException: The request failed or returned an error
+            status.
+    """
+    params = with_fields(params, fields)
+    key = single_flight_key(endpoint, params, base_url, api_key)
+    lock_key = f"{key}:lock"
+    lock_timeout = settings.EPIDATA_CONNECT_TIMEOUT + settings.EPIDATA_READ_TIMEOUT
+    deadline = time.monotonic() + lock_timeout
+    is_leader = False
+    while True:
+        data = cache.get(key)
+        if data is not None:
+            return data
+        is_leader = cache.add(lock_key, True, timeout=lock_timeout)
+        if is_leader or time.monotonic() >= deadline:
+            break
+        time.sleep(SINGLE_FLIGHT_POLL_INTERVAL)
+    try:
+        response = epidata_get(
+            endpoint, params=params, api_key=api_key, base_url=base_url
+        )
+        response.raise_for_status()
+        data = response.json()
+        cache.set(key, data, settings.EPIDATA_SINGLE_FLIGHT_TTL)
+        return data
+    finally:
+        if is_leader:
+            cache.delete(lock_key)
+
+
+def run_concurrently(calls, max_workers=None, deadline=None):
+    """
+    Run zero-argument callables on a bounded thread pool.
+
+    Results are returned in the same order as ``calls``. A call that is still
+    running once ``deadline`` seconds have passed yields ``None`` and is left to
+    finish in the background. If any call raises, the first exception (in
+    input order) is re-raised without waiting for the remaining calls.
+
+    Args:
+        calls: Iterable of callables taking no arguments.
+        max_workers: Pool size, defaults to ``EPIDATA_MAX_CONCURRENCY``.
+        deadline: Seconds to wait for the batch, defaults to
+            ``EPIDATA_REQUEST_DEADLINE``.
+    """
+    calls = list(calls)
+    if not calls:
+        return []
+    max_workers = min(max_workers or settings.EPIDATA_MAX_CONCURRENCY, len(calls))
+    if deadline is None:
+        deadline = settings.EPIDATA_REQUEST_DEADLINE
+    executor = ThreadPoolExecutor(
+        max_workers=max_workers, thread_name_prefix="epidata"
+    )
+    try:
+        futures = [executor.submit(call) for call in calls]
+        done, not_done = wait(futures, timeout=deadline, return_when=FIRST_EXCEPTION)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+    for future in futures:
+        if future in done and future.exception() is not None:
+            raise future.exception()
+    if not_done:
+        logger.warning(
+            "Epidata requests exceeded deadline",
+            extra={"pending": len(not_done), "deadline": deadline},
+        )
+    return [future.result() if future in done else None for future in futures]
@@ -0,0 +1,93 @@
+"""
+Stale-while-revalidate cache for slowly changing Epidata metadata.
+
+A value is stored under its key for ``EPIDATA_METADATA_HARD_TTL`` seconds and
+a separate ``<key>:fresh`` marker lives for ``EPIDATA_METADATA_SOFT_TTL``.
+Once the marker is gone the value is still served immediately while one
+background thread, elected with ``cache.add`` across all workers, fetches a
+new one. A failed refresh keeps the previous value, so an Epidata outage only
+matters for keys that have never been fetched.
+"""
+
+import threading
+
+import requests
+from delphi_utils import get_structured_logger
+from django.conf import settings
+from django.core.cache import cache
+
+logger = get_structured_logger("epiportal.metadata_cache")
+
+REFRESH_ERRORS = (requests.RequestException, KeyError, ValueError)
+
+
+def _fresh_key(key):
+    return f"{key}:fresh"
+
+
+def _refresh_key(key):
+    return f"{key}:refreshing"
+
+
+def store_metadata(key, value):
+    """Store a freshly fetched ``value`` under ``key``."""
+    cache.set(key, value, timeout=settings.EPIDATA_METADATA_HARD_TTL)
+    cache.set(_fresh_key(key), True, timeout=settings.EPIDATA_METADATA_SOFT_TTL)
+
+
+def _refresh(key, fetch):
+    try:
+        store_metadata(key, fetch())
+    except REFRESH_ERRORS:
+        # The refresh lock is left to expire, which spaces out retries while
+        # Epidata is unavailable.
+        logger.exception("Error refreshing Epidata metadata", extra={"key": key})
+        return
+    cache.delete(_refresh_key(key))
+
+
+def get_cached_metadata(key, fetch):
+    """
+    Return the cached value for ``key``, calling ``fetch()`` when there is none.
+
+    A stale value is returned as is and refreshed in the background. Errors
+    from a synchronous ``fetch()`` propagate to the caller.
+    """
+    cached = cache.get_many([key, _fresh_key(key)])
+    if key not in cached:
+        value = fetch()
+        store_metadata(key, value)
+        return value
+    _refresh_if_stale(key, fetch, cached)
+    return cached[key]
+
+
+def get_many_cached_metadata(fetches):
+    """
+    Return ``{key: value}`` for the keys of a ``{key: fetch}`` mapping that
+    have a cached value, reading them all in one round trip.
+
+    Stale values are refreshed in the background as in
+    :func:`get_cached_metadata`. Keys with no value are left out and are not
+    fetched; the caller decides how to fetch them.
+    """
+    cached = cache.get_many(
+        [name for key in fetches for name in (key, _fresh_key(key))]
+    )
+    values = {}
+    for key, fetch in fetches.items():
+        if key in cached:
+            _refresh_if_stale(key, fetch, cached)
+            values[key] = cached[key]
+    return values
+
+
+def _refresh_if_stale(key, fetch, cached):
+    if _fresh_key(key) not in cached and cache.add(
+        _refresh_key(key),
+        True,
+        timeout=settings.EPIDATA_CONNECT_TIMEOUT + settings.EPIDATA_READ_TIMEOUT,
+    ):
+        threading.Thread(
+            target=_refresh, args=(key, fetch), name="metadata-refresh", daemon=True
+        ).start()
@@ -34,6 +34,30 @@ EPIDATA_URL = os.environ.get("EPIDATA_URL", "https://api.delphi.cmu.edu/epidata/
 EPIDATA_V5_URL = os.environ.get("EPIDATA_V5_URL", "https://delphi.cmu.edu/epidata/v5/")
 EPIDATA_API_KEY = os.environ.get("EPIDATA_API_KEY", "")
 
+# Shared Epidata HTTP client (see epiportal/epidata.py)
+EPIDATA_POOL_CONNECTIONS = int(os.environ.get("EPIDATA_POOL_CONNECTIONS", 4))
+EPIDATA_POOL_MAXSIZE = int(os.environ.get("EPIDATA_POOL_MAXSIZE", 20))
+EPIDATA_CONNECT_TIMEOUT = float(os.environ.get("EPIDATA_CONNECT_TIMEOUT", 5))
+EPIDATA_READ_TIMEOUT = float(os.environ.get("EPIDATA_READ_TIMEOUT", 30))
+EPIDATA_MAX_CONCURRENCY = int(os.environ.get("EPIDATA_MAX_CONCURRENCY", 8))
+EPIDATA_REQUEST_DEADLINE = float(os.environ.get("EPIDATA_REQUEST_DEADLINE", 30))
+# Days at the start of the range a preview requests before the full range
+PREVIEW_HEAD_DAYS = int(os.environ.get("PREVIEW_HEAD_DAYS", 28))
+# Seconds a coalesced Epidata response stays available to waiting workers
+EPIDATA_SINGLE_FLIGHT_TTL = int(os.environ.get("EPIDATA_SINGLE_FLIGHT_TTL", 60))
+# Epidata metadata is refreshed in the background after the soft TTL and
+# served stale until the hard TTL (see epiportal/metadata_cache.py)
+EPIDATA_METADATA_SOFT_TTL = int(os.environ.get("EPIDATA_METADATA_SOFT_TTL", 60 * 60))
+EPIDATA_METADATA_HARD_TTL = int(
+    os.environ.get("EPIDATA_METADATA_HARD_TTL", 60 * 60 * 24 * 7)
+)
+# Seconds a worker keeps its covidcast_meta index before re-reading it
+COVIDCAST_META_REFRESH_INTERVAL = int(
+    os.environ.get("COVIDCAST_META_REFRESH_INTERVAL", 300)
+)
+# Seconds a FluView coverage entry is kept; build_fluview_coverage refreshes it
+FLUVIEW_COVERAGE_TTL = int(os.environ.get("FLUVIEW_COVERAGE_TTL", 60 * 60 * 24 * 2))
+
 SPREADSHEET_URLS = {
     "source_subdivisions": "https://docs.google.com/spreadsheets/d/1zb7ItJzY5oq1n-2xtvnPBiJu2L3AqmCKubrLkKJZVHs/export?format=csv&gid=0",
     "other_endpoint_source_subdivisions": "https://docs.google.com/spreadsheets/d/1zb7ItJzY5oq1n-2xtvnPBiJu2L3AqmCKubrLkKJZVHs/export?format=csv&gid=214580132",
@@ -318,6 +342,18 @@ CACHES: dict[str, dict[str, str]] = {
 
 CACHE_TIME = int(os.environ.get('CACHE_TIME', 60 * 60 * 24))  # 24 hours
 
+# Express View series are extended with the rows since their last cached
+# time_value, re-fetching this many days before it to pick up revisions
+EXPRESS_VIEW_REVISION_LOOKBACK_DAYS = int(
+    os.getenv('EXPRESS_VIEW_REVISION_LOOKBACK_DAYS', 28)
+)
+EXPRESS_VIEW_SERIES_CACHE_TIME = int(
+    os.getenv('EXPRESS_VIEW_SERIES_CACHE_TIME', 60 * 60 * 24 * 30)
+)
+
+# Answer catalog filters from the in-memory index (indicatorsets/catalog_index.py)
+CATALOG_INDEX_ENABLED = bool(strtobool(os.getenv('CATALOG_INDEX_ENABLED', 'True')))
+
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
 
@@ -1,13 +1,21 @@
+from functools import partial
 from io import StringIO
 import json
 import logging
+import threading
+import time
 from unittest.mock import MagicMock, patch
 
+import requests
 from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.core.management import call_command
 from django.http import HttpResponse
 from django.test import RequestFactory, TestCase, override_settings
 
+from epiportal import covidcast_meta
+from epiportal import epidata as epidata_client
+from epiportal import metadata_cache
 from epiportal.block_middleware import BlockIPRangeMiddleware
 from epiportal.logging_formatters import JsonFormatter
 from epiportal.middleware import RequestLoggingMiddleware, _sanitize_headers
@@ -38,6 +46,257 @@ class GetClientIpTests(TestCase):
         self.assertEqual(get_client_ip(request), "192.0.2.44")
 
 
+class EpidataClientTests(TestCase):
+    def test_session_is_reused_within_process(self):
+        self.assertIs(epidata_client.get_session(), epidata_client.get_session())
+
+    @override_settings(EPIDATA_POOL_MAXSIZE=7)
+    def test_session_mounts_pooled_adapter(self):
+        with patch.object(epidata_client, "_session", None):
+            adapter = epidata_client.get_session().get_adapter("https://example.org")
+            self.assertEqual(adapter._pool_maxsize, 7)
+
+    @override_settings(
+        EPIDATA_URL="https://epidata.test/",
+        EPIDATA_API_KEY="server-key",
+        EPIDATA_CONNECT_TIMEOUT=1,
+        EPIDATA_READ_TIMEOUT=2,
+    )
+    @patch("epiportal.epidata.get_session")
+    def test_epidata_get_adds_api_key_and_timeout(self, mock_session):
+        epidata_client.epidata_get("covidcast", params={"api_key": "ignored"})
+        args, kwargs = mock_session.return_value.get.call_args
+        self.assertEqual(args[0], "https://epidata.test/covidcast")
+        self.assertEqual(kwargs["params"]["api_key"], "server-key")
+        self.assertEqual(kwargs["timeout"], (1, 2))
+
+        epidata_client.epidata_get("fluview", api_key="user-key")
+        self.assertEqual(
+            mock_session.return_value.get.call_args.kwargs["params"]["api_key"],
+            "user-key",
+        )
+
+    @patch("epiportal.epidata.get_session")
+    def test_epidata_get_projects_fields(self, mock_session):
+        epidata_client.epidata_get("fluview", fields=("epiweek", "wili"))
+        params = mock_session.return_value.get.call_args.kwargs["params"]
+        self.assertEqual(params["fields"], "epiweek,wili")
+
+        epidata_client.epidata_get("fluview")
+        params = mock_session.return_value.get.call_args.kwargs["params"]
+        self.assertNotIn("fields", params)
+
+
+class SingleFlightTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def _response(self, data):
+        response = MagicMock()
+        response.json.return_value = data
+        return response
+
+    def test_key_ignores_api_key_and_param_order(self):
+        self.assertEqual(
+            epidata_client.single_flight_key("covidcast", {"a": 1, "b": 2}),
+            epidata_client.single_flight_key(
+                "covidcast", {"b": 2, "a": 1, "api_key": "secret"}
+            ),
+        )
+        self.assertNotEqual(
+            epidata_client.single_flight_key("covidcast", {"a": 1}),
+            epidata_client.single_flight_key("fluview", {"a": 1}),
+        )
+        self.assertNotEqual(
+            epidata_client.single_flight_key("covidcast", {"a": 1}),
+            epidata_client.single_flight_key(
+                "covidcast", epidata_client.with_fields({"a": 1}, ["value"])
+            ),
+        )
+
+    @patch("epiportal.epidata.epidata_get")
+    def test_concurrent_identical_calls_fetch_once(self, mock_get):
+        release = threading.Event()
+
+        def fetch(*args, **kwargs):
+            release.wait(1)
+            return self._response({"epidata": [1]})
+
+        mock_get.side_effect = fetch
+        call = partial(epidata_client.epidata_get_json, "covidcast", {"a": 1})
+        calls = [call, call, call]
+        threading.Timer(0.1, release.set).start()
+        results = epidata_client.run_concurrently(calls)
+        self.assertEqual(results, [{"epidata": [1]}] * 3)
+        mock_get.assert_called_once()
+
+    @patch("epiportal.epidata.epidata_get")
+    def test_failure_releases_lock(self, mock_get):
+        response = self._response({})
+        response.raise_for_status.side_effect = requests.HTTPError
+        mock_get.return_value = response
+        with self.assertRaises(requests.HTTPError):
+            epidata_client.epidata_get_json("covidcast", {"a": 1})
+        key = epidata_client.single_flight_key("covidcast", {"a": 1})
+        self.assertIsNone(cache.get(f"{key}:lock"))
+        self.assertIsNone(cache.get(key))
+
+    @patch("epiportal.epidata.epidata_get")
+    def test_calls_with_different_keys_are_not_shared(self, mock_get):
+        mock_get.side_effect = lambda endpoint, api_key=None, **kwargs: (
+            self._response({"epidata": [api_key]})
+        )
+        for api_key in ("key-a", "key-b"):
+            self.assertEqual(
+                epidata_client.epidata_get_json("covidcast", {"a": 1}, api_key),
+                {"epidata": [api_key]},
+            )
+        self.assertEqual(mock_get.call_count, 2)
+
+
+class RunConcurrentlyTests(TestCase):
+    def test_results_follow_input_order(self):
+        def slow(value, delay):
+            time.sleep(delay)
+            return value
+
+        calls = [partial(slow, "a", 0.05), partial(slow, "b", 0), partial(slow, "c", 0.01)]
+        self.assertEqual(epidata_client.run_concurrently(calls), ["a", "b", "c"])
+
+    def test_reraises_first_exception(self):
+        def boom():
+            raise ValueError("boom")
+
+        with self.assertRaises(ValueError):
+            epidata_client.run_concurrently([lambda: 1, boom])
+
+    def test_calls_past_deadline_yield_none(self):
+        event = threading.Event()
+        calls = [lambda: "fast", lambda: event.wait(5)]
+        try:
+            results = epidata_client.run_concurrently(calls, deadline=0.05)
+        finally:
+            event.set()
+        self.assertEqual(results, ["fast", None])
+
+
+class MetadataCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def _join_refresh(self):
+        for thread in threading.enumerate():
+            if thread.name == "metadata-refresh":
+                thread.join(timeout=1)
+
+    def test_miss_fetches_synchronously(self):
+        fetch = MagicMock(return_value=[1])
+        self.assertEqual(metadata_cache.get_cached_metadata("meta", fetch), [1])
+        self.assertEqual(metadata_cache.get_cached_metadata("meta", fetch), [1])
+        fetch.assert_called_once()
+
+    def test_miss_propagates_upstream_error(self):
+        fetch = MagicMock(side_effect=requests.RequestException)
+        with self.assertRaises(requests.RequestException):
+            metadata_cache.get_cached_metadata("meta", fetch)
+
+    def test_stale_value_is_served_and_refreshed_once(self):
+        metadata_cache.store_metadata("meta", [1])
+        cache.delete("meta:fresh")
+        release = threading.Event()
+        fetch = MagicMock(side_effect=lambda: release.wait(1) and [2])
+        self.assertEqual(metadata_cache.get_cached_metadata("meta", fetch), [1])
+        self.assertEqual(metadata_cache.get_cached_metadata("meta", fetch), [1])
+        release.set()
+        self._join_refresh()
+        fetch.assert_called_once()
+        self.assertEqual(metadata_cache.get_cached_metadata("meta", fetch), [2])
+        self.assertIsNone(cache.get("meta:refreshing"))
+
+    def test_failed_refresh_keeps_last_good_value(self):
+        metadata_cache.store_metadata("meta", [1])
+        cache.delete("meta:fresh")
+        fetch = MagicMock(side_effect=requests.RequestException)
+        self.assertEqual(metadata_cache.get_cached_metadata("meta", fetch), [1])
+        self._join_refresh()
+        self.assertEqual(metadata_cache.get_cached_metadata("meta", fetch), [1])
+        fetch.assert_called_once()
+
+
+class CovidcastMetaIndexTests(TestCase):
+    rows = [
+        {
+            "data_source": "src",
+            "signal": "sig",
+            "time_type": "day",
+            "geo_type": "state",
+            "num_locations": 50,
+            "min_time": 20200301,
+            "max_time": 20240101,
+            "last_update": 100,
+        },
+        {
+            "data_source": "src",
+            "signal": "sig",
+            "time_type": "day",
+            "geo_type": "county",
+            "num_locations": 3000,
+            "min_time": 20200101,
+            "max_time": 20231201,
+            "last_update": 200,
+        },
+    ]
+
+    def setUp(self):
+        cache.clear()
+        covidcast_meta.invalidate_covidcast_meta_index()
+
+    def tearDown(self):
+        covidcast_meta.invalidate_covidcast_meta_index()
+
+    def _response(self):
+        response = MagicMock()
+        response.json.return_value = {"epidata": self.rows, "result": 1}
+        return response
+
+    def test_build_summarizes_rows_per_signal(self):
+        index = covidcast_meta.build_covidcast_meta_index(self.rows)
+        self.assertEqual(
+            index[("src", "sig")],
+            {
+                "num_locations": 3050,
+                "last_update": 200,
+                "time_ranges": {"day": (20200101, 20240101)},
+            },
+        )
+
+    @patch("epiportal.covidcast_meta.epidata_get")
+    def test_index_is_fetched_once_and_shared_through_cache(self, mock_get):
+        mock_get.return_value = self._response()
+        self.assertEqual(covidcast_meta.get_signal_meta("src", "sig")["last_update"], 200)
+        covidcast_meta.invalidate_covidcast_meta_index()
+        self.assertIsNotNone(covidcast_meta.get_covidcast_meta_index())
+        mock_get.assert_called_once()
+
+    @patch("epiportal.covidcast_meta.epidata_get", side_effect=requests.RequestException)
+    def test_upstream_failure_returns_none(self, _mock_get):
+        self.assertIsNone(covidcast_meta.get_covidcast_meta_index())
+        self.assertIsNone(covidcast_meta.get_signal_meta("src", "sig"))
+
+    @override_settings(COVIDCAST_META_REFRESH_INTERVAL=0)
+    @patch("epiportal.covidcast_meta.epidata_get")
+    def test_stale_index_is_served_while_refreshing(self, mock_get):
+        mock_get.return_value = self._response()
+        first = covidcast_meta.get_covidcast_meta_index()
+        cache.set(covidcast_meta.COVIDCAST_META_INDEX_CACHE_KEY, {"new": True})
+        time.sleep(0.01)
+        self.assertIs(covidcast_meta.get_covidcast_meta_index(), first)
+        for thread in threading.enumerate():
+            if thread.name == "covidcast-meta-refresh":
+                thread.join(timeout=1)
+        self.assertEqual(covidcast_meta._index, {"new": True})
+
+
 class InitAdminCommandTests(TestCase):
     def test_creates_superuser_when_missing(self):
         out = StringIO()
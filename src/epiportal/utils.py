@@ -2,9 +2,22 @@
 Shared utilities for epiportal.
 """
 
+import json
+import zlib
+
 from django.conf import settings
 
 
+def compress_json(data) -> bytes:
+    """Serialize ``data`` as compact JSON and zlib-compress it for the cache."""
+    return zlib.compress(json.dumps(data, separators=(",", ":")).encode())
+
+
+def decompress_json(blob: bytes):
+    """Inverse of :func:`compress_json`."""
+    return json.loads(zlib.decompress(blob))
+
+
 def get_client_ip(request) -> str:
     """
     Extract the real client IP from a request, respecting X-Forwarded-For when behind proxies.
@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class IndicatorsetsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'indicatorsets'
+
+    def ready(self):
+        from indicatorsets.signals import connect_signals
+
+        connect_signals()
@@ -0,0 +1,392 @@
+"""
+Process-local index of the indicator set catalog.
+
+The catalog holds a few hundred indicator sets, so each facet value is kept as
+a bitset (a Python int with one bit per indicator set) and a filter combination
+is answered with bitwise AND/OR instead of joined MySQL queries. The index is
+rebuilt whenever the catalog version changes.
+
+:func:`select_indicator_sets` mirrors the semantics of
+:class:`indicatorsets.filters.IndicatorSetFilter` and falls back to it when
+``CATALOG_INDEX_ENABLED`` is off.
+"""
+
+import threading
+
+from django.conf import settings
+from django_filters.widgets import QueryArrayWidget
+
+from base.utils import get_catalog_version
+from indicators.models import Indicator
+from indicatorsets.filters import IndicatorSetFilter
+from indicatorsets.geo_coverage import get_indicator_ids_covering
+from indicatorsets.models import IndicatorSet, OriginalDataProvider
+
+RELATED_INDICATOR_FIELDS = (
+    "id",
+    "display_name",
+    "member_name",
+    "member_short_name",
+    "name",
+    "indicator_set__id",
+    "indicator_set__name",
+    "indicator_set__short_name",
+    "indicator_set__epidata_endpoint",
+    "source__name",
+    "time_type",
+    "description",
+    "member_description",
+    "indicator_set__dua_required",
+    "source_type",
+)
+
+M2M_FACETS = ("pathogens", "geographic_levels", "severity_pyramid_rungs")
+
+HOSTED_BY_DELPHI_SOURCE_TYPES = ("covidcast", "other_endpoint")
+
+CHECKED_VALUES = ("true", "on", "1", "yes")
+
+_query_array_widget = QueryArrayWidget()
+
+
+def _positions(bits):
+    positions = []
+    position = 0
+    while bits:
+        if bits & 1:
+            positions.append(position)
+        bits >>= 1
+        position += 1
+    return positions
+
+
+class CatalogSelection:
+    """
+    Indicator sets and related indicators matching one filter combination.
+
+    ``indicators`` are ``RELATED_INDICATOR_FIELDS`` value dicts in the
+    ``Indicator`` model ordering. ``location_search_failed`` is set when the
+    location coverage lookup failed, so the selection should not be cached.
+    """
+
+    def __init__(self, indicator_set_ids, indicators, location_search_failed=False):
+        self.indicator_set_ids = indicator_set_ids
+        self.indicators = indicators
+        self.location_search_failed = location_search_failed
+
+
+class CatalogIndex:
+    def __init__(self, version):
+        self.version = version
+        self.set_ids = []
+        self.all_bits = 0
+        self.facets = {name: {} for name in M2M_FACETS}
+        self.provider_bits = {}
+        self.provider_ids_by_name = {}
+        self.granularity_bits = {
+            choice: 0
+            for choice, _ in IndicatorSetFilter.base_filters[
+                "temporal_granularity"
+            ].extra["choices"]
+        }
+        self.temporal_scope_end_bits = {}
+        self.hosted_by_delphi_bits = 0
+        self.indicators = []
+        self.indicator_set_positions = []
+
+    @classmethod
+    def build(cls, version):
+        index = cls(version)
+        position_of = {}
+        rows = IndicatorSet.objects.order_by("id").values_list(
+            "id",
+            "original_data_provider_id",
+            "temporal_granularity",
+            "temporal_scope_end",
+            "source_type",
+        )
+        for position, row in enumerate(rows):
+            set_id, provider_id, granularity, scope_end, source_type = row
+            bit = 1 << position
+            position_of[set_id] = position
+            index.set_ids.append(set_id)
+            index.all_bits |= bit
+            if provider_id is not None:
+                index.provider_bits[provider_id] = (
+                    index.provider_bits.get(provider_id, 0) | bit
+                )
+            for choice in index.granularity_bits:
+                if choice in (granularity or ""):
+                    index.granularity_bits[choice] |= bit
+            index.temporal_scope_end_bits[scope_end] = (
+                index.temporal_scope_end_bits.get(scope_end, 0) | bit
+            )
+            if source_type in HOSTED_BY_DELPHI_SOURCE_TYPES:
+                index.hosted_by_delphi_bits |= bit
+
+        for facet in M2M_FACETS:
+            field = IndicatorSet._meta.get_field(facet)
+            values = index.facets[facet]
+            for set_id, value_id in field.remote_field.through.objects.values_list(
+                f"{field.m2m_field_name()}_id", f"{field.m2m_reverse_field_name()}_id"
+            ):
+                values[value_id] = values.get(value_id, 0) | (1 << position_of[set_id])
+
+        index.provider_ids_by_name = dict(
+            OriginalDataProvider.objects.values_list("name", "id")
+        )
+
+        for row in (
+            Indicator.objects.filter(indicator_set__isnull=False)
+            .order_by("name", "id")
+            .values(*RELATED_INDICATOR_FIELDS, "temporal_scope_end")
+        ):
+            index.indicator_set_positions.append(position_of[row["indicator_set__id"]])
+            index.indicators.append(row)
+        return index
+
+    def _m2m_bits(self, facet, data):
+        """
+        OR of the selected values, or ``None`` when the filter does not apply.
+
+        Like ``ModelMultipleChoiceFilter``, an unknown or malformed value makes
+        the whole field invalid, and an invalid field is ignored.
+        """
+        raw_values = _query_array_widget.value_from_datadict(data, None, facet)
+        if not raw_values:
+            return None
+        bits = 0
+        for raw_value in raw_values:
+            try:
+                value_bits = self.facets[facet].get(int(raw_value))
+            except (TypeError, ValueError):
+                return None
+            if value_bits is None:
+                return None
+            bits |= value_bits
+        return bits
+
+    def _provider_bits(self, data):
+        odp = (data.get("odp") or "").strip()
+        legacy = _query_array_widget.value_from_datadict(
+            data, None, "original_data_provider"
+        )
+        if not odp and not legacy:
+            return None
+        raw_values = []
+        for odp_value in data.getlist("odp"):
+            raw_values.extend(v.strip() for v in odp_value.split(",") if v.strip())
+        raw_values.extend(data.getlist("original_data_provider"))
+        provider_ids = set()
+        for value in raw_values:
+            if str(value).isdigit():
+                provider_ids.add(int(value))
+            elif value in self.provider_ids_by_name:
+                provider_ids.add(self.provider_ids_by_name[value])
+        if not provider_ids:
+            return None
+        bits = 0
+        for provider_id in provider_ids:
+            bits |= self.provider_bits.get(provider_id, 0)
+        return bits
+
+    def _temporal_granularity_bits(self, data):
+        values = _query_array_widget.value_from_datadict(
+            data, None, "temporal_granularity"
+        )
+        if not values or not set(values) <= self.granularity_bits.keys():
+            return None
+        bits = 0
+        for value in values:
+            bits |= self.granularity_bits[value]
+        return bits
+
+    @staticmethod
+    def _scope_end(data):
+        scope_end = data.get("temporal_scope_end")
+        return scope_end if scope_end == "Ongoing" else None
+
+    def _filter_bits(self, data):
+        """Bits of every filter that applies to ``data``, keyed by facet."""
+        filters = {}
+        for facet in M2M_FACETS:
+            facet_bits = self._m2m_bits(facet, data)
+            if facet_bits is not None:
+                filters[facet] = facet_bits
+
+        provider_bits = self._provider_bits(data)
+        if provider_bits is not None:
+            filters["odp"] = provider_bits
+
+        granularity_bits = self._temporal_granularity_bits(data)
+        if granularity_bits is not None:
+            filters["temporal_granularity"] = granularity_bits
+
+        scope_end = self._scope_end(data)
+        if scope_end:
+            filters["temporal_scope_end"] = self.temporal_scope_end_bits.get(
+                scope_end, 0
+            )
+
+        hosted_by_delphi = (data.get("hosted_by_delphi") or "").strip().lower()
+        if hosted_by_delphi in CHECKED_VALUES:
+            filters["hosted_by_delphi"] = self.hosted_by_delphi_bits
+        return filters
+
+    @staticmethod
+    def _location_coverage(data):
+        """
+        Return ``(covered, include_fluview, ok)`` for ``location_search``, or
+        ``None`` when no location is selected.
+        """
+        locations = _query_array_widget.value_from_datadict(
+            data, None, "location_search"
+        )
+        if not locations:
+            return None
+        value = str(locations)
+        covered, ok = get_indicator_ids_covering(value)
+        return covered, IndicatorSetFilter.include_fluview(value), ok
+
+    def _indicator_positions(self, scope_end, coverage):
+        positions = range(len(self.indicators))
+        if scope_end:
+            positions = [
+                i
+                for i in positions
+                if self.indicators[i]["temporal_scope_end"] == scope_end
+            ]
+        if coverage is None:
+            return positions
+        covered, include_fluview, _ = coverage
+        if not covered and not include_fluview:
+            return positions
+        return [
+            i
+            for i in positions
+            if self.indicators[i]["id"] in covered
+            or (
+                include_fluview
+                and self.indicators[i]["indicator_set__epidata_endpoint"] == "fluview"
+            )
+        ]
+
+    def _set_bits(self, indicator_positions):
+        bits = 0
+        for i in indicator_positions:
+            bits |= 1 << self.indicator_set_positions[i]
+        return bits
+
+    def select(self, data):
+        """
+        Apply the ``IndicatorSetFilter`` parameters in ``data`` to the index.
+        """
+        bits = self.all_bits
+        for facet_bits in self._filter_bits(data).values():
+            bits &= facet_bits
+
+        coverage = self._location_coverage(data)
+        indicator_positions = self._indicator_positions(
+            self._scope_end(data), coverage
+        )
+        if coverage is not None:
+            bits &= self._set_bits(indicator_positions)
+
+        indicators = [
+            self.indicators[i]
+            for i in indicator_positions
+            if bits >> self.indicator_set_positions[i] & 1
+        ]
+        return CatalogSelection(
+            [self.set_ids[position] for position in _positions(bits)],
+            indicators,
+            location_search_failed=coverage is not None and not coverage[2],
+        )
+
+    def facet_values(self):
+        """Return ``{facet: {value: bits}}`` for every selectable facet value."""
+        values = {facet: self.facets[facet] for facet in M2M_FACETS}
+        values["odp"] = self.provider_bits
+        values["temporal_granularity"] = self.granularity_bits
+        values["temporal_scope_end"] = {
+            "Ongoing": self.temporal_scope_end_bits.get("Ongoing", 0)
+        }
+        values["hosted_by_delphi"] = {"on": self.hosted_by_delphi_bits}
+        return values
+
+    def facet_counts(self, data):
+        """
+        Count the indicator sets each facet value would yield under ``data``.
+
+        Values of one facet are OR-ed together, so each facet is counted with
+        every other filter applied but its own selection left out.
+        """
+        filters = self._filter_bits(data)
+        scope_end = self._scope_end(data)
+        coverage = self._location_coverage(data)
+        location_bits = self.all_bits
+        if coverage is not None:
+            location_bits = self._set_bits(
+                self._indicator_positions(scope_end, coverage)
+            )
+
+        counts = {}
+        for facet, values in self.facet_values().items():
+            bits = self.all_bits
+            for name, facet_bits in filters.items():
+                if name != facet:
+                    bits &= facet_bits
+            if facet == "temporal_scope_end" and coverage is not None:
+                # location_search only looks at indicators in the scope
+                counts[facet] = {
+                    value: (
+                        bits
+                        & value_bits
+                        & self._set_bits(self._indicator_positions(value, coverage))
+                    ).bit_count()
+                    for value, value_bits in values.items()
+                }
+                continue
+            bits &= location_bits
+            counts[facet] = {
+                value: (bits & value_bits).bit_count()
+                for value, value_bits in values.items()
+            }
+        return counts
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_catalog_index():
+    """Return the catalog index for the current catalog version."""
+    global _index
+    version = get_catalog_version()
+    if _index is None or _index.version != version:
+        with _index_lock:
+            if _index is None or _index.version != version:
+                _index = CatalogIndex.build(version)
+    return _index
+
+
+def select_indicator_sets(data):
+    """
+    Return the :class:`CatalogSelection` for the filter parameters in ``data``
+    (a ``QueryDict``, usually ``request.GET``).
+    """
+    if settings.CATALOG_INDEX_ENABLED:
+        return get_catalog_index().select(data)
+
+    filterset = IndicatorSetFilter(data, queryset=IndicatorSet.objects.all())
+    indicator_set_ids = list(filterset.qs.order_by("id").values_list("id", flat=True))
+    indicators = list(
+        filterset.indicators_qs.filter(indicator_set__id__in=indicator_set_ids)
+        .order_by("name", "id")
+        .values(*RELATED_INDICATOR_FIELDS)
+    )
+    return CatalogSelection(
+        indicator_set_ids,
+        indicators,
+        location_search_failed=filterset.location_search_failed,
+    )
@@ -8,8 +8,8 @@ from django_filters.widgets import QueryArrayWidget
 
 
 from indicatorsets.models import IndicatorSet
+from indicatorsets.geo_coverage import get_indicator_ids_covering
 from indicatorsets.utils import (
-    get_list_of_indicators_filtered_by_geo,
     parse_original_data_provider_ids,
 )
 from indicators.models import Indicator
@@ -23,6 +23,8 @@ logger = logging.getLogger(__name__)
 class IndicatorSetFilter(django_filters.FilterSet):
 
     indicators_qs = Indicator.objects.filter(indicator_set__isnull=False).select_related("indicator_set", "source")
+    # Set when the location coverage lookup for location_search failed
+    location_search_failed = False
 
     pathogens = django_filters.ModelMultipleChoiceFilter(
         field_name="pathogens",
@@ -150,12 +152,12 @@ class IndicatorSetFilter(django_filters.FilterSet):
         if not value:
             return queryset
         indicator_sets = []
-        filtered_indicators = get_list_of_indicators_filtered_by_geo(value)
+        covered_ids, ok = get_indicator_ids_covering(value)
+        self.location_search_failed = not ok
         include_fluview = self.include_fluview(value)
         query = Q()
-        if filtered_indicators["epidata"]:
-            for item in filtered_indicators["epidata"]:
-                query |= Q(source__name=item["source"], name=item["signal"])
+        if covered_ids:
+            query |= Q(id__in=covered_ids)
         if include_fluview:
             query |= Q(indicator_set__epidata_endpoint="fluview")
         self.indicators_qs = self.indicators_qs.filter(query)
@@ -0,0 +1,151 @@
+"""
+Precomputed coverage of the FluView endpoints per region and indicator.
+
+For every ``(endpoint, region)`` the cache holds
+``{indicator: {"has_data", "first", "last"}}``, where ``first`` and ``last``
+are the first and last epiweeks with a non-zero value. The table is rebuilt
+nightly with ``manage.py build_fluview_coverage``; a region missing from it is
+computed on first use. Entries expire after ``FLUVIEW_COVERAGE_TTL`` seconds,
+so coverage computed on first use is refreshed even if the rebuild stops.
+Only ``FLUVIEW_REGIONS`` are ever fetched.
+"""
+
+from datetime import datetime
+from functools import partial
+
+import requests
+from delphi_utils import get_structured_logger
+from django.conf import settings
+from django.core.cache import cache
+from epiweeks import Week
+
+from epiportal.epidata import epidata_get, run_concurrently
+
+logger = get_structured_logger("indicatorsets.fluview_coverage")
+
+FLUVIEW_COVERAGE_ENDPOINTS = ("fluview", "fluview_clinical")
+
+FLUVIEW_COVERAGE_START_EPIWEEK = 199740
+
+# Locations offered by the FluView location select (assets/js/indicatorHandler.js)
+FLUVIEW_REGIONS = (
+    ["nat"]
+    + [f"hhs{number}" for number in range(1, 11)]
+    + [f"cen{number}" for number in range(1, 10)]
+    + [
+        "AK", "AL", "AR", "AZ", "CA", "CO", "CT", "DC", "DE", "FL", "GA", "HI",
+        "IA", "ID", "IL", "IN", "KS", "KY", "LA", "MA", "MD", "ME", "MI", "MN",
+        "MO", "MS", "MT", "NC", "ND", "NE", "NH", "NJ", "NM", "NV", "NY", "OH",
+        "OK", "OR", "PA", "RI", "SC", "SD", "TN", "TX", "UT", "VA", "VT", "WA",
+        "WI", "WV", "WY",
+    ]
+    + ["ny_minus_jfk", "as", "mp", "gu", "pr", "vi", "ord", "lax", "jfk"]
+)
+
+# Row columns that describe the row rather than an indicator
+NON_INDICATOR_FIELDS = {"release_date", "region", "issue", "epiweek", "lag"}
+
+
+def fluview_coverage_cache_key(endpoint, region):
+    return f"fluview_coverage:{endpoint}:{region}"
+
+
+def current_epiweek():
+    week = Week.fromdate(datetime.today())
+    return f"{week.year}{week.week:02d}"
+
+
+def build_region_coverage(rows):
+    """Summarize FluView rows as ``{indicator: {"has_data", "first", "last"}}``."""
+    coverage = {}
+    for row in sorted(rows, key=lambda row: row["epiweek"]):
+        for field, value in row.items():
+            if field in NON_INDICATOR_FIELDS:
+                continue
+            entry = coverage.setdefault(
+                field, {"has_data": False, "first": None, "last": None}
+            )
+            if value:
+                entry["has_data"] = True
+                if entry["first"] is None:
+                    entry["first"] = row["epiweek"]
+                entry["last"] = row["epiweek"]
+    return coverage
+
+
+def fetch_region_coverage(endpoint, region):
+    """
+    Fetch the full history of ``region`` from ``endpoint``, store its coverage
+    and return it.
+
+    Raises:
+        requests.RequestException: The upstream request failed.
+    """
+    response = epidata_get(
+        endpoint,
+        params={
+            "regions": region,
+            "epiweeks": f"{FLUVIEW_COVERAGE_START_EPIWEEK}-{current_epiweek()}",
+        },
+    )
+    response.raise_for_status()
+    coverage = build_region_coverage(response.json()["epidata"] or [])
+    cache.set(
+        fluview_coverage_cache_key(endpoint, region),
+        coverage,
+        timeout=settings.FLUVIEW_COVERAGE_TTL,
+    )
+    return coverage
+
+
+def get_region_coverage(endpoint, region):
+    """
+    Return the coverage of ``region`` on ``endpoint``, computing it if it has
+    not been built yet, or ``None`` if it cannot be fetched.
+
+    A region outside ``FLUVIEW_REGIONS`` has no coverage.
+    """
+    if region not in FLUVIEW_REGIONS:
+        return {}
+    coverage = cache.get(fluview_coverage_cache_key(endpoint, region))
+    if coverage is not None:
+        return coverage
+    try:
+        return fetch_region_coverage(endpoint, region)
+    except requests.RequestException:
+        logger.exception(
+            "Error getting fluview coverage",
+            extra={"endpoint": endpoint, "region": region},
+        )
+        return None
+
+
+def _rebuild_region_coverage(endpoint, region):
+    try:
+        fetch_region_coverage(endpoint, region)
+    except requests.RequestException:
+        logger.exception(
+            "Error rebuilding fluview coverage",
+            extra={"endpoint": endpoint, "region": region},
+        )
+        return False
+    return True
+
+
+def rebuild_fluview_coverage(
+    endpoints=FLUVIEW_COVERAGE_ENDPOINTS, regions=FLUVIEW_REGIONS
+):
+    """
+    Recompute the coverage of every endpoint and region.
+
+    Returns the ``(endpoint, region)`` pairs that could not be fetched; their
+    previous coverage is kept.
+    """
+    pairs = [(endpoint, region) for endpoint in endpoints for region in regions]
+    results = run_concurrently(
+        [partial(_rebuild_region_coverage, *pair) for pair in pairs],
+        # Each call is bounded by the read timeout; never give up on the batch
+        deadline=len(pairs)
+        * (settings.EPIDATA_CONNECT_TIMEOUT + settings.EPIDATA_READ_TIMEOUT),
+    )
+    return [pair for pair, ok in zip(pairs, results) if not ok]
@@ -0,0 +1,286 @@
+"""
+Geographic coverage of covidcast indicators.
+
+The geos covered by each ``(data_source, signal)`` come from Epidata's
+``covidcast/geo_indicator_coverage`` and are cached per signal as
+stale-while-revalidate metadata (see :mod:`epiportal.metadata_cache`).
+``manage.py build_geo_coverage`` refreshes all of them, and the coverage of
+any combination of signals is the union of their cached sets.
+
+For location search every worker inverts the cached lists into a
+``geo -> bitset of indicators`` index, so a search is a few dict lookups. The
+index is rebuilt when the catalog version or the coverage generation changes.
+The generation is a counter shared by all workers and bumped by
+:func:`rebuild_geo_coverage`. Signals whose coverage was not cached when the
+index was built are looked up again on every use and patched in once some
+request has fetched them. Until every covidcast signal has cached coverage,
+location search falls back to a live ``covidcast/geo_coverage`` call.
+"""
+
+import ast
+import threading
+import time
+from functools import partial
+from urllib.parse import quote
+
+from delphi_utils import get_structured_logger
+from django.conf import settings
+from django.core.cache import cache
+
+from base.utils import get_catalog_version
+from epiportal.epidata import epidata_get, run_concurrently
+from epiportal.metadata_cache import (
+    REFRESH_ERRORS,
+    get_many_cached_metadata,
+    store_metadata,
+)
+from indicators.models import Indicator
+from indicatorsets.utils import get_list_of_indicators_filtered_by_geo
+
+logger = get_structured_logger("indicatorsets.geo_coverage")
+
+GEO_COVERAGE_GENERATION_CACHE_KEY = "geo_coverage_generation"
+
+
+def get_coverage_generation():
+    """
+    Return the current coverage generation shared by all workers.
+
+    Like the catalog version, it is seeded from the clock so that a flushed
+    cache never hands out a generation a worker has already built an index for.
+    """
+    generation = cache.get(GEO_COVERAGE_GENERATION_CACHE_KEY)
+    if generation is None:
+        seed = time.time_ns()
+        cache.add(GEO_COVERAGE_GENERATION_CACHE_KEY, seed, timeout=None)
+        generation = cache.get(GEO_COVERAGE_GENERATION_CACHE_KEY, seed)
+    return generation
+
+
+def bump_coverage_generation():
+    """Make every worker rebuild its geo coverage index on next use."""
+    try:
+        return cache.incr(GEO_COVERAGE_GENERATION_CACHE_KEY)
+    except ValueError:
+        get_coverage_generation()
+        return cache.incr(GEO_COVERAGE_GENERATION_CACHE_KEY)
+
+
+def signal_coverage_cache_key(data_source, signal):
+    return ":".join(
+        ("geo_coverage", quote(data_source, safe=""), quote(signal, safe=""))
+    )
+
+
+def fetch_signal_coverage(data_source, signal):
+    """
+    Fetch the sorted ``geo_type:geo_value`` ids covered by one signal.
+
+    Raises:
+        requests.RequestException: The upstream request failed.
+    """
+    response = epidata_get(
+        "covidcast/geo_indicator_coverage",
+        params={"data_source": data_source, "signals": signal},
+    )
+    response.raise_for_status()
+    return sorted({geo.lower() for geo in response.json()["epidata"] or []})
+
+
+def refresh_signal_coverage(data_source, signal):
+    """Fetch and cache the coverage of one signal, and return it."""
+    coverage = fetch_signal_coverage(data_source, signal)
+    store_metadata(signal_coverage_cache_key(data_source, signal), coverage)
+    return coverage
+
+
+def _load_signal_coverage(data_source, signal):
+    try:
+        return refresh_signal_coverage(data_source, signal)
+    except REFRESH_ERRORS:
+        logger.exception(
+            "Error getting geo indicator coverage",
+            extra={"data_source": data_source, "signal": signal},
+        )
+        return None
+
+
+def get_signals_coverage(signals):
+    """
+    Return the set of geos covered by any of ``signals``, an iterable of
+    ``(data_source, signal)`` pairs.
+
+    Cached coverage is read in one batch and the rest is fetched concurrently
+    and cached. Signals whose coverage cannot be fetched are left out.
+    """
+    signals = list(dict.fromkeys(signals))
+    keys = [signal_coverage_cache_key(*pair) for pair in signals]
+    cached = get_many_cached_metadata(
+        {
+            key: partial(fetch_signal_coverage, *pair)
+            for key, pair in zip(keys, signals)
+        }
+    )
+    coverage = set()
+    for geos in cached.values():
+        coverage.update(geos)
+    missing = [pair for key, pair in zip(keys, signals) if key not in cached]
+    for geos in run_concurrently(
+        [partial(_load_signal_coverage, *pair) for pair in missing]
+    ):
+        coverage.update(geos or ())
+    return coverage
+
+
+def covidcast_signals():
+    """Return the ``(data_source, signal)`` pairs of the covidcast indicators."""
+    return list(
+        Indicator.objects.filter(source_type="covidcast", source__isnull=False)
+        .order_by("source__name", "name")
+        .values_list("source__name", "name")
+        .distinct()
+    )
+
+
+def _rebuild_signal_coverage(data_source, signal):
+    try:
+        refresh_signal_coverage(data_source, signal)
+    except REFRESH_ERRORS:
+        logger.exception(
+            "Error rebuilding geo coverage",
+            extra={"data_source": data_source, "signal": signal},
+        )
+        return False
+    return True
+
+
+def rebuild_geo_coverage(signals=None):
+    """
+    Refetch the coverage of ``signals`` (default: every covidcast indicator).
+
+    Returns the ``(data_source, signal)`` pairs that could not be fetched;
+    their previous coverage is kept. Workers rebuild their index afterwards.
+    """
+    signals = covidcast_signals() if signals is None else signals
+    results = run_concurrently(
+        [partial(_rebuild_signal_coverage, *pair) for pair in signals],
+        # Each call is bounded by the read timeout; never give up on the batch
+        deadline=len(signals)
+        * (settings.EPIDATA_CONNECT_TIMEOUT + settings.EPIDATA_READ_TIMEOUT),
+    )
+    if any(results):
+        bump_coverage_generation()
+    return [pair for pair, ok in zip(signals, results) if not ok]
+
+
+class GeoCoverageIndex:
+    def __init__(self, version):
+        self.version = version
+        self.indicator_ids = []
+        self.bits_by_pair = {}
+        self.bits_by_geo = {}
+        # Cache keys of the signals without cached coverage, by pair
+        self.missing_keys = {}
+
+    @classmethod
+    def build(cls, version):
+        index = cls(version)
+        rows = Indicator.objects.filter(
+            source_type="covidcast", source__isnull=False
+        ).values_list("id", "source__name", "name")
+        for position, (indicator_id, data_source, signal) in enumerate(rows):
+            index.indicator_ids.append(indicator_id)
+            pair = (data_source, signal)
+            index.bits_by_pair[pair] = index.bits_by_pair.get(pair, 0) | (
+                1 << position
+            )
+
+        index.missing_keys = {
+            pair: signal_coverage_cache_key(*pair) for pair in index.bits_by_pair
+        }
+        index.fill_missing()
+        return index
+
+    @property
+    def complete(self):
+        return not self.missing_keys
+
+    def fill_missing(self):
+        """Add the coverage cached since the index was built for missing signals."""
+        cached = cache.get_many(self.missing_keys.values())
+        if not cached:
+            return
+        # Readers may be using the current dicts, so swap in updated copies
+        bits_by_geo = dict(self.bits_by_geo)
+        missing_keys = {}
+        for pair, key in self.missing_keys.items():
+            if key not in cached:
+                missing_keys[pair] = key
+                continue
+            for geo in cached[key]:
+                bits_by_geo[geo] = bits_by_geo.get(geo, 0) | self.bits_by_pair[pair]
+        self.bits_by_geo = bits_by_geo
+        self.missing_keys = missing_keys
+
+    def _ids(self, bits):
+        return {
+            indicator_id
+            for position, indicator_id in enumerate(self.indicator_ids)
+            if bits >> position & 1
+        }
+
+    def indicator_ids_for_geos(self, geos):
+        bits = 0
+        for geo in geos:
+            bits |= self.bits_by_geo.get(geo.lower(), 0)
+        return self._ids(bits)
+
+    def indicator_ids_for_signals(self, pairs):
+        bits = 0
+        for pair in pairs:
+            bits |= self.bits_by_pair.get(pair, 0)
+        return self._ids(bits)
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_geo_coverage_index():
+    """
+    Return the geo coverage index for the current catalog version and
+    coverage generation.
+    """
+    global _index
+    version = (get_catalog_version(), get_coverage_generation())
+    index = _index
+    if index is None or index.version != version:
+        with _index_lock:
+            if _index is None or _index.version != version:
+                _index = GeoCoverageIndex.build(version)
+            index = _index
+    elif not index.complete:
+        with _index_lock:
+            index.fill_missing()
+    return index
+
+
+def get_indicator_ids_covering(location_search):
+    """
+    Return ``(ids, ok)``: the IDs of covidcast indicators with data for any of
+    the locations in a ``location_search`` value (the string form of a list of
+    ``geo_type:geo_value`` ids), and whether they could be determined. ``ok``
+    is ``False`` when the live fallback failed, and ``ids`` is then empty.
+    """
+    index = get_geo_coverage_index()
+    if index.complete:
+        return index.indicator_ids_for_geos(ast.literal_eval(location_search)), True
+    response = get_list_of_indicators_filtered_by_geo(location_search)
+    covered = {(item["source"], item["signal"]) for item in response["epidata"]}
+    return index.indicator_ids_for_signals(covered), response.get("result") != -1
+
+
+def invalidate_geo_coverage_index():
+    global _index
+    with _index_lock:
+        _index = None
@@ -0,0 +1,73 @@
+import gzip
+import json
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.core.serializers.json import DjangoJSONEncoder
+
+from indicatorsets.views import (
+    format_related_indicators,
+    format_related_indicators_columnar,
+)
+
+
+class Command(BaseCommand):
+    help = "Compare the row and columnar related-indicators payloads on synthetic data"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--indicators", type=int, default=5000)
+        parser.add_argument("--sets", type=int, default=300)
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        rows = self._build_rows(options["indicators"], options["sets"])
+        for label, formatter in [
+            ("rows", format_related_indicators),
+            ("columnar", format_related_indicators_columnar),
+        ]:
+            timings = []
+            for _ in range(options["repeat"]):
+                started = time.perf_counter()
+                content = json.dumps(
+                    {"related_indicators": formatter(rows)}, cls=DjangoJSONEncoder
+                ).encode()
+                timings.append(time.perf_counter() - started)
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"{label}: {len(content):,} bytes, "
+                    f"{len(gzip.compress(content)):,} gzipped, "
+                    f"best {min(timings) * 1000:.1f}ms, "
+                    f"mean {sum(timings) / len(timings) * 1000:.1f}ms "
+                    f"over {len(timings)} runs"
+                )
+            )
+
+    @staticmethod
+    def _build_rows(indicators, sets):
+        rng = random.Random(0)
+        sources = [f"source_{i}" for i in range(max(sets // 10, 1))]
+        rows = []
+        for i in range(indicators):
+            set_id = i % sets
+            name = f"signal_{i}"
+            rows.append(
+                {
+                    "id": i,
+                    "display_name": "" if rng.random() < 0.5 else f"Signal {i}",
+                    "member_name": f"Member {i}" if rng.random() < 0.7 else "",
+                    "member_short_name": f"m{i}",
+                    "name": name,
+                    "indicator_set__id": set_id,
+                    "indicator_set__name": f"Indicator set number {set_id}",
+                    "indicator_set__short_name": f"set_{set_id}",
+                    "indicator_set__epidata_endpoint": "covidcast",
+                    "source__name": sources[set_id % len(sources)],
+                    "time_type": rng.choice(["day", "week"]),
+                    "description": f"Description of {name} " * 4,
+                    "member_description": "",
+                    "indicator_set__dua_required": "No",
+                    "source_type": "covidcast",
+                }
+            )
+        return rows
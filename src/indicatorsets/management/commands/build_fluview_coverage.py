@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand
+
+from indicatorsets.fluview_coverage import (
+    FLUVIEW_COVERAGE_ENDPOINTS,
+    FLUVIEW_REGIONS,
+    rebuild_fluview_coverage,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the FluView coverage table used by check_fluview_geo_coverage. "
+        "Run after the nightly Epidata update."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--endpoints",
+            nargs="+",
+            choices=FLUVIEW_COVERAGE_ENDPOINTS,
+            default=list(FLUVIEW_COVERAGE_ENDPOINTS),
+            help="Endpoints to rebuild (default: all)",
+        )
+        parser.add_argument(
+            "--regions",
+            nargs="+",
+            choices=FLUVIEW_REGIONS,
+            default=list(FLUVIEW_REGIONS),
+            help="Regions to rebuild (default: every FluView location)",
+        )
+
+    def handle(self, *args, **options):
+        endpoints, regions = options["endpoints"], options["regions"]
+        failed = rebuild_fluview_coverage(endpoints, regions)
+        total = len(endpoints) * len(regions)
+        for endpoint, region in failed:
+            self.stderr.write(f"Could not rebuild {endpoint} coverage for {region}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Rebuilt coverage for {total - len(failed)} of {total} "
+                "endpoint/region pairs"
+            )
+        )
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from indicatorsets.geo_coverage import covidcast_signals, rebuild_geo_coverage
+
+
+class Command(BaseCommand):
+    help = (
+        "Refetch the geographic coverage of covidcast signals used by location "
+        "search. Run after the nightly Epidata update."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--data-sources",
+            nargs="+",
+            help="Only refetch signals of these data sources (default: all)",
+        )
+
+    def handle(self, *args, **options):
+        signals = covidcast_signals()
+        if options["data_sources"]:
+            signals = [
+                pair for pair in signals if pair[0] in options["data_sources"]
+            ]
+        failed = rebuild_geo_coverage(signals)
+        for data_source, signal in failed:
+            self.stderr.write(f"Could not rebuild coverage for {data_source}:{signal}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Rebuilt coverage for {len(signals) - len(failed)} of "
+                f"{len(signals)} signals"
+            )
+        )
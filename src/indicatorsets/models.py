@@ -1,5 +1,8 @@
+from django.conf import settings
+from django.core.cache import cache
 from django.db import models
 from base.models import SOURCE_TYPES
+from base.utils import catalog_cache_key
 
 
 DUA_REQUIRED_CHOICES = (
@@ -291,8 +294,15 @@ class FilterDescription(models.Model):
 
     @classmethod
     def get_all_descriptions_as_dict(cls):
-        descriptions = cls.objects.values("name", "description")
-        return {desc["name"]: desc["description"] for desc in descriptions}
+        cache_key = catalog_cache_key(f"{cls._meta.model_name}_dict")
+        descriptions = cache.get(cache_key)
+        if descriptions is None:
+            descriptions = {
+                desc["name"]: desc["description"]
+                for desc in cls.objects.values("name", "description")
+            }
+            cache.set(cache_key, descriptions, settings.CACHE_TIME)
+        return descriptions
 
 
 class ColumnDescription(models.Model):
@@ -317,5 +327,12 @@ class ColumnDescription(models.Model):
 
     @classmethod
     def get_all_descriptions_as_dict(cls):
-        descriptions = cls.objects.values("name", "description")
-        return {desc["name"]: desc["description"] for desc in descriptions}
+        cache_key = catalog_cache_key(f"{cls._meta.model_name}_dict")
+        descriptions = cache.get(cache_key)
+        if descriptions is None:
+            descriptions = {
+                desc["name"]: desc["description"]
+                for desc in cls.objects.values("name", "description")
+            }
+            cache.set(cache_key, descriptions, settings.CACHE_TIME)
+        return descriptions
@@ -0,0 +1,59 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+
+from alternative_interface.models import ExpressViewIndicator
+from base.models import (
+    GeographicScope,
+    Geography,
+    GeographyUnit,
+    Pathogen,
+    SeverityPyramidRung,
+)
+from base.utils import mark_catalog_changed
+from datasources.models import SourceSubdivision
+from indicators.models import Indicator
+from indicatorsets.models import (
+    ColumnDescription,
+    FilterDescription,
+    IndicatorSet,
+    OriginalDataProvider,
+)
+
+# Models behind catalog-derived caches (proxy models resolve to these)
+CATALOG_MODELS = {
+    IndicatorSet,
+    Indicator,
+    OriginalDataProvider,
+    SourceSubdivision,
+    Pathogen,
+    Geography,
+    GeographyUnit,
+    GeographicScope,
+    SeverityPyramidRung,
+    FilterDescription,
+    ColumnDescription,
+    ExpressViewIndicator,
+}
+
+CATALOG_M2M_THROUGH_MODELS = {
+    IndicatorSet.pathogens.through,
+    IndicatorSet.geographic_levels.through,
+    IndicatorSet.severity_pyramid_rungs.through,
+}
+
+
+def catalog_model_changed(sender, **kwargs):
+    if sender._meta.concrete_model in CATALOG_MODELS:
+        mark_catalog_changed()
+
+
+def catalog_relation_changed(sender, action, **kwargs):
+    if sender in CATALOG_M2M_THROUGH_MODELS and action.startswith("post_"):
+        mark_catalog_changed()
+
+
+def connect_signals():
+    post_save.connect(catalog_model_changed, dispatch_uid="catalog_model_saved")
+    post_delete.connect(catalog_model_changed, dispatch_uid="catalog_model_deleted")
+    m2m_changed.connect(
+        catalog_relation_changed, dispatch_uid="catalog_relation_changed"
+    )
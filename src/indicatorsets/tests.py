@@ -1,12 +1,39 @@
+import json
+import threading
+from io import StringIO
 from unittest.mock import MagicMock, patch
 
 import requests
 from django.core.cache import cache
+from django.core.management import call_command
+from django.http import QueryDict
 from django.test import Client, TestCase, override_settings
 from django.urls import reverse
 
-from django.http import QueryDict
-
+from base.geography_index import invalidate_geography_index
+from base.models import Geography, GeographyUnit, Pathogen
+from base.utils import bump_catalog_version
+from datasources.models import SourceSubdivision
+from epiportal.covidcast_cache import get_covidcast_cache_stats
+from epiportal.covidcast_meta import (
+    COVIDCAST_META_INDEX_CACHE_KEY,
+    invalidate_covidcast_meta_index,
+)
+from epiportal.metadata_cache import store_metadata
+from indicators.models import Indicator
+from indicatorsets.catalog_index import (
+    RELATED_INDICATOR_FIELDS,
+    get_catalog_index,
+    select_indicator_sets,
+)
+from indicatorsets.filters import IndicatorSetFilter
+from indicatorsets.fluview_coverage import build_region_coverage, get_region_coverage
+from indicatorsets.geo_coverage import (
+    get_geo_coverage_index,
+    invalidate_geo_coverage_index,
+    rebuild_geo_coverage,
+    signal_coverage_cache_key,
+)
 from indicatorsets.models import (
     ColumnDescription,
     FilterDescription,
@@ -15,26 +42,32 @@ from indicatorsets.models import (
     OriginalDataProvider,
     USStateIndicatorSet,
 )
+from indicatorsets.resources import (
+    IndicatorSetResource,
+    NonDelphiIndicatorSetResource,
+)
 from indicatorsets.utils import (
+    InvalidApiKeyError,
     dict_to_geo_string,
     generate_epivis_custom_title,
     generate_random_color,
     get_epiweek,
     get_grouped_original_data_provider_choices,
     get_list_of_indicators_filtered_by_geo,
+    get_num_locations_from_meta,
     group_by_property,
     list_to_dict,
     parse_original_data_provider_ids,
+    preview_covidcast_data,
+    preview_fluview_data,
 )
-from indicatorsets.views import age_group_sort_key, get_related_indicators
-from indicatorsets.filters import IndicatorSetFilter
-from indicatorsets.resources import (
-    IndicatorSetResource,
-    NonDelphiIndicatorSetResource,
+from indicatorsets.views import (
+    age_group_sort_key,
+    format_related_indicators,
+    format_related_indicators_columnar,
+    get_catalog_json_cache_key,
+    get_related_indicators,
 )
-from base.models import Pathogen
-from datasources.models import SourceSubdivision
-from indicators.models import Indicator
 
 
 class IndicatorsetsUtilsTests(TestCase):
@@ -88,6 +121,9 @@ class IndicatorSetModelTests(TestCase):
 
 
 class DescriptionModelTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
     def test_filter_description_dict(self):
         FilterDescription.objects.create(
             name="pathogens",
@@ -104,8 +140,27 @@ class DescriptionModelTests(TestCase):
         result = ColumnDescription.get_all_descriptions_as_dict()
         self.assertEqual(result["name"], "Indicator set name")
 
+    def test_description_dict_is_cached_until_catalog_changes(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            description = FilterDescription.objects.create(
+                name="pathogens",
+                description="Filter by pathogen",
+            )
+        FilterDescription.get_all_descriptions_as_dict()
+        with self.assertNumQueries(0):
+            FilterDescription.get_all_descriptions_as_dict()
+        description.description = "Updated"
+        with self.captureOnCommitCallbacks(execute=True):
+            description.save()
+        self.assertEqual(
+            FilterDescription.get_all_descriptions_as_dict()["pathogens"], "Updated"
+        )
+
 
 class GroupedDataProviderChoicesTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
     def test_groups_providers_by_group_field(self):
         pa_provider = OriginalDataProvider.objects.create(
             name="PA DOH",
@@ -145,6 +200,97 @@ class GroupedDataProviderChoicesTests(TestCase):
         self.assertIn("Acme Corp", main_names)
 
 
+class FluviewCoverageTests(TestCase):
+    rows = [
+        {"epiweek": 201002, "region": "nat", "wili": 1.5, "ili": None, "num_ili": 0},
+        {"epiweek": 201001, "region": "nat", "wili": 1.0, "ili": None, "num_ili": 0},
+        {"epiweek": 201003, "region": "nat", "wili": None, "ili": None, "num_ili": 0},
+    ]
+
+    def setUp(self):
+        cache.clear()
+
+    def _response(self):
+        response = MagicMock()
+        response.json.return_value = {"epidata": self.rows}
+        return response
+
+    def test_build_region_coverage(self):
+        coverage = build_region_coverage(self.rows)
+        self.assertEqual(
+            coverage["wili"], {"has_data": True, "first": 201001, "last": 201002}
+        )
+        self.assertFalse(coverage["ili"]["has_data"])
+        self.assertFalse(coverage["num_ili"]["has_data"])
+        self.assertNotIn("region", coverage)
+
+    @patch("indicatorsets.fluview_coverage.epidata_get")
+    def test_view_answers_from_coverage_table(self, mock_get):
+        mock_get.return_value = self._response()
+        indicators = [
+            {"data_source": "fluview", "indicator": "wili"},
+            {"data_source": "fluview", "indicator": "ili"},
+        ]
+        for _ in range(2):
+            result = self.client.get(
+                reverse("check_fluview_geo_coverage"),
+                {"geo": "nat", "indicators": json.dumps(indicators)},
+            )
+            self.assertEqual(
+                result.json()["not_covered_indicators"],
+                [{"data_source": "fluview", "indicator": "ili"}],
+            )
+        mock_get.assert_called_once()
+
+    @patch("indicatorsets.fluview_coverage.epidata_get")
+    def test_unknown_region_is_not_covered(self, mock_get):
+        mock_get.return_value = self._response()
+        result = self.client.get(
+            reverse("check_fluview_geo_coverage"),
+            {
+                "geo": "not-a-region",
+                "indicators": json.dumps(
+                    [{"data_source": "fluview", "indicator": "wili"}]
+                ),
+            },
+        )
+        self.assertEqual(
+            result.json()["not_covered_indicators"],
+            [{"data_source": "fluview", "indicator": "wili"}],
+        )
+        mock_get.assert_not_called()
+        self.assertIsNone(cache.get("fluview_coverage:fluview:not-a-region"))
+
+    @override_settings(FLUVIEW_COVERAGE_TTL=120)
+    @patch("indicatorsets.fluview_coverage.cache")
+    @patch("indicatorsets.fluview_coverage.epidata_get")
+    def test_coverage_entries_expire(self, mock_get, mock_cache):
+        mock_get.return_value = self._response()
+        mock_cache.get.return_value = None
+        get_region_coverage("fluview", "nat")
+        self.assertEqual(mock_cache.set.call_args.kwargs["timeout"], 120)
+
+    @patch("indicatorsets.fluview_coverage.epidata_get")
+    def test_command_rebuilds_every_pair(self, mock_get):
+        def fake_get(endpoint, params):
+            if params["regions"] == "hhs1":
+                raise requests.RequestException("unavailable")
+            return self._response()
+
+        mock_get.side_effect = fake_get
+        out, err = StringIO(), StringIO()
+        call_command(
+            "build_fluview_coverage",
+            regions=["nat", "hhs1"],
+            stdout=out,
+            stderr=err,
+        )
+        self.assertIn("2 of 4", out.getvalue())
+        self.assertIn("fluview_clinical coverage for hhs1", err.getvalue())
+        self.assertTrue(cache.get("fluview_coverage:fluview:nat")["wili"]["has_data"])
+        self.assertIsNone(cache.get("fluview_coverage:fluview:hhs1"))
+
+
 class PophiveAgeGroupsViewTests(TestCase):
     def setUp(self):
         cache.clear()
@@ -153,14 +299,14 @@ class PophiveAgeGroupsViewTests(TestCase):
     def tearDown(self):
         cache.clear()
 
-    @patch("indicatorsets.views.requests.get")
+    @patch("indicatorsets.views.epidata_get")
     def test_returns_empty_list_when_upstream_fails(self, mock_get):
         mock_get.side_effect = requests.RequestException("unavailable")
         response = self.client.get(reverse("get_pophive_age_groups"))
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.json(), {"age_groups": []})
 
-    @patch("indicatorsets.views.requests.get")
+    @patch("indicatorsets.views.epidata_get")
     def test_caches_successful_response(self, mock_get):
         mock_response = MagicMock()
         mock_response.raise_for_status = MagicMock()
@@ -190,10 +336,105 @@ class PophiveAgeGroupsViewTests(TestCase):
         )
 
 
+class SearchGeographiesViewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        state = Geography.objects.create(
+            name="state", display_name="State", used_in="indicatorsets"
+        )
+        GeographyUnit.objects.create(
+            geo_id="pa", display_name="Pennsylvania", geo_level=state, level=5
+        )
+
+    def setUp(self):
+        invalidate_geography_index()
+
+    def tearDown(self):
+        invalidate_geography_index()
+
+    def test_returns_select2_groups_with_geo_ids(self):
+        response = self.client.get(reverse("search_geographies"), {"term": "penn"})
+        self.assertEqual(response.status_code, 200)
+        payload = response.json()
+        self.assertEqual(payload["results"][0]["text"], "State")
+        self.assertEqual(payload["results"][0]["children"][0]["id"], "state:pa")
+        self.assertFalse(payload["pagination"]["more"])
+
+    @patch("indicatorsets.geo_coverage.epidata_get")
+    def test_available_geos_served_from_cached_coverage(self, mock_get):
+        cache.clear()
+        store_metadata(signal_coverage_cache_key("src", "sig"), ["state:pa", "state:zz"])
+        mock_response = MagicMock()
+        mock_response.json.return_value = {"epidata": [], "result": 1}
+        mock_get.return_value = mock_response
+        response = self.client.post(
+            reverse("get_available_geos"),
+            data=json.dumps(
+                {
+                    "indicators": [
+                        {"data_source": "src", "indicator": "sig"},
+                        {"data_source": "src", "indicator": "uncovered"},
+                    ]
+                }
+            ),
+            content_type="application/json",
+        )
+        self.assertEqual(
+            response.json()["geographic_granularities"],
+            [
+                {
+                    "text": "State",
+                    "children": [
+                        {
+                            "id": "state:pa",
+                            "geoType": "state",
+                            "text": "Pennsylvania",
+                            "geoTypeDisplayName": "State",
+                        }
+                    ],
+                }
+            ],
+        )
+        self.assertEqual(
+            [call.kwargs["params"]["signals"] for call in mock_get.call_args_list],
+            ["uncovered"],
+        )
+
+    @patch(
+        "indicatorsets.utils.epidata_get",
+        side_effect=requests.RequestException("offline"),
+    )
+    def test_catalog_page_preselects_locations_without_inlining_all(self, _mock_get):
+        response = self.client.get(
+            reverse("indicatorsets"), {"location_search": "state:pa"}
+        )
+        self.assertNotIn("geoValues", response.content.decode())
+        self.assertEqual(
+            json.loads(response.context["selected_locations"])[0]["text"],
+            "Pennsylvania",
+        )
+
+
 class TableStatsViewTests(TestCase):
     def setUp(self):
+        cache.clear()
         self.client = Client()
 
+    def test_num_locations_sums_indexed_signals(self):
+        store_metadata(
+            COVIDCAST_META_INDEX_CACHE_KEY,
+            {("src", "a"): {"num_locations": 10}, ("src", "b"): {"num_locations": 5}},
+        )
+        invalidate_covidcast_meta_index()
+        indicators = [
+            {"source__name": "src", "name": "a"},
+            {"source__name": "src", "name": "a"},
+            {"source__name": "src", "name": "b"},
+            {"source__name": "src", "name": "unknown"},
+        ]
+        self.assertEqual(get_num_locations_from_meta(indicators), 15)
+        invalidate_covidcast_meta_index()
+
     def test_table_stats_with_no_data(self):
         response = self.client.get(reverse("get_table_stats_info"))
         self.assertEqual(response.status_code, 200)
@@ -202,8 +443,62 @@ class TableStatsViewTests(TestCase):
         self.assertEqual(data["num_of_indicators"], 0)
 
 
+class CatalogBootstrapViewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.source = SourceSubdivision.objects.create(name="src")
+        cls.indicator_set = IndicatorSet.objects.create(
+            name="Bootstrap set", source_type="covidcast"
+        )
+        IndicatorSet.objects.create(name="Other set", source_type="non_delphi")
+        Indicator.objects.create(
+            name="sig",
+            source=cls.source,
+            indicator_set=cls.indicator_set,
+            source_type="covidcast",
+        )
+
+    def setUp(self):
+        cache.clear()
+        store_metadata(COVIDCAST_META_INDEX_CACHE_KEY, {})
+        invalidate_covidcast_meta_index()
+
+    def test_returns_all_parts_from_one_selection(self):
+        with patch(
+            "indicatorsets.views.select_indicator_sets",
+            wraps=select_indicator_sets,
+        ) as mock_select:
+            response = Client().get(
+                reverse("get_catalog_bootstrap"), {"hosted_by_delphi": "on"}
+            )
+        mock_select.assert_called_once()
+        payload = response.json()
+        self.assertEqual(payload["rows"]["recordsTotal"], 1)
+        self.assertEqual(payload["rows"]["data"][0]["name"], "Bootstrap set")
+        self.assertEqual(payload["stats"]["num_of_indicator_sets"], 1)
+        self.assertEqual(payload["stats"]["num_of_indicators"], 1)
+        self.assertEqual(payload["related_indicators"][0]["name"], "sig")
+
+    def test_include_limits_parts(self):
+        payload = Client().get(
+            reverse("get_catalog_bootstrap"), {"include": "stats,unknown"}
+        ).json()
+        self.assertEqual(list(payload), ["stats"])
+        self.assertEqual(payload["stats"]["num_of_indicator_sets"], 2)
+
+    def test_rows_honour_server_side_parameters(self):
+        payload = Client().get(
+            reverse("get_catalog_bootstrap"),
+            {"include": "rows", "draw": "7", "start": "1", "length": "1"},
+        ).json()
+        self.assertEqual(payload["rows"]["draw"], 7)
+        self.assertEqual(payload["rows"]["recordsTotal"], 2)
+        self.assertEqual(len(payload["rows"]["data"]), 1)
+
+
 class IndicatorSetListViewTests(TestCase):
     def setUp(self):
+        cache.clear()
         self.client = Client()
 
     def test_list_page_renders(self):
@@ -247,6 +542,143 @@ class IndicatorSetListViewTests(TestCase):
         self.assertEqual(payload["recordsTotal"], 1)
         self.assertEqual(payload["data"][0]["DT_RowId"], matched_set.id)
 
+    def test_json_response_is_cached_per_catalog_version(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            IndicatorSet.objects.create(name="Cached set", source_type="covidcast")
+        url = reverse("indicatorsets")
+        first = self.client.get(url, {"format": "json"})
+        with self.assertNumQueries(0):
+            second = self.client.get(url, {"format": "json"})
+        self.assertEqual(first.content, second.content)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            IndicatorSet.objects.create(name="New set", source_type="covidcast")
+        third = self.client.get(url, {"format": "json"})
+        self.assertEqual(third.json()["recordsTotal"], 2)
+
+    @patch("indicatorsets.utils.epidata_get")
+    def test_json_response_is_not_cached_when_location_search_fails(self, mock_get):
+        indicator_set = IndicatorSet.objects.create(
+            name="Cached set", source_type="covidcast"
+        )
+        # A covidcast signal without cached coverage forces the live lookup
+        Indicator.objects.create(
+            name="sig",
+            source=SourceSubdivision.objects.create(name="src"),
+            indicator_set=indicator_set,
+            source_type="covidcast",
+        )
+        mock_get.side_effect = requests.RequestException("offline")
+        params = {"format": "json", "location_search": "nation:us"}
+        self.client.get(reverse("indicatorsets"), params)
+        mock_get.side_effect = None
+        mock_get.return_value.json.return_value = {"epidata": [], "result": 1}
+        self.client.get(reverse("indicatorsets"), params)
+        self.assertEqual(mock_get.call_count, 2)
+
+    def test_json_response_honours_if_none_match(self):
+        url = reverse("indicatorsets")
+        response = self.client.get(url, {"format": "json"})
+        etag = response["ETag"]
+        self.assertTrue(etag)
+        response = self.client.get(url, {"format": "json"}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        response = self.client.get(
+            url, {"format": "json"}, HTTP_IF_NONE_MATCH='"stale"'
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def server_side_params(self, **params):
+        return {
+            "format": "json",
+            "draw": "1",
+            "start": "0",
+            "length": "10",
+            "columns[1][data]": "name",
+            **params,
+        }
+
+    def create_sets_for_paging(self):
+        for name in ["Beta set", "Alpha set", "Delta set", "Charlie set"]:
+            IndicatorSet.objects.create(name=name, source_type="covidcast")
+        IndicatorSet.objects.create(name="Echo set", source_type="non_delphi")
+
+    def test_server_side_returns_requested_page_in_catalog_order(self):
+        self.create_sets_for_paging()
+        response = self.client.get(
+            reverse("indicatorsets"),
+            self.server_side_params(draw="4", start="1", length="2"),
+        )
+        payload = response.json()
+        self.assertEqual(payload["draw"], 4)
+        self.assertEqual(payload["recordsTotal"], 5)
+        self.assertEqual(payload["recordsFiltered"], 5)
+        # beta_last, then Delphi-hosted before the rest, then name
+        self.assertEqual(
+            [row["name"] for row in payload["data"]], ["Charlie set", "Delta set"]
+        )
+        self.assertNotIn("ETag", response)
+
+    def test_server_side_orders_and_searches(self):
+        self.create_sets_for_paging()
+        payload = self.client.get(
+            reverse("indicatorsets"),
+            self.server_side_params(**{"order[0][column]": "1", "order[0][dir]": "desc"}),
+        ).json()
+        self.assertEqual(payload["data"][0]["name"], "Echo set")
+
+        payload = self.client.get(
+            reverse("indicatorsets"),
+            self.server_side_params(**{"search[value]": "  ta se"}),
+        ).json()
+        self.assertEqual(payload["recordsTotal"], 5)
+        self.assertEqual(payload["recordsFiltered"], 2)
+        self.assertEqual(
+            [row["name"] for row in payload["data"]], ["Delta set", "Beta set"]
+        )
+
+    def test_server_side_page_cache_echoes_each_draw(self):
+        self.create_sets_for_paging()
+        url = reverse("indicatorsets")
+        self.client.get(url, self.server_side_params(draw="1"))
+        with self.assertNumQueries(0):
+            payload = self.client.get(url, self.server_side_params(draw="2")).json()
+        self.assertEqual(payload["draw"], 2)
+        self.assertEqual(len(payload["data"]), 5)
+
+    @override_settings(PAGE_SIZE=2)
+    def test_full_list_and_server_side_page_are_cached_apart(self):
+        self.create_sets_for_paging()
+        url = reverse("indicatorsets")
+        page = self.client.get(url, {"format": "json", "draw": "3"}).json()
+        self.assertEqual((page["draw"], len(page["data"])), (3, 2))
+        full = self.client.get(url, {"format": "json"}).json()
+        self.assertEqual((full["draw"], len(full["data"])), (1, 5))
+        page = self.client.get(url, {"format": "json", "draw": "4"}).json()
+        self.assertEqual((page["draw"], page["recordsTotal"], len(page["data"])), (4, 5, 2))
+        self.assertEqual(
+            get_catalog_json_cache_key(QueryDict("draw=1")),
+            get_catalog_json_cache_key(QueryDict("draw=2")),
+        )
+        self.assertNotEqual(
+            get_catalog_json_cache_key(QueryDict("draw=1")),
+            get_catalog_json_cache_key(QueryDict("")),
+        )
+
+    def test_json_cache_key_ignores_parameter_order(self):
+        self.assertEqual(
+            get_catalog_json_cache_key(
+                QueryDict("pathogens=2&pathogens=1&hosted_by_delphi=on&format=json")
+            ),
+            get_catalog_json_cache_key(
+                QueryDict("hosted_by_delphi=on&pathogens=1&pathogens=2&_=123")
+            ),
+        )
+        self.assertNotEqual(
+            get_catalog_json_cache_key(QueryDict("pathogens=1")),
+            get_catalog_json_cache_key(QueryDict("pathogens=2")),
+        )
+
 
 class GetRelatedIndicatorsTests(TestCase):
     @classmethod
@@ -268,6 +700,9 @@ class GetRelatedIndicatorsTests(TestCase):
             description="Indicator description",
         )
 
+    def setUp(self):
+        cache.clear()
+
     def test_display_name_falls_back_to_member_name(self):
         qs = Indicator.objects.all()
         result = get_related_indicators(qs, [self.indicator_set.id])
@@ -280,6 +715,58 @@ class GetRelatedIndicatorsTests(TestCase):
         result = get_related_indicators(Indicator.objects.all(), [self.indicator_set.id])
         self.assertEqual(result[0]["display_name"], "Custom label")
 
+    @staticmethod
+    def expand_columnar(payload):
+        # Mirrors expandRelatedIndicators() in indicatorSetsTable.js
+        columns = payload["columns"]
+        indicators = []
+        for i in range(len(columns["id"])):
+            indicator = {name: values[i] for name, values in columns.items()}
+            indicator.update(payload["indicator_sets"][indicator["indicator_set"]])
+            if indicator["display_name"] is None:
+                indicator["display_name"] = indicator["member_name"] or indicator["name"]
+            if indicator["member_description"] is None:
+                indicator["member_description"] = indicator["description"]
+            indicators.append(indicator)
+        return indicators
+
+    def test_columnar_layout_expands_to_rows(self):
+        Indicator.objects.create(
+            name="sig_b",
+            display_name="Signal B",
+            source=self.source,
+            indicator_set=self.indicator_set,
+            source_type="covidcast",
+            description="Shared description",
+            member_description="Member description",
+        )
+        values = list(Indicator.objects.values(*RELATED_INDICATOR_FIELDS))
+        payload = format_related_indicators_columnar(values)
+        self.assertEqual(len(payload["indicator_sets"]), 1)
+        self.assertEqual(
+            self.expand_columnar(payload), format_related_indicators(values)
+        )
+
+    def test_related_indicators_view_accepts_columnar_layout(self):
+        response = Client().get(
+            reverse("get_related_indicators"), {"layout": "columnar"}
+        )
+        payload = response.json()["related_indicators"]
+        self.assertEqual(payload["layout"], "columnar")
+        self.assertEqual(payload["columns"]["name"], ["sig_a"])
+        self.assertEqual(
+            payload["indicator_sets"][str(self.indicator_set.id)]["endpoint"],
+            "covidcast",
+        )
+
+    def test_benchmark_command_reports_both_layouts(self):
+        out = StringIO()
+        call_command(
+            "benchmark_related_indicators", indicators=50, sets=5, repeat=1, stdout=out
+        )
+        self.assertIn("rows:", out.getvalue())
+        self.assertIn("columnar:", out.getvalue())
+
 
 class IndicatorSetFilterTests(TestCase):
     @classmethod
@@ -356,6 +843,275 @@ class IndicatorSetFilterTests(TestCase):
         self.assertNotIn(self.cdc_set, filtered)
 
 
+class CatalogIndexTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        with cls.captureOnCommitCallbacks(execute=True):
+            cls.covid = Pathogen.objects.create(name="covid", used_in="indicatorsets")
+            cls.flu = Pathogen.objects.create(name="flu", used_in="indicatorsets")
+            cls.state = Geography.objects.create(name="state", used_in="indicatorsets")
+            cls.provider = OriginalDataProvider.objects.create(name="Acme Labs")
+            cls.source = SourceSubdivision.objects.create(name="src")
+            cls.ongoing_set = IndicatorSet.objects.create(
+                name="Ongoing set",
+                source_type="covidcast",
+                epidata_endpoint="covidcast",
+                temporal_scope_end="Ongoing",
+                temporal_granularity="Daily, Weekly",
+                original_data_provider=cls.provider,
+            )
+            cls.ongoing_set.pathogens.add(cls.covid)
+            cls.ongoing_set.geographic_levels.add(cls.state)
+            cls.fluview_set = IndicatorSet.objects.create(
+                name="Fluview set",
+                source_type="other_endpoint",
+                epidata_endpoint="fluview",
+                temporal_scope_end="2020",
+                temporal_granularity="Weekly",
+            )
+            cls.fluview_set.pathogens.add(cls.flu)
+            cls.external_set = IndicatorSet.objects.create(
+                name="External set",
+                source_type="non_delphi",
+                temporal_granularity="Monthly",
+            )
+            cls.external_set.pathogens.add(cls.covid, cls.flu)
+            for name, indicator_set, scope_end in [
+                ("sig_b", cls.ongoing_set, "Ongoing"),
+                ("sig_a", cls.ongoing_set, "2021"),
+                ("ili", cls.fluview_set, "Ongoing"),
+                ("ext", cls.external_set, ""),
+            ]:
+                Indicator.objects.create(
+                    name=name,
+                    source=cls.source,
+                    indicator_set=indicator_set,
+                    source_type=indicator_set.source_type,
+                    temporal_scope_end=scope_end,
+                )
+
+    def setUp(self):
+        cache.clear()
+
+    def assertMatchesFilterSet(self, query_string):
+        data = QueryDict(query_string)
+        selection = select_indicator_sets(data)
+        with override_settings(CATALOG_INDEX_ENABLED=False):
+            expected = select_indicator_sets(data)
+        self.assertEqual(selection.indicator_set_ids, expected.indicator_set_ids)
+        self.assertEqual(
+            [row["id"] for row in selection.indicators],
+            [row["id"] for row in expected.indicators],
+        )
+        return selection
+
+    def test_no_filters_selects_whole_catalog(self):
+        selection = self.assertMatchesFilterSet("")
+        self.assertEqual(len(selection.indicator_set_ids), 3)
+        self.assertEqual(
+            [row["name"] for row in selection.indicators],
+            ["ext", "ili", "sig_a", "sig_b"],
+        )
+
+    def test_facet_combinations_match_filterset(self):
+        for query_string in [
+            f"pathogens={self.covid.id}",
+            f"pathogens={self.covid.id}&pathogens={self.flu.id}",
+            f"pathogens={self.flu.id}&geographic_levels={self.state.id}",
+            f"odp={self.provider.id}",
+            "original_data_provider=Acme Labs",
+            "temporal_granularity=Weekly",
+            "temporal_granularity=Monthly&temporal_granularity=Daily",
+            "temporal_scope_end=Ongoing",
+            "hosted_by_delphi=on",
+            "hosted_by_delphi=on&temporal_scope_end=Ongoing",
+        ]:
+            with self.subTest(query_string=query_string):
+                self.assertMatchesFilterSet(query_string)
+
+    def test_temporal_granularity_is_case_sensitive(self):
+        # Like temporal_granularity__contains on MySQL (LIKE BINARY); the test
+        # database's LIKE ignores case, so the filterset is not compared here.
+        with self.captureOnCommitCallbacks(execute=True):
+            IndicatorSet.objects.create(
+                name="Lowercase set", temporal_granularity="weekly"
+            )
+        selection = select_indicator_sets(QueryDict("temporal_granularity=Weekly"))
+        self.assertEqual(
+            selection.indicator_set_ids, [self.ongoing_set.id, self.fluview_set.id]
+        )
+
+    def test_invalid_values_are_ignored_like_filterset(self):
+        for query_string in [
+            "pathogens=999999",
+            "pathogens=abc",
+            "temporal_granularity=Fortnightly",
+            "temporal_scope_end=Finished",
+            "odp=unknown",
+        ]:
+            with self.subTest(query_string=query_string):
+                selection = self.assertMatchesFilterSet(query_string)
+                self.assertEqual(len(selection.indicator_set_ids), 3)
+
+    @patch("indicatorsets.utils.epidata_get")
+    def test_location_search_matches_filterset(self, mock_get):
+        mock_response = MagicMock()
+        mock_response.json.return_value = {
+            "epidata": [{"source": "src", "signal": "sig_a"}],
+            "result": 1,
+        }
+        mock_get.return_value = mock_response
+        for query_string in ["location_search=state:pa", "location_search=nation:us"]:
+            with self.subTest(query_string=query_string):
+                self.assertMatchesFilterSet(query_string)
+
+    def store_coverage(self, coverage):
+        for signal, geos in coverage.items():
+            store_metadata(signal_coverage_cache_key("src", signal), geos)
+        invalidate_geo_coverage_index()
+
+    @patch("indicatorsets.utils.epidata_get")
+    def test_location_search_uses_cached_coverage(self, mock_get):
+        self.store_coverage({"sig_a": ["state:pa"], "sig_b": ["state:ny", "nation:us"]})
+        selection = self.assertMatchesFilterSet("location_search=nation:us")
+        self.assertEqual([row["name"] for row in selection.indicators], ["sig_b"])
+        # State locations also select the FluView indicators
+        selection = self.assertMatchesFilterSet("location_search=state:PA")
+        self.assertEqual([row["name"] for row in selection.indicators], ["ili", "sig_a"])
+        self.assertCountsMatchSelection("location_search=nation:us")
+        mock_get.assert_not_called()
+
+    @patch("indicatorsets.utils.epidata_get")
+    def test_location_search_falls_back_to_epidata_until_coverage_is_complete(
+        self, mock_get
+    ):
+        mock_response = MagicMock()
+        mock_response.json.return_value = {
+            "epidata": [{"source": "src", "signal": "sig_b"}],
+            "result": 1,
+        }
+        mock_get.return_value = mock_response
+        self.store_coverage({"sig_a": ["state:pa"]})
+        self.assertFalse(get_geo_coverage_index().complete)
+        selection = self.assertMatchesFilterSet("location_search=nation:us")
+        self.assertEqual([row["name"] for row in selection.indicators], ["sig_b"])
+        self.assertTrue(mock_get.called)
+
+    @patch("indicatorsets.geo_coverage.epidata_get")
+    def test_rebuild_geo_coverage_keeps_coverage_of_failed_signals(self, mock_get):
+        self.store_coverage({"sig_a": ["state:pa"]})
+
+        def get(endpoint, params):
+            if params["signals"] == "sig_a":
+                raise requests.RequestException
+            response = MagicMock()
+            response.json.return_value = {"epidata": ["state:NY"], "result": 1}
+            return response
+
+        mock_get.side_effect = get
+        out = StringIO()
+        call_command("build_geo_coverage", stdout=out, stderr=StringIO())
+        self.assertIn("Rebuilt coverage for 1 of 2 signals", out.getvalue())
+        self.assertEqual(cache.get(signal_coverage_cache_key("src", "sig_a")), ["state:pa"])
+        self.assertEqual(cache.get(signal_coverage_cache_key("src", "sig_b")), ["state:ny"])
+
+    @patch("indicatorsets.geo_coverage.epidata_get")
+    def test_geo_coverage_index_rebuilds_after_coverage_rebuild(self, mock_get):
+        self.store_coverage({"sig_a": ["state:pa"]})
+        index = get_geo_coverage_index()
+        self.assertIs(get_geo_coverage_index(), index)
+        self.assertFalse(index.complete)
+
+        response = MagicMock()
+        response.json.return_value = {"epidata": ["state:NY"], "result": 1}
+        mock_get.return_value = response
+        rebuild_geo_coverage()
+        index = get_geo_coverage_index()
+        self.assertTrue(index.complete)
+        covidcast_ids = Indicator.objects.filter(source_type="covidcast")
+        self.assertEqual(
+            index.indicator_ids_for_geos(["state:ny"]),
+            set(covidcast_ids.values_list("id", flat=True)),
+        )
+
+    def test_geo_coverage_index_picks_up_lazily_fetched_coverage(self):
+        self.store_coverage({"sig_a": ["state:pa"]})
+        index = get_geo_coverage_index()
+        self.assertFalse(index.complete)
+        store_metadata(signal_coverage_cache_key("src", "sig_b"), ["state:ny"])
+        self.assertIs(get_geo_coverage_index(), index)
+        self.assertTrue(index.complete)
+        self.assertEqual(
+            index.indicator_ids_for_geos(["state:ny"]),
+            {Indicator.objects.get(name="sig_b").id},
+        )
+
+    def test_index_rebuilds_when_catalog_version_changes(self):
+        index = get_catalog_index()
+        self.assertIs(get_catalog_index(), index)
+        bump_catalog_version()
+        self.assertIsNot(get_catalog_index(), index)
+
+    def test_saving_indicator_set_refreshes_selection(self):
+        self.assertEqual(
+            len(select_indicator_sets(QueryDict("hosted_by_delphi=on")).indicator_set_ids),
+            2,
+        )
+        self.external_set.source_type = "covidcast"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.external_set.save()
+        self.assertEqual(
+            len(select_indicator_sets(QueryDict("hosted_by_delphi=on")).indicator_set_ids),
+            3,
+        )
+
+    def assertCountsMatchSelection(self, query_string):
+        data = QueryDict(query_string)
+        counts = get_catalog_index().facet_counts(data)
+        for facet, values in counts.items():
+            for value, count in values.items():
+                selected = data.copy()
+                selected.setlist(facet, [str(value)])
+                if facet == "odp":
+                    selected.pop("original_data_provider", None)
+                with self.subTest(facet=facet, value=value):
+                    self.assertEqual(
+                        count, len(select_indicator_sets(selected).indicator_set_ids)
+                    )
+
+    def test_facet_counts_match_selecting_each_value(self):
+        for query_string in [
+            "",
+            f"pathogens={self.covid.id}",
+            f"pathogens={self.flu.id}&temporal_granularity=Weekly",
+            "hosted_by_delphi=on&temporal_scope_end=Ongoing",
+            f"odp={self.provider.id}&pathogens={self.covid.id}",
+        ]:
+            with self.subTest(query_string=query_string):
+                self.assertCountsMatchSelection(query_string)
+
+    @patch("indicatorsets.utils.epidata_get")
+    def test_facet_counts_with_location_search(self, mock_get):
+        mock_response = MagicMock()
+        mock_response.json.return_value = {
+            "epidata": [{"source": "src", "signal": "sig_a"}],
+            "result": 1,
+        }
+        mock_get.return_value = mock_response
+        self.assertCountsMatchSelection("location_search=state:pa")
+
+    def test_facet_counts_view(self):
+        response = Client().get(
+            reverse("get_facet_counts"), {"pathogens": self.flu.id}
+        )
+        self.assertEqual(response.status_code, 200)
+        facets = response.json()["facets"]
+        self.assertEqual(facets["pathogens"][str(self.covid.id)], 2)
+        self.assertEqual(facets["hosted_by_delphi"]["on"], 1)
+        self.assertEqual(facets["temporal_granularity"]["Monthly"], 1)
+        self.assertEqual(facets["odp"][str(self.provider.id)], 0)
+
+
 class IndicatorSetImportResourceTests(TestCase):
     def test_non_delphi_import_only_deletes_other_non_delphi_sets(self):
         delphi_set = IndicatorSet.objects.create(
@@ -455,7 +1211,7 @@ class OriginalDataProviderUtilsTests(TestCase):
 
 
 class GeoCoverageUtilsTests(TestCase):
-    @patch("indicatorsets.utils.requests.get")
+    @patch("indicatorsets.utils.epidata_get")
     def test_get_list_of_indicators_filtered_by_geo_returns_epidata(self, mock_get):
         mock_response = MagicMock()
         mock_response.raise_for_status = MagicMock()
@@ -468,7 +1224,181 @@ class GeoCoverageUtilsTests(TestCase):
         result = get_list_of_indicators_filtered_by_geo("['state:pa']")
         self.assertEqual(result["epidata"][0]["signal"], "sig")
 
-    @patch("indicatorsets.utils.requests.get", side_effect=requests.RequestException)
+    @patch("indicatorsets.utils.epidata_get", side_effect=requests.RequestException)
     def test_get_list_of_indicators_filtered_by_geo_handles_errors(self, _mock_get):
         result = get_list_of_indicators_filtered_by_geo("['state:pa']")
         self.assertEqual(result, {"epidata": [], "result": -1})
+
+
+class PreviewCovidcastDataTests(TestCase):
+    indicators = [
+        {"_endpoint": "covidcast", "time_type": "day", "data_source": "src", "indicator": "a"},
+        {"_endpoint": "covidcast", "time_type": "day", "data_source": "other", "indicator": "b"},
+        {"_endpoint": "covidcast", "time_type": "day", "data_source": "src", "indicator": "c"},
+    ]
+    geos = {"state": [{"id": "state:PA", "geoType": "state"}]}
+    meta_index = {
+        ("src", "a"): {"last_update": 1},
+        ("other", "b"): {"last_update": 1},
+        ("src", "c"): {"last_update": 1},
+    }
+
+    def setUp(self):
+        cache.clear()
+        store_metadata(COVIDCAST_META_INDEX_CACHE_KEY, self.meta_index)
+        invalidate_covidcast_meta_index()
+
+    def tearDown(self):
+        invalidate_covidcast_meta_index()
+        # Calls left running after an error must not hit the next test's mock
+        for thread in threading.enumerate():
+            if thread.name.startswith("epidata"):
+                thread.join(timeout=1)
+
+    @staticmethod
+    def _response(signals, status_code=200):
+        response = MagicMock()
+        response.status_code = status_code
+        response.raise_for_status = MagicMock()
+        response.json.return_value = {
+            "epidata": [
+                {"signal": signal, "time_value": time_value}
+                for signal in signals.split(",")
+                for time_value in (20240101, 20240102)
+            ],
+            "result": 1,
+            "message": "success",
+        }
+        return response
+
+    @patch("indicatorsets.utils.epidata_get")
+    def test_results_keep_indicator_order(self, mock_get):
+        mock_get.side_effect = lambda endpoint, params, **kwargs: self._response(
+            params["signal"]
+        )
+        rows = preview_covidcast_data(
+            self.indicators, "2024-01-01", "2024-01-31", self.geos, None
+        )
+        self.assertEqual([row["epidata"]["signal"] for row in rows], ["a", "b", "c"])
+        self.assertEqual(
+            [row["epidata"]["time_value"] for row in rows], [20240101] * 3
+        )
+        self.assertEqual(
+            sorted(
+                call.kwargs["params"]["signal"] for call in mock_get.call_args_list
+            ),
+            ["a,c", "b"],
+        )
+
+    @override_settings(PREVIEW_HEAD_DAYS=7)
+    @patch("indicatorsets.utils.epidata_get")
+    def test_only_head_is_fetched_unless_it_is_empty(self, mock_get):
+        def fake_get(endpoint, params, **kwargs):
+            if params["time_values"] == "2024-01-01--2024-01-08":
+                return self._response(params["signal"].replace("a,", ""))
+            return self._response(params["signal"])
+
+        mock_get.side_effect = fake_get
+        rows = preview_covidcast_data(
+            self.indicators, "2024-01-01", "2024-12-31", self.geos, None
+        )
+        self.assertEqual([row["epidata"]["signal"] for row in rows], ["a", "b", "c"])
+        self.assertEqual(
+            [
+                (call.kwargs["params"]["signal"], call.kwargs["params"]["time_values"])
+                for call in mock_get.call_args_list
+            ][-1],
+            ("a", "2024-01-01--2024-12-31"),
+        )
+        self.assertEqual(mock_get.call_count, 3)
+
+    @override_settings(PREVIEW_HEAD_DAYS=7)
+    @patch("indicatorsets.utils.epidata_get")
+    def test_epiweek_preview_falls_back_to_full_range(self, mock_get):
+        empty = self._response("a")
+        empty.json.return_value = {"epidata": [], "result": -2, "message": "none"}
+        mock_get.side_effect = [empty, self._response("a")]
+        rows = preview_fluview_data([{"id": "nat"}], "2024-01-01", "2024-12-31", None)
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(
+            [call.kwargs["params"]["epiweeks"] for call in mock_get.call_args_list],
+            ["202401-202402", "202401-202501"],
+        )
+
+    @patch("indicatorsets.utils.epidata_get")
+    def test_rows_are_cached_until_signal_updates(self, mock_get):
+        mock_get.side_effect = lambda endpoint, params, **kwargs: self._response(
+            params["signal"]
+        )
+        for _ in range(2):
+            rows = preview_covidcast_data(
+                self.indicators, "2024-01-01", "2024-01-31", self.geos, None
+            )
+        self.assertEqual([row["epidata"]["signal"] for row in rows], ["a", "b", "c"])
+        self.assertEqual(mock_get.call_count, 2)
+        self.assertEqual(get_covidcast_cache_stats(), {"hits": 2, "misses": 2})
+
+        store_metadata(
+            COVIDCAST_META_INDEX_CACHE_KEY,
+            {**self.meta_index, ("src", "c"): {"last_update": 2}},
+        )
+        invalidate_covidcast_meta_index()
+        preview_covidcast_data(
+            self.indicators, "2024-01-01", "2024-01-31", self.geos, None
+        )
+        self.assertEqual(mock_get.call_count, 3)
+
+    @patch("indicatorsets.utils.epidata_get")
+    def test_failed_request_is_skipped(self, mock_get):
+        def fake_get(endpoint, params, **kwargs):
+            if params["data_source"] == "other":
+                raise requests.RequestException("boom")
+            return self._response(params["signal"])
+
+        mock_get.side_effect = fake_get
+        rows = preview_covidcast_data(
+            self.indicators, "2024-01-01", "2024-01-31", self.geos, None
+        )
+        self.assertEqual([row["epidata"]["signal"] for row in rows], ["a", "c"])
+
+    @patch("indicatorsets.utils.epidata_get")
+    def test_unauthorized_raises_invalid_api_key(self, mock_get):
+        mock_get.side_effect = lambda endpoint, params, **kwargs: self._response(
+            params["signal"], status_code=401
+        )
+        with self.assertRaises(InvalidApiKeyError):
+            preview_covidcast_data(
+                self.indicators, "2024-01-01", "2024-01-31", self.geos, "bad-key"
+            )
+
+    @patch("indicatorsets.utils.epidata_get")
+    def test_cached_rows_are_not_served_to_another_key(self, mock_get):
+        def fake_get(endpoint, params, api_key=None, **kwargs):
+            status_code = 401 if api_key == "bad-key" else 200
+            return self._response(params["signal"], status_code=status_code)
+
+        mock_get.side_effect = fake_get
+        preview_covidcast_data(
+            self.indicators, "2024-01-01", "2024-01-31", self.geos, "good-key"
+        )
+        with self.assertRaises(InvalidApiKeyError):
+            preview_covidcast_data(
+                self.indicators, "2024-01-01", "2024-01-31", self.geos, "bad-key"
+            )
+
+    @patch("indicatorsets.utils.epidata_get")
+    def test_preview_view_returns_401_for_invalid_key(self, mock_get):
+        mock_get.return_value = self._response("a", status_code=401)
+        response = Client().post(
+            reverse("preview_data"),
+            data={
+                "indicators": self.indicators,
+                "covidCastGeographicValues": self.geos,
+                "fluviewLocations": [{"id": "nat"}],
+                "start_date": "2024-01-01",
+                "end_date": "2024-01-31",
+            },
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.json()["result"], -2)
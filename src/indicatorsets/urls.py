@@ -5,7 +5,9 @@ from indicatorsets.views import (IndicatorSetListView,
                                  check_fluview_geo_coverage, create_query_code,
                                  epivis, generate_export_data_url,
                                  get_available_geos,
-                                 get_related_indicators_json, preview_data, get_table_stats_info, get_pophive_age_groups)
+                                 get_related_indicators_json, preview_data, get_table_stats_info, get_pophive_age_groups,
+                                 get_facet_counts, get_catalog_bootstrap,
+                                 search_geographies)
 
 urlpatterns: list[URLPattern] = [
     path("", IndicatorSetListView.as_view(), name="indicatorsets"),
@@ -29,6 +31,21 @@ urlpatterns: list[URLPattern] = [
         get_table_stats_info,
         name="get_table_stats_info",
     ),
+    path(
+        "get_catalog_bootstrap/",
+        get_catalog_bootstrap,
+        name="get_catalog_bootstrap",
+    ),
+    path(
+        "get_facet_counts/",
+        get_facet_counts,
+        name="get_facet_counts",
+    ),
+    path(
+        "search_geographies/",
+        search_geographies,
+        name="search_geographies",
+    ),
     path(
         "get_pophive_age_groups/",
         get_pophive_age_groups,
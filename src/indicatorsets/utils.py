@@ -2,15 +2,21 @@ import ast
 import random
 from collections import defaultdict
 from datetime import datetime as dtime
+from datetime import timedelta
+from functools import partial
 from textwrap import dedent
 
 import requests
 from django.conf import settings
 from django.core.cache import cache
+from epiportal.covidcast_cache import get_cached_covidcast
+from epiportal.covidcast_meta import get_covidcast_meta_index
+from epiportal.epidata import epidata_get, run_concurrently
 from epiportal.utils import get_client_ip
 from epiweeks import Week
 from delphi_utils import get_structured_logger
 
+from base.utils import catalog_cache_key
 from indicatorsets.models import IndicatorSet, OriginalDataProvider
 
 FLUVIEW_INDICATORS_MAPPING = {"wili": "%wILI", "ili": "%ILI"}
@@ -51,10 +57,9 @@ def dict_to_geo_string(geo_dict):
 
 def get_list_of_indicators_filtered_by_geo(geos):
     geos = list_to_dict(ast.literal_eval(geos))
-    url = f"{settings.EPIDATA_URL}covidcast/geo_coverage"
-    params = {"geo": dict_to_geo_string(geos), "api_key": settings.EPIDATA_API_KEY}
+    params = {"geo": dict_to_geo_string(geos)}
     try:
-        response = requests.get(url, params=params, timeout=(5, 30))
+        response = epidata_get("covidcast/geo_coverage", params=params)
         response.raise_for_status()
     except requests.RequestException:
         logger.exception("Error getting geo coverage", extra={"geos": geos})
@@ -120,6 +125,15 @@ def sort_data_providers(providers):
 
 
 def get_grouped_original_data_provider_choices():
+    cache_key = catalog_cache_key("grouped_data_providers")
+    choices = cache.get(cache_key)
+    if choices is None:
+        choices = _group_original_data_provider_choices()
+        cache.set(cache_key, choices, settings.CACHE_TIME)
+    return choices
+
+
+def _group_original_data_provider_choices():
     providers = (
         OriginalDataProvider.objects.filter(indicator_sets__isnull=False)
         .distinct()
@@ -425,15 +439,126 @@ def generate_nwss_export_url(
     return data_export_commands
 
 
+def _fetch_preview(endpoint, params, api_key, error_message, log_extra, base_url=None):
+    """
+    Fetch one preview response, returning the decoded JSON or ``None`` on error.
+
+    Raises :class:`InvalidApiKeyError` when Epidata rejects the API key.
+    """
+    try:
+        response = epidata_get(
+            endpoint, params=params, api_key=api_key, base_url=base_url
+        )
+        if response.status_code == 401:
+            raise InvalidApiKeyError(INVALID_API_KEY_MESSAGE)
+        response.raise_for_status()
+    except requests.RequestException:
+        logger.exception(error_message, extra=log_extra)
+        return None
+    return response.json()
+
+
+def _first_epidata_row(data):
+    if data and len(data["epidata"]):
+        return {
+            "epidata": data["epidata"][0],
+            "result": data["result"],
+            "message": data["message"],
+        }
+    return None
+
+
+def _preview_windows(start_date, end_date):
+    """
+    Yield the ``(start, end)`` ranges a preview tries in turn: the first
+    ``PREVIEW_HEAD_DAYS`` of the requested range, then the whole range if it is
+    longer. A preview only shows the first row, so the head is usually enough.
+    """
+    head_end = (
+        dtime.strptime(start_date, "%Y-%m-%d")
+        + timedelta(days=settings.PREVIEW_HEAD_DAYS)
+    ).strftime("%Y-%m-%d")
+    if head_end < end_date:
+        yield start_date, head_end
+    yield start_date, end_date
+
+
+def _fetch_preview_head(fetch_window, start_date, end_date, has_rows):
+    """
+    Call ``fetch_window(start, end)`` for each preview window until it fails or
+    returns data for which ``has_rows`` is true.
+    """
+    data = None
+    for window_start, window_end in _preview_windows(start_date, end_date):
+        data = fetch_window(window_start, window_end)
+        if data is None or has_rows(data):
+            break
+    return data
+
+
+def _fetch_epiweek_preview(endpoint, location_param, regions, api_key, start, end):
+    date_from, date_to = get_epiweek(start, end)
+    params = {
+        location_param: regions,
+        "epiweeks": f"{date_from}-{date_to}",
+    }
+    return _fetch_preview(
+        endpoint,
+        params,
+        api_key,
+        f"Error getting {endpoint} data",
+        {"regions": regions},
+    )
+
+
+def _preview_epiweek_endpoint(endpoint, location_param, geos, start_date, end_date, api_key):
+    regions = ",".join([region["id"] for region in geos])
+    data = _fetch_preview_head(
+        partial(_fetch_epiweek_preview, endpoint, location_param, regions, api_key),
+        start_date,
+        end_date,
+        _first_epidata_row,
+    )
+    row = _first_epidata_row(data)
+    return [row] if row else []
+
+
 def preview_covidcast_data(indicators, start_date, end_date, covidcast_geos, api_key):
-    preview_data = []
+    """
+    Return the first row for each covidcast indicator and geo type.
+
+    Indicators sharing a data source and time type are requested together, one
+    request per geo type, and the rows are matched back by ``signal``. Only the
+    head of the date range is requested first (see :func:`_preview_windows`);
+    signals without rows there are requested again over the whole range.
+    """
+    batches = {}
     for indicator in indicators:
         if indicator["_endpoint"] == "covidcast":
-            time_values = f"{start_date}--{end_date}"
-            if indicator["time_type"] == "week":
-                start_day, end_day = get_epiweek(start_date, end_date)
+            signals = batches.setdefault(
+                (indicator["data_source"], indicator["time_type"]), {}
+            )
+            signals[indicator["indicator"]] = None
+
+    # (data_source, time_type, geo_type, signal) -> first row, or None once the
+    # signal's request has failed
+    first_rows = {}
+    for window_start, window_end in _preview_windows(start_date, end_date):
+        calls = []
+        batch_keys = []
+        for (data_source, time_type), signals in batches.items():
+            time_values = f"{window_start}--{window_end}"
+            if time_type == "week":
+                start_day, end_day = get_epiweek(window_start, window_end)
                 time_values = f"{start_day}-{end_day}"
             for geo_type, values in covidcast_geos.items():
+                missing = [
+                    signal
+                    for signal in signals
+                    if (data_source, time_type, geo_type, signal) not in first_rows
+                ]
+                if not missing:
+                    continue
                 geo_values = ",".join(
                     [
                         (
@@ -444,160 +569,109 @@ def preview_covidcast_data(indicators, start_date, end_date, covidcast_geos, api
                         for value in values
                     ]
                 )
+                signal = ",".join(missing)
                 params = {
-                    "time_type": indicator["time_type"],
+                    "time_type": time_type,
                     "time_values": time_values,
-                    "data_source": indicator["data_source"],
-                    "signal": indicator["indicator"],
+                    "data_source": data_source,
+                    "signal": signal,
                     "geo_type": geo_type,
                     "geo_values": geo_values,
-                    "api_key": api_key if api_key else settings.EPIDATA_API_KEY,
                 }
-                try:
-                    response = requests.get(
-                        f"{settings.EPIDATA_URL}covidcast", params=params, timeout=(5, 30)
-                    )
-                    if response.status_code == 401:
-                        raise InvalidApiKeyError(INVALID_API_KEY_MESSAGE)
-                    response.raise_for_status()
-                except requests.RequestException:
-                    logger.exception(
-                        "Error getting covidcast data",
-                        extra={"signal": indicator["indicator"], "geo_type": geo_type},
-                    )
-                    continue
-                data = response.json()
-                if len(data["epidata"]):
-                    preview_data.append(
-                        {
-                            "epidata": data["epidata"][0],
-                            "result": data["result"],
-                            "message": data["message"],
-                        }
-                    )
-    return preview_data
+                fetch = partial(
+                    _fetch_preview,
+                    "covidcast",
+                    params,
+                    api_key,
+                    "Error getting covidcast data",
+                    {"signal": signal, "geo_type": geo_type},
+                )
+                calls.append(partial(get_cached_covidcast, params, fetch, api_key))
+                batch_keys.append(((data_source, time_type, geo_type), missing))
+
+        for (batch_key, missing), data in zip(batch_keys, run_concurrently(calls)):
+            if not data:
+                first_rows.update(((*batch_key, signal), None) for signal in missing)
+                continue
+            for row in data["epidata"] or []:
+                first_rows.setdefault(
+                    (*batch_key, row["signal"]),
+                    {
+                        "epidata": row,
+                        "result": data["result"],
+                        "message": data["message"],
+                    },
+                )
+
+    rows = []
+    for indicator in indicators:
+        if indicator["_endpoint"] != "covidcast":
+            continue
+        for geo_type in covidcast_geos:
+            row = first_rows.get(
+                (
+                    indicator["data_source"],
+                    indicator["time_type"],
+                    geo_type,
+                    indicator["indicator"],
+                )
+            )
+            if row:
+                rows.append(row)
+    return rows
 
 
 def preview_fluview_data(fluview_geos, start_date, end_date, api_key):
-    preview_data = []
-    regions = ",".join([region["id"] for region in fluview_geos])
-    date_from, date_to = get_epiweek(start_date, end_date)
-    params = {
-        "regions": regions,
-        "epiweeks": f"{date_from}-{date_to}",
-        "api_key": api_key if api_key else settings.EPIDATA_API_KEY,
-    }
-    try:
-        response = requests.get(f"{settings.EPIDATA_URL}fluview", params=params, timeout=(5, 30))
-        if response.status_code == 401:
-            raise InvalidApiKeyError(INVALID_API_KEY_MESSAGE)
-        response.raise_for_status()
-    except requests.RequestException:
-        logger.exception("Error getting fluview data", extra={"regions": regions})
-        return preview_data
-    data = response.json()
-    if len(data["epidata"]):
-        preview_data.append(
-            {
-                "epidata": data["epidata"][0],
-                "result": data["result"],
-                "message": data["message"],
-            }
-        )
-    return preview_data
+    return _preview_epiweek_endpoint(
+        "fluview", "regions", fluview_geos, start_date, end_date, api_key
+    )
 
 
 def preview_nidss_flu_data(nidss_flu_geos, start_date, end_date, api_key):
-    preview_data = []
-    regions = ",".join([region["id"] for region in nidss_flu_geos])
-    date_from, date_to = get_epiweek(start_date, end_date)
-    params = {
-        "regions": regions,
-        "epiweeks": f"{date_from}-{date_to}",
-        "api_key": api_key if api_key else settings.EPIDATA_API_KEY,
-    }
-    try:
-        response = requests.get(f"{settings.EPIDATA_URL}nidss_flu", params=params, timeout=(5, 30))
-        if response.status_code == 401:
-            raise InvalidApiKeyError(INVALID_API_KEY_MESSAGE)
-        response.raise_for_status()
-    except requests.RequestException:
-        logger.exception("Error getting nidss_flu data", extra={"regions": regions})
-        return preview_data
-    data = response.json()
-    if len(data["epidata"]):
-        preview_data.append(
-            {
-                "epidata": data["epidata"][0],
-                "result": data["result"],
-                "message": data["message"],
-            }
-        )
-    return preview_data
+    return _preview_epiweek_endpoint(
+        "nidss_flu", "regions", nidss_flu_geos, start_date, end_date, api_key
+    )
 
 
 def preview_nidss_dengue_data(nidss_dengue_geos, start_date, end_date, api_key):
-    preview_data = []
-    regions = ",".join([region["id"] for region in nidss_dengue_geos])
-    date_from, date_to = get_epiweek(start_date, end_date)
-    params = {
-        "locations": regions,
-        "epiweeks": f"{date_from}-{date_to}",
-        "api_key": api_key if api_key else settings.EPIDATA_API_KEY,
-    }
-    try:
-        response = requests.get(f"{settings.EPIDATA_URL}nidss_dengue", params=params, timeout=(5, 30))
-        if response.status_code == 401:
-            raise InvalidApiKeyError(INVALID_API_KEY_MESSAGE)
-        response.raise_for_status()
-    except requests.RequestException:
-        logger.exception("Error getting nidss_dengue data", extra={"regions": regions})
-        return preview_data
-    data = response.json()
-    if len(data["epidata"]):
-        preview_data.append(
-            {
-                "epidata": data["epidata"][0],
-                "result": data["result"],
-                "message": data["message"],
-            }
-        )
-    return preview_data
+    return _preview_epiweek_endpoint(
+        "nidss_dengue", "locations", nidss_dengue_geos, start_date, end_date, api_key
+    )
 
 
 def preview_flusurv_data(flusurv_geos, start_date, end_date, api_key):
-    preview_data = []
-    regions = ",".join([region["id"] for region in flusurv_geos])
-    date_from, date_to = get_epiweek(start_date, end_date)
-    params = {
-        "locations": regions,
-        "epiweeks": f"{date_from}-{date_to}",
-        "api_key": api_key if api_key else settings.EPIDATA_API_KEY,
-    }
-    try:
-        response = requests.get(f"{settings.EPIDATA_URL}flusurv", params=params, timeout=(5, 30))
-        if response.status_code == 401:
-            raise InvalidApiKeyError(INVALID_API_KEY_MESSAGE)
-        response.raise_for_status()
-    except requests.RequestException:
-        logger.exception("Error getting flusurv data", extra={"regions": regions})
-        return preview_data
-    data = response.json()
-    if len(data["epidata"]):
-        preview_data.append(
-            {
-                "epidata": data["epidata"][0],
-                "result": data["result"],
-                "message": data["message"],
-            }
-        )
-    return preview_data
+    return _preview_epiweek_endpoint(
+        "flusurv", "locations", flusurv_geos, start_date, end_date, api_key
+    )
+
+
+def _has_viz_rows(data):
+    return isinstance(data, list) and len(data) > 0
+
+
+def _fetch_viz_preview(params, api_key, error_message, log_extra, start, end):
+    return _fetch_preview(
+        "viz/",
+        {**params, "time_values": f"{start}:{end}"},
+        api_key,
+        error_message,
+        log_extra,
+        base_url=settings.EPIDATA_V5_URL,
+    )
+
+
+def _viz_preview_rows(calls):
+    rows = []
+    for data in run_concurrently(calls):
+        if _has_viz_rows(data):
+            rows.append(data[0])
+    return rows
 
 
 def preview_pophive_data(
     indicators, start_date, end_date, pophive_geos, pophive_age_group, api_key
 ):
-    preview_data = []
+    calls = []
     for indicator in indicators:
         if indicator["_endpoint"] == "pophive":
             for geo in pophive_geos:
@@ -606,33 +680,31 @@ def preview_pophive_data(
                     "signal": indicator["indicator"],
                     "geo_type": geo["geo_type"],
                     "geo_value": geo["id"],
-                    "time_values": f"{start_date}:{end_date}",
                     "extra_keys": f"age_group:{pophive_age_group[0]['id']}",
                     "format": "json",
                     "header": "false",
-                    "api_key": api_key if api_key else settings.EPIDATA_API_KEY,
                 }
-                try:
-                    response = requests.get(
-                        f"{settings.EPIDATA_V5_URL}viz/", params=params, timeout=(5, 30)
-                    )
-                    if response.status_code == 401:
-                        raise InvalidApiKeyError(INVALID_API_KEY_MESSAGE)
-                    response.raise_for_status()
-                except requests.RequestException:
-                    logger.exception(
-                        "Error getting pophive data",
-                        extra={
-                            "signal": indicator["indicator"],
-                            "geo_type": geo["geo_type"],
-                            "geo_value": geo["id"],
-                        },
+                fetch_window = partial(
+                    _fetch_viz_preview,
+                    params,
+                    api_key,
+                    "Error getting pophive data",
+                    {
+                        "signal": indicator["indicator"],
+                        "geo_type": geo["geo_type"],
+                        "geo_value": geo["id"],
+                    },
+                )
+                calls.append(
+                    partial(
+                        _fetch_preview_head,
+                        fetch_window,
+                        start_date,
+                        end_date,
+                        _has_viz_rows,
                     )
-                    continue
-                data = response.json()
-                if isinstance(data, list) and len(data):
-                    preview_data.append(data[0])
-    return preview_data
+                )
+    return _viz_preview_rows(calls)
 
 
 def preview_nwss_data(
@@ -645,7 +717,7 @@ def preview_nwss_data(
     nwss_fill_method,
     api_key,
 ):
-    preview_data = []
+    calls = []
     for indicator in indicators:
         if indicator["_endpoint"] == "nwss":
             for geo_value in nwss_geographic_value.replace(" ", "").split(","):
@@ -656,32 +728,30 @@ def preview_nwss_data(
                     "geo_value": geo_value,
                     "pcr_target": nwss_pcr_target[0]["id"],
                     "fill_method": nwss_fill_method,
-                    "time_values": f"{start_date}:{end_date}",
                     "extra_keys": f"nwss_source:{nwss_source[0]['id']}",
                     "format": "json",
                     "header": "false",
-                    "api_key": api_key if api_key else settings.EPIDATA_API_KEY,
                 }
-                try:
-                    response = requests.get(
-                        f"{settings.EPIDATA_V5_URL}viz/", params=params, timeout=(5, 30)
-                    )
-                    if response.status_code == 401:
-                        raise InvalidApiKeyError(INVALID_API_KEY_MESSAGE)
-                    response.raise_for_status()
-                except requests.RequestException:
-                    logger.exception(
-                        "Error getting nwss data",
-                        extra={
-                            "signal": indicator["indicator"],
-                            "geo_value": geo_value,
-                        },
+                fetch_window = partial(
+                    _fetch_viz_preview,
+                    params,
+                    api_key,
+                    "Error getting nwss data",
+                    {
+                        "signal": indicator["indicator"],
+                        "geo_value": geo_value,
+                    },
+                )
+                calls.append(
+                    partial(
+                        _fetch_preview_head,
+                        fetch_window,
+                        start_date,
+                        end_date,
+                        _has_viz_rows,
                     )
-                    continue
-                data = response.json()
-                if isinstance(data, list) and len(data):
-                    preview_data.append(data[0])
-    return preview_data
+                )
+    return _viz_preview_rows(calls)
 
 
 def generate_query_code_covidcast(
@@ -1042,30 +1112,16 @@ def log_form_data(request, data, form_mode):
 
 
 def get_num_locations_from_meta(indicators):
-    timeseries_count = 0
     indicators = set(
         (indicator["source__name"], indicator["name"]) for indicator in indicators
     )
-
-    metadata = cache.get("covidcast_meta")
-    if not metadata:
-        try:
-            response = requests.get(
-                f"{settings.EPIDATA_URL}covidcast_meta/", timeout=(5, 30)
-            )
-            response.raise_for_status()
-            data = response.json()
-            metadata = data["epidata"]
-            cache.set("covidcast_meta", metadata, 60 * 60 * 24)
-        except requests.RequestException:
-            logger.error("Error fetching covidcast metadata")
-            return 0
-        except Exception as e:
-            logger.error(f"Error fetching covidcast metadata: {e}")
-            return 0
-
-    epidata = metadata["epidata"] if isinstance(metadata, dict) else metadata
-    for r in epidata:
-        if (r["data_source"], r["signal"]) in indicators:
-            timeseries_count += r["num_locations"]
-    return timeseries_count
+    if not indicators:
+        return 0
+    index = get_covidcast_meta_index()
+    if not index:
+        return 0
+    return sum(
+        index[indicator]["num_locations"]
+        for indicator in indicators
+        if indicator in index
+    )
@@ -1,21 +1,34 @@
 import base64
+import hashlib
 import json
 import sys
-from datetime import datetime
+from functools import partial
 from textwrap import dedent
 
-import requests
 from delphi_utils import get_structured_logger
 from django.conf import settings
-from django.db.models import Case, IntegerField, Value, When
-from django.http import JsonResponse
+from django.db.models import Case, IntegerField, Q, Value, When
+from django.http import HttpResponse, JsonResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import urlencode
 from django.views.generic import ListView
-from epiweeks import Week
 from django.core.cache import cache
 
-from base.models import GeographyUnit
-from indicatorsets.filters import IndicatorSetFilter
+from base.geography_index import get_geography_index
+from base.utils import catalog_cache_key
+from epiportal.epidata import epidata_get, run_concurrently
+from epiportal.metadata_cache import REFRESH_ERRORS, get_cached_metadata
+from indicatorsets.catalog_index import (
+    RELATED_INDICATOR_FIELDS,
+    get_catalog_index,
+    select_indicator_sets,
+)
+from indicatorsets.fluview_coverage import (
+    FLUVIEW_COVERAGE_ENDPOINTS,
+    get_region_coverage,
+)
 from indicatorsets.forms import IndicatorSetFilterForm
+from indicatorsets.geo_coverage import get_signals_coverage
 from indicatorsets.models import ColumnDescription, FilterDescription, IndicatorSet
 from indicatorsets.utils import (
     InvalidApiKeyError,
@@ -60,30 +73,82 @@ logger = get_structured_logger("indicatorsets.views")
 indicatorsets_logger = get_structured_logger("indicatorsets_logger")
 
 
-HEADER_DESCRIPTION = "Discover, display and download real-time infectious disease indicators (time series) that track a variety of pathogens, diseases and syndromes in a variety of locations (primarily within the USA). Browse the list, or filter it first by locations and pathogens of interest, by surveillance categories, and more. Expand any row to expose and select from a set of related indicators, then hit 'Show Selected Indicators' at bottom to plot or export your selected indicators, or to generate code snippets to retrieve them from the Delphi Epidata API. Most indicators are served from the Delphi Epidata real-time repository, but some may be available only from third parties or may require prior approval."
+# Query parameters that do not change the catalog JSON. ``draw`` only decides
+# between server-side and full-list mode, which the key records on its own.
+CATALOG_JSON_IGNORED_PARAMS = ("format", "_", "draw")
 
+# DataTables column data -> ORM field used for server-side ordering
+SERVER_SIDE_ORDER_FIELDS = {
+    "name": "name",
+    "geographic_scope": "geographic_scope__name",
+    "temporal_scope_start": "temporal_scope_start",
+    "temporal_scope_end": "temporal_scope_end",
+    "temporal_granularity": "temporal_granularity",
+    "reporting_cadence": "reporting_cadence",
+    "reporting_lag": "reporting_lag",
+    "revision_cadence": "revision_cadence",
+    "demographic_scope": "demographic_scope",
+    "demographic_granularity": "demographic_granularity",
+    "original_data_provider": "original_data_provider__name",
+    "preprocessing_description": "preprocessing_description",
+    "censoring": "censoring",
+    "missingness": "missingness",
+    "delphi_hosted": "delphi_hosted",
+    "dua_required": "dua_required",
+    "license": "license",
+    "documentation_link": "documentation_link",
+}
 
-def get_related_indicators(queryset, indicator_set_ids: list):
-    related_indicators = []
-    indicators_data = queryset.filter(indicator_set__id__in=indicator_set_ids).values(
-        "id",
-        "display_name",
-        "member_name",
-        "member_short_name",
-        "name",
-        "indicator_set__id",
-        "indicator_set__name",
-        "indicator_set__short_name",
-        "indicator_set__epidata_endpoint",
-        "source__name",
-        "time_type",
-        "description",
-        "member_description",
-        "description",
-        "indicator_set__dua_required",
-        "source_type",
+# Fields matched by the DataTables search box in server-side mode
+SERVER_SIDE_SEARCH_FIELDS = (
+    "name",
+    "short_name",
+    "description",
+    "original_data_provider__name",
+    "geographic_scope__name",
+    "pathogens__display_name",
+    "geographic_levels__display_name",
+    "severity_pyramid_rungs__display_name",
+)
+
+CATALOG_DEFAULT_ORDERING = ("beta_last", "-is_top_priority", "-delphi_hosted", "name")
+
+
+def parse_draw(params):
+    """Return the DataTables ``draw`` counter in server-side mode, else ``None``."""
+    try:
+        return int(params["draw"])
+    except (KeyError, ValueError):
+        return None
+
+
+def get_catalog_json_cache_key(params):
+    """
+    Cache key for the catalog JSON under the current catalog version.
+
+    Parameters are sorted by name and value, so equivalent filter URLs share
+    one entry. Server-side pages and the full list are kept apart, whatever
+    the ``draw`` counter.
+    """
+    normalized = urlencode(
+        sorted(
+            (name, sorted(params.getlist(name)))
+            for name in params
+            if name not in CATALOG_JSON_IGNORED_PARAMS
+        ),
+        doseq=True,
+    )
+    mode = "list" if parse_draw(params) is None else "server_side"
+    return catalog_cache_key(
+        "indicatorsets_json", mode, hashlib.sha256(normalized.encode()).hexdigest()
     )
 
+
+HEADER_DESCRIPTION = "Discover, display and download real-time infectious disease indicators (time series) that track a variety of pathogens, diseases and syndromes in a variety of locations (primarily within the USA). Browse the list, or filter it first by locations and pathogens of interest, by surveillance categories, and more. Expand any row to expose and select from a set of related indicators, then hit 'Show Selected Indicators' at bottom to plot or export your selected indicators, or to generate code snippets to retrieve them from the Delphi Epidata API. Most indicators are served from the Delphi Epidata real-time repository, but some may be available only from third parties or may require prior approval."
+
+
+def format_related_indicators(indicators_data):
+    related_indicators = []
     for item in indicators_data:
         display_name = item["display_name"]
         if not display_name:
@@ -123,7 +188,6 @@ def get_related_indicators(queryset, indicator_set_ids: list):
                 "time_type": item["time_type"] if item["time_type"] else "",
                 "description": item["description"] if item["description"] else "",
                 "member_description": member_description,
-                "description": item["description"] if item["description"] else "",
                 "restricted": (
                     item["indicator_set__dua_required"]
                     if item["indicator_set__dua_required"]
@@ -135,6 +199,67 @@ def get_related_indicators(queryset, indicator_set_ids: list):
     return related_indicators
 
 
+RELATED_INDICATOR_SET_COLUMNS = (
+    "indicator_set_name",
+    "indicator_set_short_name",
+    "endpoint",
+    "restricted",
+)
+
+RELATED_INDICATOR_COLUMNS = (
+    "id",
+    "indicator_set",
+    "display_name",
+    "member_name",
+    "member_short_name",
+    "name",
+    "source",
+    "time_type",
+    "description",
+    "member_description",
+    "source_type",
+)
+
+
+def format_related_indicators_columnar(indicators_data):
+    """
+    Columnar form of :func:`format_related_indicators`.
+
+    Indicator set fields are sent once per set under ``indicator_sets`` and
+    indicator fields as parallel arrays under ``columns``. ``display_name`` is
+    ``null`` when it equals the member/name fallback and ``member_description``
+    is ``null`` when it equals ``description``.
+    """
+    indicator_sets = {}
+    columns = {column: [] for column in RELATED_INDICATOR_COLUMNS}
+    for row in format_related_indicators(indicators_data):
+        if row["indicator_set"] not in indicator_sets:
+            indicator_sets[row["indicator_set"]] = {
+                column: row[column] for column in RELATED_INDICATOR_SET_COLUMNS
+            }
+        if row["display_name"] == (row["member_name"] or row["name"]):
+            row["display_name"] = None
+        if row["member_description"] == row["description"]:
+            row["member_description"] = None
+        for column, values in columns.items():
+            values.append(row[column])
+    return {"layout": "columnar", "indicator_sets": indicator_sets, "columns": columns}
+
+
+def format_related_indicators_for_request(request, indicators_data):
+    if request.GET.get("layout") == "columnar":
+        return format_related_indicators_columnar(indicators_data)
+    return format_related_indicators(indicators_data)
+
+
+def get_related_indicators(queryset, indicator_set_ids: list):
+    return format_related_indicators(
+        queryset.filter(indicator_set__id__in=indicator_set_ids).values(
+            *RELATED_INDICATOR_FIELDS
+        )
+    )
+
+
 class IndicatorSetListView(ListView):
     model = IndicatorSet
     template_name = "indicatorsets/indicatorSets.html"
@@ -216,133 +341,182 @@ class IndicatorSetListView(ListView):
                     url_params_str = f"{url_params_str}&{param_name}={param_value}"
         return url_params_dict, url_params_str
 
-    def get_grouped_geographic_granularities(self):
-        geo_units = GeographyUnit.objects.prefetch_related("geo_level").values(
-            "geo_level__name", "id", "display_name", "geo_level__display_name"
-        )
-        geographic_granularities = [
-            {
-                "id": f"{geo_unit['geo_level__name']}:{geo_unit['id']}",
-                "geoType": geo_unit["geo_level__name"],
-                "text": geo_unit["display_name"],
-                "geoTypeDisplayName": geo_unit["geo_level__display_name"],
-            }
-            for geo_unit in geo_units
-        ]
-        geographic_granularities = group_by_property(
-            geographic_granularities, "geoTypeDisplayName"
+    def get(self, request, *args, **kwargs):
+        if request.GET.get("format") == "json":
+            self.json_cache_key = get_catalog_json_cache_key(request.GET)
+            cached = cache.get(self.json_cache_key)
+            if cached:
+                return self.conditional_json_response(cached)
+        return super().get(request, *args, **kwargs)
+
+    def get_draw(self):
+        """Return the DataTables ``draw`` counter in server-side mode, else ``None``."""
+        return parse_draw(self.request.GET)
+
+    def conditional_json_response(self, cached):
+        draw = self.get_draw()
+        if draw is not None:
+            # Server-side pages are cached without the per-request draw counter,
+            # and get no ETag: DataTables drops a replayed body with a stale draw.
+            content = b'{"draw": %d, ' % draw + cached["content"][1:]
+            response = HttpResponse(content, content_type="application/json")
+            patch_cache_control(response, no_cache=True)
+            return response
+        response = HttpResponse(cached["content"], content_type="application/json")
+        response["ETag"] = cached["etag"]
+        patch_cache_control(response, no_cache=True)
+        return get_conditional_response(
+            self.request, etag=cached["etag"], response=response
         )
-        grouped_geographic_granularities = []
-        for key, value in geographic_granularities.items():
-            grouped_geographic_granularities.append(
-                {
-                    "text": key,
-                    "children": value,
-                }
-            )
-        return grouped_geographic_granularities
 
     def render_to_response(self, context, **response_kwargs):
         if self.request.GET.get("format") == "json":
             return self.render_to_json_response(context, **response_kwargs)
         return super().render_to_response(context, **response_kwargs)
 
-    def render_to_json_response(self, context, **response_kwargs):
-        data = []
-        for indicator_set in context["indicator_sets"]:
-            data.append(
+    @staticmethod
+    def serialize_indicator_set(indicator_set):
+        return {
+            "DT_RowId": indicator_set.id,
+            "name": indicator_set.name,
+            "short_name": indicator_set.short_name,
+            "description": indicator_set.description,
+            "maintainer_name": indicator_set.maintainer_name,
+            "maintainer_email": indicator_set.maintainer_email,
+            "organization": indicator_set.organization,
+            "original_data_provider": indicator_set.original_data_provider.name if indicator_set.original_data_provider else "",
+            "epidata_endpoint": indicator_set.epidata_endpoint,
+            "language": indicator_set.language,
+            "version_number": indicator_set.version_number,
+            "origin_datasource": indicator_set.origin_datasource,
+            "pathogens": [
                 {
-                    "DT_RowId": indicator_set.id,
-                    "name": indicator_set.name,
-                    "short_name": indicator_set.short_name,
-                    "description": indicator_set.description,
-                    "maintainer_name": indicator_set.maintainer_name,
-                    "maintainer_email": indicator_set.maintainer_email,
-                    "organization": indicator_set.organization,
-                    "original_data_provider": indicator_set.original_data_provider.name if indicator_set.original_data_provider else "",
-                    "epidata_endpoint": indicator_set.epidata_endpoint,
-                    "language": indicator_set.language,
-                    "version_number": indicator_set.version_number,
-                    "origin_datasource": indicator_set.origin_datasource,
-                    "pathogens": [
-                        {
-                            "name": p.name,
-                            "display_name": p.display_name,
-                        }
-                        for p in indicator_set.pathogens.all()
-                    ],
-                    "data_type": indicator_set.data_type,
-                    "geographic_scope": (
-                        indicator_set.geographic_scope.name
-                        if indicator_set.geographic_scope
-                        else ""
-                    ),
-                    "geographic_levels": [
-                        {
-                            "name": g.name,
-                            "display_name": g.display_name,
-                            "short_name": g.short_name,
-                        }
-                        for g in indicator_set.geographic_levels.all()
-                    ],
-                    "preprocessing_description": indicator_set.preprocessing_description,
-                    "temporal_scope_start": indicator_set.temporal_scope_start,
-                    "temporal_scope_end": indicator_set.temporal_scope_end,
-                    "temporal_granularity": indicator_set.temporal_granularity,
-                    "reporting_cadence": indicator_set.reporting_cadence,
-                    "reporting_lag": indicator_set.reporting_lag,
-                    "revision_cadence": indicator_set.revision_cadence,
-                    "demographic_scope": indicator_set.demographic_scope,
-                    "demographic_granularity": indicator_set.demographic_granularity,
-                    "severity_pyramid_rungs": [
-                        {
-                            "name": s.name,
-                            "display_name": s.display_name,
-                        }
-                        for s in indicator_set.severity_pyramid_rungs.all()
-                    ],
-                    "censoring": indicator_set.censoring,
-                    "missingness": indicator_set.missingness,
-                    "dua_required": indicator_set.dua_required,
-                    "license": indicator_set.license,
-                    "dataset_location": indicator_set.dataset_location,
-                    "documentation_link": indicator_set.documentation_link,
-                    "source_type": indicator_set.source_type,
-                    "state": indicator_set.state,
-                    "is_top_priority": indicator_set.is_top_priority,
-                    "delphi_hosted": "Yes" if indicator_set.delphi_hosted else "No",
+                    "name": p.name,
+                    "display_name": p.display_name,
+                }
+                for p in indicator_set.pathogens.all()
+            ],
+            "data_type": indicator_set.data_type,
+            "geographic_scope": (
+                indicator_set.geographic_scope.name
+                if indicator_set.geographic_scope
+                else ""
+            ),
+            "geographic_levels": [
+                {
+                    "name": g.name,
+                    "display_name": g.display_name,
+                    "short_name": g.short_name,
+                }
+                for g in indicator_set.geographic_levels.all()
+            ],
+            "preprocessing_description": indicator_set.preprocessing_description,
+            "temporal_scope_start": indicator_set.temporal_scope_start,
+            "temporal_scope_end": indicator_set.temporal_scope_end,
+            "temporal_granularity": indicator_set.temporal_granularity,
+            "reporting_cadence": indicator_set.reporting_cadence,
+            "reporting_lag": indicator_set.reporting_lag,
+            "revision_cadence": indicator_set.revision_cadence,
+            "demographic_scope": indicator_set.demographic_scope,
+            "demographic_granularity": indicator_set.demographic_granularity,
+            "severity_pyramid_rungs": [
+                {
+                    "name": s.name,
+                    "display_name": s.display_name,
                 }
+                for s in indicator_set.severity_pyramid_rungs.all()
+            ],
+            "censoring": indicator_set.censoring,
+            "missingness": indicator_set.missingness,
+            "dua_required": indicator_set.dua_required,
+            "license": indicator_set.license,
+            "dataset_location": indicator_set.dataset_location,
+            "documentation_link": indicator_set.documentation_link,
+            "source_type": indicator_set.source_type,
+            "state": indicator_set.state,
+            "is_top_priority": indicator_set.is_top_priority,
+            "delphi_hosted": "Yes" if indicator_set.delphi_hosted else "No",
+        }
+
+    def get_server_side_page(self, queryset):
+        """
+        Apply the DataTables ``search[value]``, ``order`` and ``start``/``length``
+        parameters to ``queryset`` and return the visible page.
+        """
+        params = self.request.GET
+        records_total = queryset.count()
+
+        search = params.get("search[value]", "").strip()
+        if search:
+            query = Q()
+            for field in SERVER_SIDE_SEARCH_FIELDS:
+                query |= Q(**{f"{field}__icontains": search})
+            queryset = queryset.filter(
+                id__in=IndicatorSet.objects.filter(query).values("id")
             )
-        return JsonResponse(
-            {
+        records_filtered = queryset.count() if search else records_total
+
+        ordering = []
+        i = 0
+        while f"order[{i}][column]" in params:
+            column = params.get(f"columns[{params[f'order[{i}][column]']}][data]")
+            field = SERVER_SIDE_ORDER_FIELDS.get(column)
+            if field:
+                descending = params.get(f"order[{i}][dir]") == "desc"
+                ordering.append(f"-{field}" if descending else field)
+            i += 1
+        if ordering:
+            queryset = queryset.order_by(*ordering, *CATALOG_DEFAULT_ORDERING)
+
+        try:
+            start = max(int(params.get("start", 0)), 0)
+            length = int(params.get("length", settings.PAGE_SIZE))
+        except ValueError:
+            start, length = 0, settings.PAGE_SIZE
+        page = queryset[start:start + length] if length > 0 else queryset[start:]
+        return page, records_total, records_filtered
+
+    def get_rows_payload(self, indicator_sets):
+        """DataTables payload for ``indicator_sets``, one page in server-side mode."""
+        if self.get_draw() is not None:
+            page, records_total, records_filtered = self.get_server_side_page(
+                indicator_sets
+            )
+            payload = {
+                "recordsTotal": records_total,
+                "recordsFiltered": records_filtered,
+                "data": [self.serialize_indicator_set(row) for row in page],
+            }
+        else:
+            data = [self.serialize_indicator_set(row) for row in indicator_sets]
+            payload = {
                 "draw": 1,
                 "recordsTotal": len(data),
                 "recordsFiltered": len(data),
                 "data": data,
             }
-        )
+        return payload
 
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        queryset = self.get_queryset()
-        url_params_dict, _ = self.get_url_params()
-        filter = IndicatorSetFilter(self.request.GET, queryset=queryset)
-        context["url_params_dict"] = url_params_dict
-        context["epivis_url"] = settings.EPIVIS_URL
-        context["epidata_url"] = settings.EPIDATA_URL
-        # Convert hosted_by_delphi string back to boolean for form initialization
-        form_initial = url_params_dict.copy()
-        if "hosted_by_delphi" in form_initial:
-            form_initial["hosted_by_delphi"] = (
-                form_initial["hosted_by_delphi"] == "true"
-            )
-        context["form"] = IndicatorSetFilterForm(initial=form_initial)
-        context["filter"] = filter
-        context["APP_VERSION"] = settings.APP_VERSION
-        context["indicator_sets"] = (
-            filter.qs.prefetch_related(
+    def render_to_json_response(self, context, **response_kwargs):
+        response = JsonResponse(self.get_rows_payload(context["indicator_sets"]))
+        cached = {
+            "content": response.content,
+            "etag": f'"{hashlib.sha256(response.content).hexdigest()}"',
+        }
+        # Do not keep a selection whose location filter could not be applied
+        if not self.selection.location_search_failed:
+            cache.set(self.json_cache_key, cached, settings.CACHE_TIME)
+        return self.conditional_json_response(cached)
+
+    def get_indicator_sets(self, selection):
+        """Indicator sets of a :class:`CatalogSelection` in catalog order."""
+        return (
+            self.get_queryset()
+            .filter(id__in=selection.indicator_set_ids)
+            .prefetch_related(
                 "pathogens", "geographic_levels", "severity_pyramid_rungs"
-            ).annotate(
+            )
+            .annotate(
                 is_top_priority=Case(
                     When(
                         temporal_scope_end="Ongoing",
@@ -366,7 +540,25 @@ class IndicatorSetListView(ListView):
                     output_field=IntegerField(),
                 ),
             )
-        ).order_by("beta_last", "-is_top_priority", "-delphi_hosted", "name")
+            .order_by(*CATALOG_DEFAULT_ORDERING)
+        )
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        url_params_dict, _ = self.get_url_params()
+        selection = self.selection = select_indicator_sets(self.request.GET)
+        context["url_params_dict"] = url_params_dict
+        context["epivis_url"] = settings.EPIVIS_URL
+        context["epidata_url"] = settings.EPIDATA_URL
+        # Convert hosted_by_delphi string back to boolean for form initialization
+        form_initial = url_params_dict.copy()
+        if "hosted_by_delphi" in form_initial:
+            form_initial["hosted_by_delphi"] = (
+                form_initial["hosted_by_delphi"] == "true"
+            )
+        context["form"] = IndicatorSetFilterForm(initial=form_initial)
+        context["APP_VERSION"] = settings.APP_VERSION
+        context["indicator_sets"] = self.get_indicator_sets(selection)
         context["filters_descriptions"] = (
             FilterDescription.get_all_descriptions_as_dict()
         )
@@ -374,13 +566,10 @@ class IndicatorSetListView(ListView):
             ColumnDescription.get_all_descriptions_as_dict()
         )
         context["header_description"] = HEADER_DESCRIPTION
-        geographic_granularities = cache.get("geographic_granularities")
-        if not geographic_granularities:
-            geographic_granularities = self.get_grouped_geographic_granularities()
-            cache.set(
-                "geographic_granularities", geographic_granularities, 60 * 60 * 24
-            )
-        context["geographic_granularities"] = geographic_granularities
+        location_ids = url_params_dict.get("location_search")
+        context["selected_locations"] = json.dumps(
+            get_geography_index().lookup(location_ids) if location_ids else []
+        )
         context["grouped_data_providers"] = get_grouped_original_data_provider_choices()
         return context
 
@@ -559,59 +748,83 @@ def preview_data(request):
         nwss_fill_method = data.get("nwssFillMethod", "source")
         api_key = data.get("apiKey", None)
 
-        preview_data = []
-        try:
-            preview_data.extend(
-                preview_covidcast_data(
-                    indicators, start_date, end_date, covidcast_geos, api_key
-                )
+        calls = [
+            partial(
+                preview_covidcast_data,
+                indicators,
+                start_date,
+                end_date,
+                covidcast_geos,
+                api_key,
             )
-            if fluview_geos:
-                preview_data.extend(
-                    preview_fluview_data(fluview_geos, start_date, end_date, api_key)
+        ]
+        if fluview_geos:
+            calls.append(
+                partial(
+                    preview_fluview_data, fluview_geos, start_date, end_date, api_key
                 )
-            if nidss_flu_locations:
-                preview_data.extend(
-                    preview_nidss_flu_data(
-                        nidss_flu_locations, start_date, end_date, api_key
-                    )
+            )
+        if nidss_flu_locations:
+            calls.append(
+                partial(
+                    preview_nidss_flu_data,
+                    nidss_flu_locations,
+                    start_date,
+                    end_date,
+                    api_key,
                 )
-            if nidss_dengue_locations:
-                preview_data.extend(
-                    preview_nidss_dengue_data(
-                        nidss_dengue_locations, start_date, end_date, api_key
-                    )
+            )
+        if nidss_dengue_locations:
+            calls.append(
+                partial(
+                    preview_nidss_dengue_data,
+                    nidss_dengue_locations,
+                    start_date,
+                    end_date,
+                    api_key,
                 )
-            if flusurv_locations:
-                preview_data.extend(
-                    preview_flusurv_data(
-                        flusurv_locations, start_date, end_date, api_key
-                    )
+            )
+        if flusurv_locations:
+            calls.append(
+                partial(
+                    preview_flusurv_data,
+                    flusurv_locations,
+                    start_date,
+                    end_date,
+                    api_key,
                 )
-            if pophive_geos and pophive_age_group:
-                preview_data.extend(
-                    preview_pophive_data(
-                        indicators,
-                        start_date,
-                        end_date,
-                        pophive_geos,
-                        pophive_age_group,
-                        api_key,
-                    )
+            )
+        if pophive_geos and pophive_age_group:
+            calls.append(
+                partial(
+                    preview_pophive_data,
+                    indicators,
+                    start_date,
+                    end_date,
+                    pophive_geos,
+                    pophive_age_group,
+                    api_key,
                 )
-            if nwss_geographic_value and nwss_pcr_target and nwss_source:
-                preview_data.extend(
-                    preview_nwss_data(
-                        indicators,
-                        start_date,
-                        end_date,
-                        nwss_geographic_value,
-                        nwss_pcr_target,
-                        nwss_source,
-                        nwss_fill_method,
-                        api_key,
-                    )
+            )
+        if nwss_geographic_value and nwss_pcr_target and nwss_source:
+            calls.append(
+                partial(
+                    preview_nwss_data,
+                    indicators,
+                    start_date,
+                    end_date,
+                    nwss_geographic_value,
+                    nwss_pcr_target,
+                    nwss_source,
+                    nwss_fill_method,
+                    api_key,
                 )
+            )
+
+        preview_data = []
+        try:
+            for rows in run_concurrently(calls):
+                preview_data.extend(rows or [])
         except InvalidApiKeyError as e:
             return JsonResponse(
                 {"epidata": [], "result": -2, "message": str(e)},
@@ -728,178 +941,100 @@ def create_query_code(request):
 
 def get_available_geos(request):
     if request.method == "POST":
-        geo_values = []
         data = json.loads(request.body)
-        indicators = data.get("indicators", [])
-        grouped_indicators = group_by_property(indicators, "data_source")
-        for data_source, indicators in grouped_indicators.items():
-            indicators_str = ",".join(
-                indicator["indicator"] for indicator in indicators
-            )
-            try:
-                response = requests.get(
-                    f"{settings.EPIDATA_URL}covidcast/geo_indicator_coverage",
-                    params={"data_source": data_source, "signals": indicators_str},
-                    auth=("epidata", settings.EPIDATA_API_KEY),
-                    timeout=(5, 30),
-                )
-                response.raise_for_status()
-            except requests.RequestException:
-                logger.exception(
-                    "Error getting geo indicator coverage",
-                    extra={"data_source": data_source, "signals": indicators_str},
-                )
-                continue
-            data = response.json()
-            if len(data["epidata"]):
-                geo_values.extend(data["epidata"])
-        unique_values = set(geo_values)
-        geo_levels = set([el.split(":")[0] for el in unique_values])
-        geo_unit_ids = set([geo_value.split(":")[1] for geo_value in unique_values])
-        geographic_granularities = [
-            {
-                "id": f"{geo_unit.geo_level.name}:{geo_unit.geo_id}",
-                "geoType": geo_unit.geo_level.name,
-                "text": geo_unit.display_name,
-                "geoTypeDisplayName": geo_unit.geo_level.display_name,
-            }
-            for geo_unit in GeographyUnit.objects.filter(geo_level__name__in=geo_levels)
-            .filter(geo_id__in=geo_unit_ids)
-            .prefetch_related("geo_level")
-            .order_by("level")
-        ]
-        grouped_geographic_granularities = group_by_property(
-            geographic_granularities, "geoTypeDisplayName"
+        geos = get_signals_coverage(
+            (indicator["data_source"], indicator["indicator"])
+            for indicator in data.get("indicators", [])
         )
-        geographic_granularities = []
-        for key, value in grouped_geographic_granularities.items():
-            geographic_granularities.append(
-                {
-                    "text": key,
-                    "children": value,
-                }
-            )
+        index = get_geography_index()
         return JsonResponse(
-            {"geographic_granularities": geographic_granularities}, safe=False
+            {"geographic_granularities": index.group(index.covered_positions(geos))},
+            safe=False,
         )
 
 
+def get_table_stats(selection):
+    return {
+        "num_of_indicator_sets": len(selection.indicator_set_ids),
+        "num_of_indicators": len(selection.indicators),
+        "num_of_locations": get_num_locations_from_meta(selection.indicators),
+    }
+
+
 def get_table_stats_info(request):
-    try:
-        queryset = IndicatorSet.objects.all()
-    except Exception as e:
-        indicatorsets_logger.error(f"Error fetching indicator sets: {e}")
-        queryset = IndicatorSet.objects.none()
-
-    filter = IndicatorSetFilter(request.GET, queryset=queryset)
-    related_indicators = filter.indicators_qs.filter(
-        indicator_set__id__in=filter.qs.values_list("id", flat=True)
-    )
-    num_locations = get_num_locations_from_meta(
-        related_indicators.values("source__name", "name").distinct()
-    )
-    return JsonResponse(
-        {
-            "num_of_indicator_sets": filter.qs.count(),
-            "num_of_indicators": related_indicators.count(),
-            "num_of_locations": num_locations,
-        }
-    )
+    return JsonResponse(get_table_stats(select_indicator_sets(request.GET)))
 
 
-def get_related_indicators_json(request):
-    try:
-        queryset = IndicatorSet.objects.all().prefetch_related(
-            "geographic_scope",
-            "pathogens",
-            "severity_pyramid_rungs",
-            "geographic_levels",
+CATALOG_BOOTSTRAP_PARTS = ("rows", "stats", "related_indicators")
+
+
+def get_catalog_bootstrap(request):
+    """
+    Table rows, table stats and related indicators for one filter selection.
+
+    The selection is evaluated once for all parts. ``include`` is a
+    comma-separated subset of ``CATALOG_BOOTSTRAP_PARTS`` (all by default);
+    rows accept the same DataTables server-side parameters as ``format=json``.
+    """
+    include = [
+        part.strip()
+        for part in request.GET.get("include", "").split(",")
+        if part.strip() in CATALOG_BOOTSTRAP_PARTS
+    ] or CATALOG_BOOTSTRAP_PARTS
+    selection = select_indicator_sets(request.GET)
+    response = {}
+    if "rows" in include:
+        view = IndicatorSetListView()
+        view.setup(request)
+        response["rows"] = view.get_rows_payload(view.get_indicator_sets(selection))
+        if view.get_draw() is not None:
+            response["rows"]["draw"] = view.get_draw()
+    if "stats" in include:
+        response["stats"] = get_table_stats(selection)
+    if "related_indicators" in include:
+        response["related_indicators"] = format_related_indicators_for_request(
+            request, selection.indicators
         )
-    except Exception as e:
-        indicatorsets_logger.error(f"Error fetching indicator sets: {e}")
-        queryset = IndicatorSet.objects.none()
-
-    filter = IndicatorSetFilter(request.GET, queryset=queryset)
-    related_indicators = get_related_indicators(
-        filter.indicators_qs.select_related("indicator_set", "source"),
-        filter.qs.values_list("id", flat=True),
+    return JsonResponse(response)
+
+
+def get_facet_counts(request):
+    """
+    Number of indicator sets each filter value would yield under the current
+    selection, counted from the catalog index.
+    """
+    return JsonResponse({"facets": get_catalog_index().facet_counts(request.GET)})
+
+
+def get_related_indicators_json(request):
+    selection = select_indicator_sets(request.GET)
+    related_indicators = format_related_indicators_for_request(
+        request, selection.indicators
     )
     return JsonResponse({"related_indicators": related_indicators})
 
 
 def check_fluview_geo_coverage(request):
-    null_data_indicators = []
+    """
+    List the FluView indicators without data for ``geo``, answered from the
+    precomputed coverage table (see :mod:`indicatorsets.fluview_coverage`).
+    """
+    not_covered_indicators = []
     if request.method == "GET":
         geo_value = request.GET.get("geo")
-        indicators = request.GET.get("indicators")
-        start_date = 199740
-        end_date = Week.fromdate(datetime.today())
-        end_date = f"{end_date.year}{end_date.week if end_date.week >= 10 else '0' + str(end_date.week)}"
-        indicators = json.loads(indicators)
-
-        fluview_indicators = {}
-        fluview_clinical_indicators = {}
+        indicators = json.loads(request.GET.get("indicators"))
+        coverage_by_endpoint = {}
         for indicator in indicators:
-            if indicator["data_source"] == "fluview":
-                fluview_indicators[indicator["indicator"]] = 0
-            elif indicator["data_source"] == "fluview_clinical":
-                fluview_clinical_indicators[indicator["indicator"]] = 0
-
-        params = {
-            "regions": geo_value,
-            "epiweeks": f"{start_date}-{end_date}",
-            "api_key": settings.EPIDATA_API_KEY,
-        }
-
-        if fluview_indicators:
-            try:
-                response = requests.get(
-                    f"{settings.EPIDATA_URL}fluview", params=params, timeout=(5, 30)
-                )
-                response.raise_for_status()
-            except requests.RequestException:
-                logger.exception(
-                    "Error getting fluview data", extra={"geo_value": geo_value}
-                )
-            else:
-                data = response.json()
-                if len(data["epidata"]):
-                    for el in data["epidata"]:
-                        for indicator in fluview_indicators.keys():
-                            fluview_indicators[indicator] += (
-                                el[indicator] if el[indicator] else 0
-                            )
-        if fluview_clinical_indicators:
-            try:
-                response = requests.get(
-                    f"{settings.EPIDATA_URL}fluview_clinical",
-                    params=params,
-                    timeout=(5, 30),
-                )
-                response.raise_for_status()
-            except requests.RequestException:
-                logger.exception(
-                    "Error getting fluview clinical data",
-                    extra={"geo_value": geo_value},
+            endpoint = indicator["data_source"]
+            if endpoint not in FLUVIEW_COVERAGE_ENDPOINTS:
+                continue
+            if endpoint not in coverage_by_endpoint:
+                coverage_by_endpoint[endpoint] = (
+                    get_region_coverage(endpoint, geo_value) or {}
                 )
-            else:
-                data = response.json()
-                if len(data["epidata"]):
-                    for el in data["epidata"]:
-                        for indicator in fluview_clinical_indicators.keys():
-                            fluview_clinical_indicators[indicator] += el[indicator]
-
-        for indicator in fluview_indicators.keys():
-            if fluview_indicators[indicator] == 0:
-                null_data_indicators.append(indicator)
-        for indicator in fluview_clinical_indicators.keys():
-            if fluview_clinical_indicators[indicator] == 0:
-                null_data_indicators.append(indicator)
-        not_covered_indicators = [
-            indicator
-            for indicator in indicators
-            if indicator["indicator"] in null_data_indicators
-        ]
+            coverage = coverage_by_endpoint[endpoint].get(indicator["indicator"])
+            if not coverage or not coverage["has_data"]:
+                not_covered_indicators.append(indicator)
         return JsonResponse(
             {"not_covered_indicators": not_covered_indicators}, safe=False
         )
@@ -913,20 +1048,43 @@ def age_group_sort_key(value):
     return int(value.split("-", 1)[0])
 
 
+def search_geographies(request):
+    """
+    Paged prefix search over geography units for the location select2.
+    """
+    try:
+        page = int(request.GET.get("page", 1))
+    except ValueError:
+        page = 1
+    return JsonResponse(
+        get_geography_index().page(
+            term=request.GET.get("term", ""),
+            page=page,
+            geo_type=request.GET.get("geo_type") or None,
+        )
+    )
+
+
+def fetch_pophive_age_groups():
+    response = epidata_get(
+        "metadata/extra_key_values/",
+        params={"source": "pophive"},
+        base_url=settings.EPIDATA_V5_URL,
+    )
+    response.raise_for_status()
+    pophive_age_groups = response.json().get("extra_key_values", {}).get(
+        "age_group", []
+    )
+    pophive_age_groups.sort(key=age_group_sort_key)
+    return pophive_age_groups
+
+
 def get_pophive_age_groups(request):
-    pophive_age_groups = cache.get("pophive_age_groups") or []
-    if not pophive_age_groups:
-        try:
-            response = requests.get(
-                settings.EPIDATA_V5_URL + "metadata/extra_key_values/?source=pophive",
-                timeout=(5, 30),
-            )
-            response.raise_for_status()
-            pophive_age_groups = response.json().get("extra_key_values", {}).get(
-                "age_group", []
-            )
-            pophive_age_groups.sort(key=age_group_sort_key)
-            cache.set("pophive_age_groups", pophive_age_groups, 60 * 60 * 24)
-        except requests.RequestException:
-            logger.exception("Error getting pophive age groups")
+    try:
+        pophive_age_groups = get_cached_metadata(
+            "pophive_age_groups", fetch_pophive_age_groups
+        )
+    except REFRESH_ERRORS:
+        logger.exception("Error getting pophive age groups")
+        pophive_age_groups = []
     return JsonResponse({"age_groups": pophive_age_groups})